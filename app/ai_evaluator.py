@@ -1,129 +1,1028 @@
-import json
 import logging
 import os
+import threading
 import time
-from groq import Groq
-from dotenv import load_dotenv
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import lru_cache
+from config import (JSON_MODE, DEFAULT_MODEL_NAME, AI_TEMPERATURE, TOP_P, MAX_COMPLETION_TOKENS,
+                    REASONING_EFFORT, MAX_RETRIES, ROLE_GENERATION_OVERRIDES,
+                    RATE_LIMIT_RPM, RATE_LIMIT_TPM, EXPECTED_COMPLETION_TOKENS, RATE_LIMIT_MAX_WAIT_SECONDS,
+                    HTTP_POOL_SIZE, HTTP_TIMEOUT_SECONDS, HTTP_CONNECT_TIMEOUT_SECONDS,
+                    HTTP_KEEPALIVE_SECONDS, HEDGE_PERCENTILE, HEDGE_MAX_EXTRA_RATE, HEDGE_MIN_SAMPLES,
+                    HEDGE_WINDOW, HEDGE_MIN_DELAY_SECONDS)
+from budget import TokenBudget, TokenBudgetExceeded
+from hedging import HedgePolicy, RequestCancelled, RequestControl
+from json_utils import JsonObjectScanner, repair_json
+from metrics import CallStats, percentile
+from prompt_builder import estimate_tokens
+from rate_limiter import RateLimiter, backoff_delay
 
 
-# Load environment variables
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client
-api_key = os.getenv("GROQ_API_KEY")
-if not api_key:
-    raise ValueError("GROQ_API_KEY environment variable is not set. Please set it in your .env file.")
+# The Groq client is created on first use (see get_client), so --help,
+# resume-only and fully cached runs never import the SDK or need an API key
+client = None
+_client_lock = threading.Lock()
+_http_options = {'pool_size': HTTP_POOL_SIZE, 'timeout': HTTP_TIMEOUT_SECONDS}
+
+# Shared by every evaluation thread; replaced by configure_rate_limits()
+rate_limiter = RateLimiter(RATE_LIMIT_RPM, RATE_LIMIT_TPM)
+
+# Run-wide token budget; None = unlimited (see configure_token_budget)
+token_budget = None
 
-try:
-    client = Groq(api_key=api_key)
-except Exception as e:
-    logger.error(f"Failed to initialize Groq client: {e}")
-    raise
+# Hedging of slow single-CV calls; None = off (see configure_hedging)
+hedge_policy = None
 
+# HTTP status codes worth retrying; any other 4xx fails fast
+RETRYABLE_STATUS_CODES = {408, 409, 429}
 
-def evaluate_cv(cv_content, evaluation_prompt):
+
+def configure_http_client(pool_size=None, timeout=None):
     """
-    Evaluate CV content using Groq AI API.
+    Set the connection pool size and request timeout for the shared client.
+
+    Only takes effect if called before the first API call.
 
     Args:
-        cv_content (str): Markdown content of the CV
-        evaluation_prompt (str): Prompt with evaluation criteria
+        pool_size (int): Maximum pooled (keep-alive) connections, or None for the config default
+        timeout (float): Read/write timeout per request in seconds, or None for the config default
+    """
+    if pool_size is not None:
+        _http_options['pool_size'] = pool_size
+    if timeout is not None:
+        _http_options['timeout'] = timeout
+
+
+def get_client():
+    """
+    Return the shared Groq client, creating it on first use.
+
+    All calls go through one pooled HTTP client, so connections (and their
+    TLS sessions) are kept alive and reused across CVs and threads.
 
     Returns:
-        dict: Evaluation results with keys: educationalQualification, jobHistory, skillSet, score, justification
+        Groq: The client
+
+    Raises:
+        ValueError: If GROQ_API_KEY is not set
     """
+    global client
+    if client is not None:
+        return client
 
-    # Construct the full prompt
-    full_prompt = f"""
-{evaluation_prompt}
+    with _client_lock:
+        if client is None:
+            import httpx
+            from dotenv import load_dotenv
+            from groq import Groq
 
-CV Content:
-{cv_content}
+            # Load environment variables
+            load_dotenv()
+            api_key = os.getenv("GROQ_API_KEY")
+            if not api_key:
+                raise ValueError("GROQ_API_KEY environment variable is not set. Please set it in your .env file.")
 
-Please respond in the following JSON format:
-{{
-  "educationalQualification": "",
-  "jobHistory": "",
-  "skillSet": "",
-  "score": 0,
-  "justification": ""
-}}
+            pool_size = _http_options['pool_size']
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                                    keepalive_expiry=HTTP_KEEPALIVE_SECONDS),
+                timeout=httpx.Timeout(_http_options['timeout'], connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            )
+            try:
+                # Retries are handled here (shared rate limiter, jittered backoff), not by the SDK
+                client = Groq(api_key=api_key, max_retries=0, http_client=http_client)
+            except Exception as e:
+                logger.error(f"Failed to initialize Groq client: {e}")
+                http_client.close()
+                raise
+            logger.debug(f"Created Groq client (pool size {pool_size}, timeout {_http_options['timeout']}s)")
+    return client
+
+
+# reasoning_effort value that leaves the field out of the request; models
+# without reasoning reject it with HTTP 400
+REASONING_EFFORT_OFF = 'none'
+REASONING_EFFORT_CHOICES = ('low', 'medium', 'high', REASONING_EFFORT_OFF)
+
+# Everything that shapes a generation; also part of the evaluation cache key
+GenerationSettings = namedtuple(
+    'GenerationSettings', ['model', 'temperature', 'top_p', 'max_completion_tokens', 'reasoning_effort'])
+
+DEFAULT_SETTINGS = GenerationSettings(
+    model=DEFAULT_MODEL_NAME,
+    temperature=AI_TEMPERATURE,
+    top_p=TOP_P,
+    max_completion_tokens=MAX_COMPLETION_TOKENS,
+    reasoning_effort=REASONING_EFFORT
+)
+
+
+def resolve_generation_settings(job_role, **overrides):
+    """
+    Work out the generation settings for a role.
+
+    Precedence: config defaults < ROLE_GENERATION_OVERRIDES[job_role] <
+    explicit overrides (e.g. from the command line). Overrides set to None
+    are ignored.
+
+    Args:
+        job_role (str): Job role being evaluated
+        **overrides: GenerationSettings fields to override
+
+    Returns:
+        GenerationSettings: Settings to use for every call for this role
+    """
+    settings = DEFAULT_SETTINGS._replace(**ROLE_GENERATION_OVERRIDES.get(job_role.lower(), {}))
+    return settings._replace(**{key: value for key, value in overrides.items() if value is not None})
+
+
+ERROR_VALUE = "Error processing"
+
+
+def build_error_result(justification):
+    """
+    Build the placeholder result recorded when a CV could not be evaluated.
+
+    Args:
+        justification (str): Description of the failure
+
+    Returns:
+        dict: Result with error placeholders and a score of 0
+    """
+    return {
+        "educationalQualification": ERROR_VALUE,
+        "jobHistory": ERROR_VALUE,
+        "skillSet": ERROR_VALUE,
+        "score": 0,
+        "justification": justification
+    }
+
+
+def is_error_result(result):
+    """Return True if the result is an error placeholder rather than an evaluation."""
+    return result.get("educationalQualification") == ERROR_VALUE
+
+
+# Justification prefix of CVs that were deliberately not evaluated (e.g. over budget)
+SKIPPED_PREFIX = "Skipped: "
+
+
+def build_skipped_result(reason):
+    """
+    Build the placeholder result for a CV that was not sent to the model.
+
+    Skipped CVs count as errors, so a --resume run picks them up again.
+
+    Args:
+        reason (str): Why the CV was skipped
+
+    Returns:
+        dict: Error placeholder whose justification starts with SKIPPED_PREFIX
+    """
+    return build_error_result(f"{SKIPPED_PREFIX}{reason}")
+
+
+def is_skipped_result(result):
+    """Return True if the result is a skipped-CV placeholder."""
+    return is_error_result(result) and str(result.get("justification", "")).startswith(SKIPPED_PREFIX)
+
+
+# Fields every evaluation must contain
+REQUIRED_FIELDS = ["educationalQualification", "jobHistory", "skillSet", "score", "justification"]
+
+
+def validate_result(result):
+    """
+    Check an evaluation for required fields and normalize its score.
+
+    Args:
+        result (dict): Parsed JSON evaluation from the model
+
+    Returns:
+        dict: The same result with score clamped to 0-100 and pass coerced to bool
+
+    Raises:
+        ValueError: If the result is not an object or a required field is missing
+    """
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+
+    # Validate required fields
+    for field in REQUIRED_FIELDS:
+        if field not in result:
+            raise ValueError(f"Missing required field: {field}")
+
+    # Ensure score is a number between 0 and 100
+    score = result["score"]
+    if isinstance(score, str):
+        score = float(score) if '.' in score else int(score)
+    elif not isinstance(score, (int, float)):
+        score = 0
+
+    result["score"] = max(0, min(100, score))  # Clamp score between 0 and 100
+
+    # Models sometimes quote booleans
+    if isinstance(result.get("pass"), str):
+        result["pass"] = result["pass"].strip().lower() in ("true", "yes", "1")
+
+    return result
+
+
+class UsageTally:
+    """
+    Thread-safe running totals of token usage and latency reported per API call.
+
+    Only the latest `window` latencies are kept, so a long-running process
+    does not grow this without bound; the totals cover every call.
+    """
+
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.latencies = deque(maxlen=window)
+        self.first_token_latencies = deque(maxlen=window)
+
+    def add(self, usage, latency, first_token_latency=None):
+        """
+        Record one completion.
+
+        Args:
+            usage (dict): Output of _extract_usage, or None if the stream had no usage
+            latency (float): Seconds from request to end of stream
+            first_token_latency (float): Seconds from request to first content token
+        """
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if first_token_latency is not None:
+                self.first_token_latencies.append(first_token_latency)
+            if usage is not None:
+                self.prompt_tokens += usage["prompt_tokens"]
+                self.cached_tokens += usage["cached_tokens"]
+                self.completion_tokens += usage["completion_tokens"]
+
+    @property
+    def cached_ratio(self):
+        """Fraction of prompt tokens served from the provider's prefix cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def latency_percentile(self, percent):
+        """
+        Args:
+            percent (float): 0-100
+
+        Returns:
+            float: Recent call latency at that percentile in seconds (0.0 with no calls)
+        """
+        with self._lock:
+            latencies = list(self.latencies)
+        return percentile(latencies, percent)
+
+
+# Token usage across every call made by this process
+usage_totals = UsageTally()
+
+
+def _extract_usage(chunk):
+    """
+    Read token usage from a stream chunk, if it carries any.
+
+    Groq sends usage on the final chunk under `x_groq.usage`; OpenAI-style
+    servers put it on `chunk.usage`.
+
+    Returns:
+        dict: prompt_tokens, cached_tokens and completion_tokens, or None
+    """
+    usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+    if usage is None:
+        return None
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+@lru_cache(maxsize=None)
+def build_system_message(evaluation_prompt):
+    """
+    Build the static system message for a role: rubric plus response schema.
+
+    The result is memoized and byte-identical for every CV of the role, so it
+    forms a shared prefix the provider can serve from its prompt cache. All
+    per-CV content goes in the user message that follows it.
+
+    Args:
+        evaluation_prompt (str): Prompt with evaluation criteria
+
+    Returns:
+        str: System message content
+    """
+    return f"""{evaluation_prompt.strip()}
+
+The CV to evaluate is provided in the next message. Respond with the JSON object only, with no additional text.
 """
 
-    max_retries = 3
-    retry_count = 0
 
-    while retry_count < max_retries:
+def configure_rate_limits(requests_per_minute=None, tokens_per_minute=None):
+    """
+    Set the client-side request and token budgets for all API calls.
+
+    Args:
+        requests_per_minute (int): Requests per minute, or None for no client-side limit
+        tokens_per_minute (int): Tokens per minute, or None for no client-side limit
+    """
+    global rate_limiter
+    rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+def configure_token_budget(max_total_tokens=None):
+    """
+    Cap the total prompt + completion tokens of all API calls in this run.
+
+    Args:
+        max_total_tokens (int): Token budget, or None for no limit
+
+    Returns:
+        TokenBudget: The budget, or None
+    """
+    global token_budget
+    token_budget = TokenBudget(max_total_tokens) if max_total_tokens else None
+    return token_budget
+
+
+def configure_hedging(enabled, percent=HEDGE_PERCENTILE, max_extra_rate=HEDGE_MAX_EXTRA_RATE):
+    """
+    Turn hedged requests on or off for single-CV evaluations.
+
+    Args:
+        enabled (bool): Send a duplicate request when a call is slower than usual
+        percent (float): Percentile of recent latencies after which to hedge
+        max_extra_rate (float): Hedges allowed per primary request
+
+    Returns:
+        HedgePolicy: The policy, or None when hedging is off
+    """
+    global hedge_policy
+    hedge_policy = HedgePolicy(percent, max_extra_rate, min_samples=HEDGE_MIN_SAMPLES, window=HEDGE_WINDOW,
+                               min_delay=HEDGE_MIN_DELAY_SECONDS) if enabled else None
+    return hedge_policy
+
+
+def estimate_call_tokens(user_content, evaluation_prompt, settings=DEFAULT_SETTINGS):
+    """
+    Pre-flight estimate of the tokens one call will use.
+
+    Args:
+        user_content (str): Per-request content (the CV or CVs)
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+
+    Returns:
+        int: Estimated prompt tokens plus expected completion tokens
+    """
+    return (estimate_tokens(build_system_message(evaluation_prompt)) + estimate_tokens(user_content)
+            + min(EXPECTED_COMPLETION_TOKENS, settings.max_completion_tokens))
+
+
+def build_cv_message(cv_content):
+    """User message content for evaluating a single CV."""
+    return f"CV Content:\n{cv_content}"
+
+
+class StreamProgress:
+    """How far a streamed call got, so a failed one can still be charged to the token budget."""
+
+    def __init__(self):
+        self.accepted = False  # The API accepted the request, so it bills what it generated
+        self.usage = None
+        self.pieces = []
+
+    def tokens_used(self, estimated_tokens, prompt_tokens):
+        """
+        Tokens a failed or interrupted call used.
+
+        Args:
+            estimated_tokens (int): The call's reservation (prompt plus expected completion)
+            prompt_tokens (int): Estimated prompt tokens
+
+        Returns:
+            int: 0 if the request was rejected, the reported usage if the
+                stream carried it, else the larger of the reservation and the
+                prompt plus the text streamed so far (reasoning tokens are
+                not streamed, so the text alone undercounts)
+        """
+        if not self.accepted:
+            return 0
+        if self.usage is not None:
+            return self.usage['prompt_tokens'] + self.usage['completion_tokens']
+        return max(estimated_tokens, prompt_tokens + estimate_tokens("".join(self.pieces)))
+
+
+def classify_api_error(exc):
+    """
+    Decide how to handle an exception raised by an API call.
+
+    Rate-limit headers carried by the error response are applied to the
+    shared rate limiter, so every worker backs off together.
+
+    Args:
+        exc (Exception): Exception raised by _stream_completion
+
+    Returns:
+        str: 'rate_limited' (wait for the limiter), 'malformed' (the model's
+            output failed JSON validation; retry immediately), 'transient'
+            (retry with backoff) or 'permanent' (do not retry)
+    """
+    from groq import APIStatusError  # Already imported once a call has been made
+
+    if isinstance(exc, TokenBudgetExceeded):
+        return 'permanent'
+    if not isinstance(exc, APIStatusError):
+        # Connection errors, timeouts and stream interruptions
+        return 'transient'
+
+    status = exc.status_code
+    if status == 429:
+        headers = exc.response.headers if exc.response is not None else None
+        rate_limiter.update_from_headers(headers)
+        if not headers or not headers.get('retry-after'):
+            # No server hint: pause everyone for a short jittered backoff
+            rate_limiter.pause_for(backoff_delay(1))
+        return 'rate_limited'
+    if status == 400 and 'json_validate_failed' in str(exc):
+        return 'malformed'
+    if status in RETRYABLE_STATUS_CODES or status >= 500:
+        return 'transient'
+    return 'permanent'
+
+
+def _stream_completion(user_content, evaluation_prompt, settings=DEFAULT_SETTINGS, json_mode=JSON_MODE,
+                       stats=None, token_limit=None, control=None):
+    """
+    Send one chat completion and return the streamed text.
+
+    The stream is read until the first top-level JSON object (or array)
+    closes; if the model keeps generating text after that, the stream is
+    closed early.
+
+    Args:
+        user_content (str): Per-request content (the CV or CVs)
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        json_mode (bool): Ask the API for a JSON object response
+        stats (CallStats): Per-CV stats to record this call in, or None
+        token_limit (int): Tokens this CV may use across all its calls
+            (checked against the usage already recorded in `stats`), or None
+        control (RequestControl): Cancellation and first-token signals when
+            the call is raced against a hedge, or None
+
+    Returns:
+        str: Response text up to the end of the first JSON object or array
+
+    Raises:
+        TokenBudgetExceeded: If the call would exceed the per-CV or run budget
+        RequestCancelled: If `control` was cancelled while the call was running
+    """
+    extra_options = {}
+    if json_mode:
+        extra_options["response_format"] = {"type": "json_object"}
+    if settings.reasoning_effort and settings.reasoning_effort != REASONING_EFFORT_OFF:
+        # Sent as a raw body field so older SDK versions without the parameter still work
+        extra_options["extra_body"] = {"reasoning_effort": settings.reasoning_effort}
+
+    api_client = get_client()
+    system_message = build_system_message(evaluation_prompt)
+    estimated_tokens = estimate_call_tokens(user_content, evaluation_prompt, settings)
+
+    if token_limit is not None:
+        used = stats.prompt_tokens + stats.completion_tokens if stats is not None else 0
+        if used + estimated_tokens > token_limit:
+            raise TokenBudgetExceeded(f"per-CV token budget of {token_limit} reached "
+                                      f"({used} used, {estimated_tokens} needed)")
+    budget = token_budget
+    if budget is not None:
+        budget.reserve(estimated_tokens, optional=control is not None and control.optional)
+
+    progress = StreamProgress()
+    actual_tokens = 0
+    try:
+        response_text, actual_tokens = _send_and_stream(api_client, system_message, user_content, settings,
+                                                        extra_options, estimated_tokens, stats, control, progress)
+    except Exception as e:
+        # Rejected requests are not billed; a stream that broke or was cancelled
+        # is billed for what was generated before it stopped
+        completion_estimate = min(EXPECTED_COMPLETION_TOKENS, settings.max_completion_tokens)
+        actual_tokens = progress.tokens_used(estimated_tokens, estimated_tokens - completion_estimate)
+        if control is None or not control.cancelled.is_set():
+            raise
+        if isinstance(e, RequestCancelled):
+            raise
+        raise RequestCancelled() from e
+    finally:
+        if budget is not None:
+            budget.settle(estimated_tokens, actual_tokens)
+    return response_text
+
+
+def _send_and_stream(api_client, system_message, user_content, settings, extra_options, estimated_tokens, stats,
+                     control=None, progress=None):
+    """
+    Send the request and read the stream (the body of _stream_completion).
+
+    `progress` (StreamProgress), if given, is kept up to date as the stream
+    is read, for charging a call that fails part-way.
+
+    Returns:
+        tuple: (response text, tokens used as reported by the API, or the
+            estimate if the stream carried no usage)
+    """
+    waited_from = time.monotonic()
+    if control is None or control.rate_limited:
+        rate_limiter.acquire(estimated_tokens)
+
+    started = time.monotonic()
+    first_token_at = None
+
+    # Call Groq API with streaming to match your requirements
+    # Note: Using a currently supported model on Groq
+    raw_response = api_client.chat.completions.with_raw_response.create(
+        model=settings.model,
+        messages=[
+            {
+                "role": "system",
+                "content": system_message,
+            },
+            {
+                "role": "user",
+                "content": user_content,
+            }
+        ],
+        temperature=settings.temperature,
+        max_completion_tokens=settings.max_completion_tokens,
+        top_p=settings.top_p,
+        stream=True,  # Enable streaming as per your request
+        stop=None,
+        **extra_options
+    )
+    rate_limiter.update_from_headers(raw_response.headers)
+    if progress is None:
+        progress = StreamProgress()
+    progress.accepted = True
+    completion = raw_response.parse()
+    if control is not None and getattr(completion, "close", None) is not None:
+        # Lets the winning request of a hedged pair close this stream
+        control.attach(completion.close)
+
+    # Collect the streamed response
+    pieces = progress.pieces
+    # Batch answers may be a bare array; it must not be cut after its first item
+    scanner = JsonObjectScanner(arrays=True)
+    usage = None
+    for chunk in completion:
+        if control is not None and control.cancelled.is_set():
+            raise RequestCancelled()
+        usage = progress.usage = _extract_usage(chunk) or usage
+        content = chunk.choices[0].delta.content if chunk.choices else None
+        if not content:
+            continue
+        if first_token_at is None:
+            first_token_at = time.monotonic()
+            if control is not None:
+                control.first_token.set()
+        if scanner.complete:
+            # The answer is already complete; don't pay for trailing text.
+            # (Empty chunks are still drained so the final usage chunk is seen.)
+            if content.strip():
+                close = getattr(completion, "close", None)
+                if close is not None:
+                    close()
+                break
+            continue
+        pieces.append(content)
+        scanner.feed(content)
+
+    if control is not None and control.cancelled.is_set():
+        # Closing the stream from another thread can end the iteration quietly
+        raise RequestCancelled()
+
+    response_text = "".join(pieces)
+    if scanner.complete:
+        response_text = response_text[:scanner.end]
+
+    latency = time.monotonic() - started
+    first_token_latency = first_token_at - started if first_token_at is not None else None
+    usage_totals.add(usage, latency, first_token_latency)
+    if control is not None and hedge_policy is not None:
+        hedge_policy.record(latency, first_token_latency)
+    if stats is not None:
+        stats.add_call(usage, latency, first_token_latency, started - waited_from)
+    actual_tokens = usage['prompt_tokens'] + usage['completion_tokens'] if usage is not None else estimated_tokens
+    if usage is not None:
+        rate_limiter.adjust_tokens(actual_tokens - estimated_tokens)
+        logger.debug(f"Call took {latency:.2f}s: {usage['prompt_tokens']} prompt tokens "
+                     f"({usage['cached_tokens']} cached), {usage['completion_tokens']} completion tokens")
+
+    return response_text, actual_tokens
+
+
+def _run_in_thread(function, *args, **kwargs):
+    """
+    Call a function on a new daemon thread.
+
+    A cancelled request may stay blocked on its socket for a while; daemon
+    threads never keep the process alive waiting for one.
+
+    Returns:
+        Future: Resolves to the function's result or exception
+    """
+    future = Future()
+
+    def run():
         try:
-            # Call Groq API with streaming to match your requirements
-            # Note: Using a currently supported model on Groq
-            completion = client.chat.completions.create(
-                model="openai/gpt-oss-120b",  # Using a currently supported Groq model
-                messages=[
-                    {
-                        "role": "user",
-                        "content": full_prompt,
-                    }
-                ],
-                temperature=1,  # Match your specified temperature
-                max_completion_tokens=8192,
-                top_p=1,
-                stream=True,  # Enable streaming as per your request
-                stop=None
-            )
+            future.set_result(function(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name='hedged-request', daemon=True).start()
+    return future
+
+
+def _is_valid_response(response_text):
+    """Return True if the text parses (with repair) into a valid evaluation."""
+    try:
+        validate_result(repair_json(response_text))
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _may_hedge(estimated_tokens, remaining_cv_tokens):
+    """
+    Decide whether a hedge may be sent now, taking its rate-limit capacity.
+
+    Args:
+        estimated_tokens (int): Estimated tokens of the hedge
+        remaining_cv_tokens (int): Per-CV tokens left after the primary call, or None
+
+    Returns:
+        bool: True if the hedge should be sent
+    """
+    if remaining_cv_tokens is not None and remaining_cv_tokens < estimated_tokens:
+        return False
+    if token_budget is not None and token_budget.remaining < estimated_tokens:
+        return False
+    if not hedge_policy.try_hedge():
+        return False
+    if not rate_limiter.try_acquire(estimated_tokens):
+        hedge_policy.refund()
+        return False
+    return True
+
+
+def _complete(user_content, evaluation_prompt, settings, stats, token_limit):
+    """
+    Send one single-CV completion, hedged when hedging is enabled.
+
+    Args:
+        user_content (str): Per-request content
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        stats (CallStats): Per-CV stats
+        token_limit (int): Per-CV token budget, or None
+
+    Returns:
+        str: Response text
+    """
+    policy = hedge_policy
+    if policy is None:
+        return _stream_completion(user_content, evaluation_prompt, settings, stats=stats, token_limit=token_limit)
+
+    policy.note_primary()
+    delays = policy.delays()
+    if delays is None:
+        # Too few calls yet to know what "slow" means; the control records this call's latency
+        return _stream_completion(user_content, evaluation_prompt, settings, stats=stats, token_limit=token_limit,
+                                  control=RequestControl())
+    return _hedged_completion(user_content, evaluation_prompt, settings, stats, token_limit, delays)
+
 
-            # Collect the streamed response
-            response_text = ""
-            for chunk in completion:
-                content = chunk.choices[0].delta.content
-                if content:
-                    response_text += content
+def _hedged_completion(user_content, evaluation_prompt, settings, stats, token_limit, delays):
+    """
+    Send a request and race a duplicate against it if it is slow.
+
+    The primary request runs on a helper thread. If it has produced no token
+    after the first-token delay, or has not finished after the total delay, a
+    hedge is sent as well (when the hedge credit, rate limits and token
+    budgets allow). The first valid response wins and the other request is
+    cancelled. If neither response is valid, the first one received is
+    returned so evaluate_cv can retry as usual.
+
+    Args:
+        user_content (str): Per-request content
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        stats (CallStats): Per-CV stats; the racers' stats are merged into it
+        token_limit (int): Per-CV token budget, or None
+        delays (tuple): (first-token delay, total delay) from HedgePolicy.delays()
+
+    Returns:
+        str: Response text
+
+    Raises:
+        Exception: The first error raised, if no request returned a response
+    """
+    first_token_delay, total_delay = delays
+    estimated_tokens = estimate_call_tokens(user_content, evaluation_prompt, settings)
+    remaining = token_limit - stats.prompt_tokens - stats.completion_tokens if token_limit is not None else None
 
-            # Parse the JSON response
+    # Wait for the rate limiter here, so the hedging clock starts when the request goes out
+    waited_from = time.monotonic()
+    rate_limiter.acquire(estimated_tokens)
+    stats.rate_limit_wait += time.monotonic() - waited_from
+
+    racers = []
+
+    def launch(limit, is_hedge):
+        control = RequestControl(rate_limited=False, optional=is_hedge)
+        racer_stats = CallStats()
+        future = _run_in_thread(_stream_completion, user_content, evaluation_prompt, settings,
+                                stats=racer_stats, token_limit=limit, control=control)
+        racers.append((future, control, racer_stats, is_hedge))
+        return future, control
+
+    sent_at = time.monotonic()
+    primary, primary_control = launch(remaining, False)
+    done, _ = wait([primary], timeout=first_token_delay)
+    if not done and primary_control.first_token.is_set():
+        done, _ = wait([primary], timeout=max(0.0, sent_at + total_delay - time.monotonic()))
+
+    hedge_limit = remaining - estimated_tokens if remaining is not None else None
+    if not done and _may_hedge(estimated_tokens, hedge_limit):
+        waited = time.monotonic() - sent_at
+        logger.debug(f"Hedging a call after {waited:.2f}s "
+                     f"({'streaming' if primary_control.first_token.is_set() else 'no first token'})")
+        stats.hedges += 1
+        launch(hedge_limit, True)
+
+    winner = None
+    fallback = None
+    error = None
+    pending = {future for future, _, _, _ in racers}
+    while pending and winner is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future, _, _, _ in racers:
+            if future not in done:
+                continue
             try:
-                result = json.loads(response_text)
+                response_text = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            if _is_valid_response(response_text):
+                winner = future
+                break
+            if fallback is None:
+                fallback = future
 
-                # Validate required fields
-                required_fields = ["educationalQualification", "jobHistory", "skillSet", "score", "justification"]
-                for field in required_fields:
-                    if field not in result:
-                        raise ValueError(f"Missing required field: {field}")
+    used = winner or fallback or primary
+    for future, control, racer_stats, is_hedge in racers:
+        if not future.done():
+            control.cancel()
+            continue
+        # Only finished requests are merged; a loser still closing its stream may be writing to its stats
+        stats.merge(racer_stats, timings=future is used)
+        if future is winner and is_hedge:
+            stats.hedge_wins += 1
+            hedge_policy.note_win()
 
-                # Ensure score is a number between 0 and 100
-                score = result["score"]
-                if isinstance(score, str):
-                    score = float(score) if '.' in score else int(score)
-                elif not isinstance(score, (int, float)):
-                    score = 0
+    if winner is None and fallback is None:
+        raise error
+    return used.result()
 
-                result["score"] = max(0, min(100, score))  # Clamp score between 0 and 100
 
-                return result
+def evaluate_cv(cv_content, evaluation_prompt, settings=DEFAULT_SETTINGS, stats=None, token_limit=None,
+                retry_invalid=True):
+    """
+    Evaluate CV content using Groq AI API.
 
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to decode JSON response: {e}")
-                logger.debug(f"Response text: {response_text}")
-                raise
-            except ValueError as e:
-                logger.error(f"Validation error in response: {e}")
-                logger.debug(f"Response: {result}")
-                raise
-                
+    Args:
+        cv_content (str): Markdown content of the CV
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        stats (CallStats): Filled with timings, tokens, retries and errors, if given
+        token_limit (int): Tokens this CV may use across all attempts, or None.
+            When the per-CV or run budget would be exceeded, a skipped result
+            is returned instead of calling the API.
+        retry_invalid (bool): Retry a response that fails validation; when
+            False an error result is returned at once (the cascade escalates
+            it to the large model instead)
+
+    Returns:
+        dict: Evaluation results with keys: educationalQualification, jobHistory, skillSet, score, justification
+    """
+
+    # Raises straight away (no retries) when the API key is missing
+    get_client()
+
+    # The rubric lives in the shared system message; only the CV varies
+    user_content = build_cv_message(cv_content)
+
+    stats = stats if stats is not None else CallStats()
+    max_retries = MAX_RETRIES
+    retry_count = 0
+    # 429s mean the limiter is pacing us, not that the call is failing: they
+    # are retried until a deadline instead of counting against max_retries
+    rate_limited_until = None
+
+    while retry_count < max_retries:
+        try:
+            response_text = _complete(user_content, evaluation_prompt, settings, stats, token_limit)
+        except TokenBudgetExceeded as e:
+            logger.warning(f"Not calling the API: {e}")
+            return build_skipped_result(str(e))
         except Exception as e:
+            kind = classify_api_error(e)
+            if kind == 'rate_limited':
+                now = time.monotonic()
+                if rate_limited_until is None:
+                    rate_limited_until = now + RATE_LIMIT_MAX_WAIT_SECONDS
+                waiting = now < rate_limited_until
+                logger.warning(f"Rate limited by the Groq API: {str(e)}")
+                stats.add_error(e, retried=waiting)
+                if not waiting:
+                    return build_error_result(f"API Error: still rate limited after "
+                                              f"{RATE_LIMIT_MAX_WAIT_SECONDS}s: {str(e)}")
+                # Waits in rate_limiter.acquire() before the next attempt
+                continue
+
             logger.error(f"Error calling Groq API (attempt {retry_count + 1}): {str(e)}")
             retry_count += 1
-            
+            stats.add_error(e, retried=kind != 'permanent' and retry_count < max_retries)
+
+            if kind == 'permanent':
+                # Bad request, auth or unknown model: retrying cannot help
+                return build_error_result(f"API Error: {str(e)}")
             if retry_count >= max_retries:
                 # Return default error result after max retries
-                return {
-                    "educationalQualification": "Error processing",
-                    "jobHistory": "Error processing", 
-                    "skillSet": "Error processing",
-                    "score": 0,
-                    "justification": f"API Error after {max_retries} attempts: {str(e)}"
-                }
-            
-            # Wait before retrying (exponential backoff)
-            time.sleep(2 ** retry_count)
\ No newline at end of file
+                return build_error_result(f"API Error after {max_retries} attempts: {str(e)}")
+
+            if kind == 'transient':
+                # Wait before retrying (exponential backoff with jitter)
+                delay = backoff_delay(retry_count)
+                stats.backoff += delay
+                time.sleep(delay)
+            # 'malformed' retries at once
+            continue
+
+        # Parse the JSON response, repairing it locally before giving up on it
+        try:
+            return validate_result(repair_json(response_text))
+        except (ValueError, TypeError) as e:
+            # Malformed output is not a server problem: retry without backing off
+            logger.error(f"Invalid response (attempt {retry_count + 1}): {e}")
+            logger.debug(f"Response text: {response_text}")
+            retry_count += 1
+            stats.add_error(e, retried=retry_invalid and retry_count < max_retries)
+
+            if not retry_invalid:
+                return build_error_result(f"Invalid response: {str(e)}")
+            if retry_count >= max_retries:
+                return build_error_result(f"Invalid response after {max_retries} attempts: {str(e)}")
+
+
+def _parse_batch_response(response_text, filenames):
+    """
+    Extract valid per-CV results from a batch response.
+
+    Args:
+        response_text (str): Raw model output, expected to be {"results": [...]}
+        filenames (list): Filenames that were sent in the batch
+
+    Returns:
+        dict: Validated results keyed by filename (invalid or missing items are absent)
+    """
+    data = repair_json(response_text)
+    if isinstance(data, dict):
+        # Tolerate the array being wrapped in an object, e.g. {"results": [...]}
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array, got {type(data).__name__}")
+
+    expected = set(filenames)
+    results = {}
+    for item in data:
+        filename = item.get("filename") if isinstance(item, dict) else None
+        if filename not in expected or filename in results:
+            logger.warning(f"Ignoring batch item with unexpected filename: {filename!r}")
+            continue
+        try:
+            del item["filename"]
+            results[filename] = validate_result(item)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid batch item for {filename}: {e}")
+
+    return results
+
+
+def evaluate_cv_batch(cvs, evaluation_prompt, settings=DEFAULT_SETTINGS, stats=None, token_limit=None,
+                      retry_invalid=True):
+    """
+    Evaluate several CVs in a single chat completion.
+
+    The role prompt is sent once for the whole batch and the model returns a
+    "results" array keyed by filename. Items that are missing or fail validation
+    (or the whole batch, if the response cannot be parsed) fall back to
+    individual evaluate_cv calls.
+
+    Args:
+        cvs (list): (filename, markdown content) pairs; filenames must be unique
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        stats (list): One CallStats per CV, if given; the batch call's
+            tokens are split evenly between the CVs it covered
+        token_limit (int): Per-CV token budget, or None. The batch call may
+            use what its CVs have left of their budgets combined (a batch that
+            would not fit is split into single-CV calls); each fallback call
+            is held to its own CV's budget.
+        retry_invalid (bool): Passed on to the single-CV fallback calls (see evaluate_cv)
+
+    Returns:
+        list: Evaluation results in the same order as `cvs`
+    """
+    stats = stats if stats is not None else [CallStats() for _ in cvs]
+    if len(cvs) == 1:
+        return [evaluate_cv(cvs[0][1], evaluation_prompt, settings, stats=stats[0], token_limit=token_limit,
+                            retry_invalid=retry_invalid)]
+
+    get_client()
+    filenames = [filename for filename, _ in cvs]
+    cv_sections = "\n\n".join(
+        f"=== CV: {filename} ===\n{content}\n=== END CV: {filename} ==="
+        for filename, content in cvs
+    )
+
+    user_content = f"""You will evaluate {len(cvs)} CVs below. Evaluate each one independently against the same criteria;
+do not compare candidates with each other.
+
+{cv_sections}
+
+For this request, respond with a single JSON object whose "results" array contains exactly
+one object per CV, in the same order, each using the structure above plus the CV's filename:
+{{
+  "results": [
+    {{
+      "filename": "<CV filename>",
+      "educationalQualification": "",
+      "jobHistory": "",
+      "skillSet": "",
+      "level": "",
+      "score": 0,
+      "pass": false,
+      "justification": ""
+    }}
+  ]
+}}
+"""
+
+    results = {}
+    batch_stats = CallStats()
+    batch_limit = None
+    if token_limit is not None:
+        # E.g. cascade escalations arrive with their fast-model tokens already used
+        batch_limit = sum(max(0, token_limit - cv_stats.prompt_tokens - cv_stats.completion_tokens)
+                          for cv_stats in stats)
+    try:
+        response_text = _stream_completion(user_content, evaluation_prompt, settings, stats=batch_stats,
+                                           token_limit=batch_limit)
+        results = _parse_batch_response(response_text, filenames)
+    except TokenBudgetExceeded as e:
+        # Each CV is tried on its own below and skipped if it does not fit either
+        logger.warning(f"Not sending batch of {len(cvs)} CVs: {e}")
+    except Exception as e:
+        logger.error(f"Batch evaluation of {len(cvs)} CVs failed: {str(e)}")
+        # Apply any rate-limit pause before the single-CV fallback calls go out
+        classify_api_error(e)
+        batch_stats.add_error(e, retried=True)
+
+    for position, cv_stats in enumerate(stats):
+        cv_stats.add_share(batch_stats, 1 / len(cvs), counts=position == 0)
+
+    missing = [filename for filename in filenames if filename not in results]
+    if missing:
+        logger.warning(f"Falling back to single-CV evaluation for {len(missing)} of {len(cvs)} CVs")
+
+    return [
+        results[filename] if filename in results
+        else evaluate_cv(content, evaluation_prompt, settings, stats=cv_stats, token_limit=token_limit,
+                         retry_invalid=retry_invalid)
+        for (filename, content), cv_stats in zip(cvs, stats)
+    ]
@@ -0,0 +1,74 @@
+"""
+Token budgets for a run.
+
+A TokenBudget caps the total tokens (prompt + completion) a run may spend.
+Every API call reserves its estimated tokens before it is sent and settles
+the reservation with the usage reported in the stream, so concurrent calls
+cannot overshoot the budget by more than the estimation error.
+"""
+
+import threading
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a call would exceed the run or per-CV token budget."""
+
+
+class TokenBudget:
+    """Thread-safe run-wide token budget."""
+
+    def __init__(self, max_tokens):
+        """
+        Args:
+            max_tokens (int): Total prompt + completion tokens the run may use
+        """
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self.used = 0
+        self.reserved = 0
+        self.exhausted = False
+
+    @property
+    def remaining(self):
+        """Tokens neither used nor reserved by calls in flight."""
+        with self._lock:
+            return max(0, self.max_tokens - self.used - self.reserved)
+
+    def reserve(self, tokens, optional=False):
+        """
+        Reserve tokens for one API call.
+
+        Once a reservation fails the budget counts as exhausted, so no new
+        work is scheduled even if a smaller call would still fit.
+
+        Args:
+            tokens (int): Estimated prompt + completion tokens of the call
+            optional (bool): The call is optional (a hedge); failing to fit
+                does not mark the budget exhausted
+
+        Raises:
+            TokenBudgetExceeded: If the call does not fit in what is left
+        """
+        with self._lock:
+            if self.used + self.reserved + tokens > self.max_tokens:
+                if not optional:
+                    self.exhausted = True
+                raise TokenBudgetExceeded(
+                    f"run token budget of {self.max_tokens} reached ({self.used} used, "
+                    f"{self.reserved} in flight, {tokens} needed)")
+            self.reserved += tokens
+
+    def settle(self, reserved, actual):
+        """
+        Replace a reservation with the tokens the call actually used.
+
+        Args:
+            reserved (int): Tokens passed to reserve()
+            actual (int): Tokens reported by the API (0 if the request was
+                rejected; see StreamProgress for calls that failed part-way)
+        """
+        with self._lock:
+            self.reserved -= reserved
+            self.used += actual
+            if self.used >= self.max_tokens:
+                self.exhausted = True
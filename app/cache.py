@@ -0,0 +1,161 @@
+"""
+Persistent on-disk JSON cache used to skip repeated work between runs.
+Entries are stored one file per key and evicted by age and count.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 hex digest of a file's bytes.
+
+    Args:
+        path (Path): Path to the file
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_sha256(text):
+    """
+    Compute the SHA-256 hex digest of a string.
+
+    Args:
+        text (str): Text to hash
+
+    Returns:
+        str: Hex digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def make_key(*parts):
+    """
+    Combine several key parts into a single cache key.
+
+    Args:
+        *parts: Values that together identify a cache entry
+
+    Returns:
+        str: Hex digest usable as a cache key
+    """
+    return text_sha256('\0'.join(str(part) for part in parts))
+
+
+class DiskCache:
+    """
+    A directory of JSON files keyed by hex digests.
+
+    Writes are atomic (temp file + rename), so concurrent workers and
+    processes can share one cache directory safely.
+    """
+
+    def __init__(self, directory, max_age_days=None, max_entries=None):
+        """
+        Args:
+            directory (str | Path): Directory holding the cache entries
+            max_age_days (float): Entries older than this are treated as missing
+            max_entries (int): Upper bound on entries kept by evict()
+        """
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.max_entries = max_entries
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _is_expired(self, mtime, now):
+        return self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+
+    def get(self, key):
+        """
+        Look up a cache entry.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            The cached value, or None on a miss or an expired/corrupt entry
+        """
+        path = self._path(key)
+        try:
+            if self._is_expired(path.stat().st_mtime, time.time()):
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value under a key.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+        """
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+
+    def evict(self):
+        """
+        Remove expired entries, then the oldest entries beyond max_entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+
+        for path in self.directory.glob('*/*.json'):
+            try:
+                mtime = path.stat().st_mtime
+                if self._is_expired(mtime, now):
+                    path.unlink()
+                    removed += 1
+                else:
+                    entries.append((mtime, path))
+            except OSError:
+                continue
+
+        if self.max_entries is not None and len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+
+        if removed:
+            logger.info(f"Evicted {removed} entries from cache {self.directory}")
+        return removed
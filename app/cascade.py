@@ -0,0 +1,201 @@
+"""
+Two-tier model cascade: a fast model scores every CV first, and only the
+uncertain ones are re-scored by the large model.
+
+Most candidates are clearly above or clearly below the pass mark, and a
+small model gets those right at a fraction of the latency and cost. A CV is
+escalated to the large model when the fast score falls within a band around
+the pass mark, or when the fast model's answer fails validation (it is not
+retried on the fast model). Each result records the tier that produced it.
+"""
+
+import logging
+import threading
+
+from ai_evaluator import evaluate_cv, evaluate_cv_batch, is_error_result, is_skipped_result
+from config import CASCADE_PASS_SCORE, CASCADE_BAND
+
+logger = logging.getLogger(__name__)
+
+TIER_FAST = 'fast'
+TIER_LARGE = 'large'
+
+# Why a CV was escalated
+ESCALATION_REASONS = ('uncertain', 'invalid')
+
+
+class Cascade:
+    """Which model scores first, and when its answer is not good enough."""
+
+    def __init__(self, fast_settings, pass_score=CASCADE_PASS_SCORE, band=CASCADE_BAND):
+        """
+        Args:
+            fast_settings (GenerationSettings): Settings of the first-pass model
+            pass_score (float): The rubric's pass mark
+            band (float): Fast scores within this many points of the pass
+                mark (inclusive) are escalated
+        """
+        self.fast_settings = fast_settings
+        self.pass_score = pass_score
+        self.band = band
+
+    def escalation_reason(self, result):
+        """
+        Decide whether a fast-model result must be re-scored by the large model.
+
+        Args:
+            result (dict): Output of evaluate_cv on the fast model
+
+        Returns:
+            str: A key of ESCALATION_REASONS, or None to keep the result
+        """
+        if is_skipped_result(result):
+            # Over budget: the large model would not fit either
+            return None
+        if is_error_result(result):
+            return 'invalid'
+        if abs(result['score'] - self.pass_score) <= self.band:
+            return 'uncertain'
+        return None
+
+    def cache_variant(self):
+        """Evaluation cache key part, so cascaded and single-model results are kept apart."""
+        return (f"cascade-{self.fast_settings.model}-{self.fast_settings.reasoning_effort}-"
+                f"{self.pass_score}-{self.band}")
+
+
+class CascadeTally:
+    """Thread-safe run totals of how many CVs each tier settled."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cvs = 0
+        self.escalated = {reason: 0 for reason in ESCALATION_REASONS}
+        self.tokens = {TIER_FAST: 0, TIER_LARGE: 0}
+
+    def add(self, reason, fast_tokens, large_tokens=0):
+        """
+        Record one cascaded CV.
+
+        Args:
+            reason (str): Why it was escalated, or None if the fast result was kept
+            fast_tokens (int): Tokens used by the fast model
+            large_tokens (int): Tokens used by the large model
+        """
+        with self._lock:
+            self.cvs += 1
+            if reason is not None:
+                self.escalated[reason] += 1
+            self.tokens[TIER_FAST] += fast_tokens
+            self.tokens[TIER_LARGE] += large_tokens
+
+    @property
+    def escalation_rate(self):
+        """Fraction of cascaded CVs re-scored by the large model."""
+        return sum(self.escalated.values()) / self.cvs if self.cvs else 0.0
+
+    def format_report(self):
+        """One-line summary for the end-of-run log."""
+        escalated = sum(self.escalated.values())
+        return (f"Cascade: {self.cvs - escalated} of {self.cvs} CVs settled by the fast model, "
+                f"{escalated} escalated ({self.escalation_rate:.0%}: {self.escalated['uncertain']} uncertain, "
+                f"{self.escalated['invalid']} invalid); tokens: {self.tokens[TIER_FAST]} fast, "
+                f"{self.tokens[TIER_LARGE]} large")
+
+
+def _call_tokens(stats):
+    return stats.prompt_tokens + stats.completion_tokens
+
+
+def evaluate_cv_cascade(cv_content, evaluation_prompt, settings, cascade, stats, token_limit=None,
+                        cascade_tally=None, filename=None):
+    """
+    Evaluate a CV with the fast model, escalating to the large model if needed.
+
+    Args:
+        cv_content (str): Markdown content of the CV
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Settings of the large model
+        cascade (Cascade): Fast-model settings and escalation rule
+        stats (CallStats): Filled with the calls of both tiers
+        token_limit (int): Tokens this CV may use across both tiers, or None
+        cascade_tally (CascadeTally): Run totals, or None
+        filename (str): CV filename, for the log
+
+    Returns:
+        dict: Evaluation result with a 'tier' key
+    """
+    result = evaluate_cv(cv_content, evaluation_prompt, cascade.fast_settings, stats=stats,
+                         token_limit=token_limit, retry_invalid=False)
+    return _escalate([((filename, cv_content), result, stats)], evaluation_prompt, settings, cascade, token_limit,
+                     cascade_tally, batch=False)[0]
+
+
+def evaluate_cv_batch_cascade(cvs, evaluation_prompt, settings, cascade, stats, token_limit=None,
+                              cascade_tally=None):
+    """
+    Evaluate a batch with the fast model, then the escalated CVs with the large model.
+
+    Args:
+        cvs (list): (filename, markdown content) pairs; filenames must be unique
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Settings of the large model
+        cascade (Cascade): Fast-model settings and escalation rule
+        stats (list): One CallStats per CV
+        token_limit (int): Per-CV token budget, or None
+        cascade_tally (CascadeTally): Run totals, or None
+
+    Returns:
+        list: Evaluation results with a 'tier' key, in the same order as `cvs`
+    """
+    results = evaluate_cv_batch(cvs, evaluation_prompt, cascade.fast_settings, stats=stats,
+                                token_limit=token_limit, retry_invalid=False)
+    return _escalate([(cv, result, cv_stats) for cv, result, cv_stats in zip(cvs, results, stats)],
+                     evaluation_prompt, settings, cascade, token_limit, cascade_tally)
+
+
+def _escalate(items, evaluation_prompt, settings, cascade, token_limit, cascade_tally, batch=True):
+    """
+    Re-score the fast results that need it with the large model (as one batch).
+
+    Args:
+        items (list): ((filename, CV text), fast result, CallStats) triples
+        batch (bool): Send the escalated CVs with evaluate_cv_batch
+
+    Returns:
+        list: Final results, in the same order as `items`
+    """
+    fast_tokens = [_call_tokens(cv_stats) for _, _, cv_stats in items]
+    reasons = [cascade.escalation_reason(result) for _, result, _ in items]
+    # A CV skipped for its token budget was not scored by either model
+    final = [result if is_skipped_result(result) else {**result, 'tier': TIER_FAST} for _, result, _ in items]
+
+    escalate = [position for position, reason in enumerate(reasons) if reason is not None]
+    for position in escalate:
+        (filename, _), result, _ = items[position]
+        logger.info(f"Escalating {filename or 'CV'} to {settings.model}: "
+                    + (f"fast score {result['score']} is within {cascade.band:g} of {cascade.pass_score}"
+                       if reasons[position] == 'uncertain' else "invalid fast-model response"))
+
+    if escalate and batch:
+        escalated = evaluate_cv_batch([items[position][0] for position in escalate], evaluation_prompt, settings,
+                                      stats=[items[position][2] for position in escalate], token_limit=token_limit)
+    elif escalate:
+        (_, content), _, cv_stats = items[0]
+        escalated = [evaluate_cv(content, evaluation_prompt, settings, stats=cv_stats, token_limit=token_limit)]
+    else:
+        escalated = []
+    for position, result in zip(escalate, escalated):
+        if is_skipped_result(result) and reasons[position] == 'uncertain':
+            # Out of budget for the large model: the fast score is better than nothing
+            logger.warning(f"Keeping the fast-model score of {items[position][0][0] or 'CV'}: "
+                           f"{result['justification']}")
+            continue
+        final[position] = {**result, 'tier': TIER_LARGE}
+
+    if cascade_tally is not None:
+        for position, (_, result, cv_stats) in enumerate(items):
+            if is_skipped_result(result):
+                continue
+            cascade_tally.add(reasons[position], fast_tokens[position], _call_tokens(cv_stats) - fast_tokens[position])
+    return final
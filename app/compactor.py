@@ -0,0 +1,269 @@
+"""
+CV compaction: shrink parsed CV text before it is sent to the model.
+
+The parsed Markdown is split into sections on '# ' header lines (and on short
+capitalised or section-keyword lines the parser set at body size), duplicated
+lines (page headers/footers repeated on every page) and non-evaluative
+sections (contact details, hobbies, references) are dropped, and what is left
+is trimmed to a token budget, keeping the highest-signal sections first.
+"""
+
+import re
+import threading
+from collections import namedtuple
+from prompt_builder import estimate_tokens
+
+# Bump whenever compaction output changes so cached evaluations are not reused
+COMPACTOR_VERSION = 3
+
+# Section kinds by header keywords (English and Vietnamese), checked in order;
+# strings match anywhere in the header, compiled patterns are searched
+SECTION_KEYWORDS = [
+    ('experience', ('experience', 'employment', 'work history', re.compile(r'\binterns?(?:hips?)?\b'),
+                    'kinh nghiệm')),
+    ('projects', ('project', 'dự án')),
+    ('skills', ('skill', 'kỹ năng', 'technolog', 'tech stack', 'framework', 'ngôn ngữ lập trình')),
+    ('education', ('education', 'học vấn', 'academic', 'đào tạo', 'training')),
+    ('certifications', ('certific', 'chứng chỉ', 'award', 'giải thưởng', 'achievement')),
+    ('drop', ('contact', 'personal', 'thông tin cá nhân', 'liên hệ', 'interest', 'hobbies',
+              'hobby', 'sở thích', 'reference', 'tham chiếu', 'người giới thiệu')),
+    ('summary', ('summary', 'objective', 'overview', 'profile', 'mục tiêu', 'giới thiệu',
+                 'about')),
+]
+
+# Lower number = kept first when the budget is tight (education is usually
+# short, so keeping it early costs little)
+SECTION_PRIORITY = {
+    'experience': 0,
+    'education': 1,
+    'skills': 2,
+    'projects': 3,
+    'summary': 4,
+    'certifications': 5,
+    'other': 6,
+}
+
+# Unmarked lines this short are headings when written in capitals ("EDUCATION")
+# or when they name a section ("Work Experience"); the parser only marks
+# headings set in a larger font
+HEADING_MAX_LENGTH = 40
+HEADING_MAX_WORDS = 4
+# Words that may accompany a section keyword in such a heading; any other word
+# ("Trello Project", "Information Technology") makes the line content
+HEADING_MODIFIERS = {
+    'work', 'professional', 'technical', 'personal', 'key', 'relevant', 'other', 'additional', 'soft', 'hard',
+    'and', 'my', 'làm', 'việc', 'cá', 'nhân', 'mềm', 'khác',
+}
+_WORD_RE = re.compile(r'\w+')
+
+# Shorter lines (dates, single skills) may legitimately repeat and are never de-duplicated
+DEDUPE_MIN_LENGTH = 12
+
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_PHONE_CHARS_RE = re.compile(r'^[\s+()\d.-]+$')
+# "2019 - 2023", "01.2020 - 03.2022": employment and education dates, not phone numbers
+_YEAR_RANGE_RE = re.compile(r'(?:19|20)\d{2}\s*-\s*(?:\d{1,2}[./])?(?:19|20)\d{2}')
+PHONE_MIN_DIGITS = 9
+
+CompactionReport = namedtuple('CompactionReport', ['original_tokens', 'compacted_tokens', 'dropped_sections'])
+
+Section = namedtuple('Section', ['kind', 'header', 'lines'])
+
+
+def classify_section(header):
+    """
+    Classify a section by its header text.
+
+    Args:
+        header (str): Header line without the '# ' prefix
+
+    Returns:
+        str: One of the SECTION_PRIORITY kinds, or 'drop'
+    """
+    lowered = header.lower()
+    for kind, keywords in SECTION_KEYWORDS:
+        if any(keyword.search(lowered) if isinstance(keyword, re.Pattern) else keyword in lowered
+               for keyword in keywords):
+            return kind
+    return 'other'
+
+
+def _heading(line):
+    """
+    Header text of a line that starts a section, or None.
+
+    Args:
+        line (str): A line of parsed CV text
+
+    Returns:
+        str: The header without the '# ' prefix or trailing colon, or None
+    """
+    if line.startswith('# '):
+        return line[2:].strip()
+    stripped = line.strip()
+    if len(stripped) > HEADING_MAX_LENGTH or len(stripped.split()) > HEADING_MAX_WORDS:
+        return None
+    # Bullets, sentence ends and figures mark content
+    if not stripped[:1].isalpha() or stripped[-1] in '.,;' or any(char.isdigit() for char in stripped):
+        return None
+    letters = [char for char in stripped if char.isalpha()]
+    if len(letters) >= 3 and all(char.isupper() for char in letters):
+        return stripped.rstrip(':').strip()
+    # "Tech stack:" labels the next line rather than starting a section
+    if not stripped.endswith(':') and _names_section(stripped):
+        return stripped
+    return None
+
+
+def _names_section(text):
+    """Whether text is only section keywords plus HEADING_MODIFIERS, e.g. "Personal projects"."""
+    lowered = text.lower()
+    matched = False
+    for _, keywords in SECTION_KEYWORDS:
+        for keyword in keywords:
+            pattern = keyword if isinstance(keyword, re.Pattern) else re.compile(rf'\w*{re.escape(keyword)}\w*')
+            lowered, count = pattern.subn(' ', lowered)
+            matched = matched or count > 0
+    return matched and all(word in HEADING_MODIFIERS for word in _WORD_RE.findall(lowered))
+
+
+def _is_phone(line):
+    """A line made only of phone-number characters, with enough digits and no year range."""
+    if not _PHONE_CHARS_RE.match(line) or _YEAR_RANGE_RE.search(line):
+        return False
+    return sum(char.isdigit() for char in line) >= PHONE_MIN_DIGITS
+
+
+def _is_noise(line):
+    """Lines that carry no evaluative signal: bare bullets, e-mail addresses, phone numbers."""
+    stripped = line.strip('•-*·● \t')
+    return not stripped or bool(_EMAIL_RE.fullmatch(stripped)) or _is_phone(stripped)
+
+
+def split_sections(text):
+    """
+    Split parsed CV text into sections, removing duplicated and noise lines.
+
+    An unrecognised header inside an experience section (typically a
+    company or job title) continues that section's kind, so it is not
+    dropped first under a tight budget. So does an unrecognised capitalised
+    line in any section (a company, school or city name).
+
+    Args:
+        text (str): Output of parse_pdf_to_markdown
+
+    Returns:
+        list: Section tuples in document order
+    """
+    sections = []
+    current = Section('other', '', [])
+    seen = set()
+
+    for line in text.split('\n'):
+        header = _heading(line)
+        if header is not None:
+            if current.header or current.lines:
+                sections.append(current)
+            kind = classify_section(header)
+            if kind == 'other' and (current.kind == 'experience' or not line.startswith('# ')):
+                kind = current.kind
+            current = Section(kind, header, [])
+            continue
+
+        if _is_noise(line):
+            continue
+        key = line.strip().lower()
+        if len(key) >= DEDUPE_MIN_LENGTH:
+            if key in seen:
+                continue
+            seen.add(key)
+        current.lines.append(line)
+
+    if current.header or current.lines:
+        sections.append(current)
+
+    return sections
+
+
+def _render(section, lines):
+    return '\n'.join(([f"# {section.header}"] if section.header else []) + lines)
+
+
+def compact_cv(text, max_tokens=None):
+    """
+    Compact parsed CV text and trim it to a token budget.
+
+    Sections are admitted in SECTION_PRIORITY order until the budget runs out
+    (the section that crosses the budget is cut line by line) and are then
+    emitted in their original document order.
+
+    Args:
+        text (str): Output of parse_pdf_to_markdown
+        max_tokens (int): Token budget for the compacted text, or None for no limit
+
+    Returns:
+        tuple: (compacted text, CompactionReport)
+    """
+    sections = split_sections(text)
+    dropped = [section.header for section in sections if section.kind == 'drop']
+    kept = [section for section in sections if section.kind != 'drop']
+
+    chosen = {}
+    remaining = max_tokens
+    for position in sorted(range(len(kept)), key=lambda i: SECTION_PRIORITY[kept[i].kind]):
+        section = kept[position]
+        if remaining is None:
+            chosen[position] = section.lines
+            continue
+
+        rendered_tokens = estimate_tokens(_render(section, section.lines))
+        if rendered_tokens <= remaining:
+            chosen[position] = section.lines
+            remaining -= rendered_tokens
+            continue
+
+        # Keep as many leading lines of this section as still fit
+        lines = []
+        used = estimate_tokens(f"# {section.header}") if section.header else 0
+        for line in section.lines:
+            line_tokens = estimate_tokens(line) + 1
+            if used + line_tokens > remaining:
+                break
+            lines.append(line)
+            used += line_tokens
+        if lines:
+            chosen[position] = lines
+            remaining -= used
+        else:
+            dropped.append(section.header or '(untitled)')
+        remaining = 0
+
+    compacted = '\n'.join(_render(kept[i], chosen[i]) for i in sorted(chosen))
+    report = CompactionReport(estimate_tokens(text), estimate_tokens(compacted), dropped)
+    return compacted, report
+
+
+class CompactionTally:
+    """Thread-safe running totals of tokens saved by compaction across a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cvs = 0
+        self.original_tokens = 0
+        self.compacted_tokens = 0
+
+    def add(self, report):
+        """
+        Record one CV's compaction report.
+
+        Args:
+            report (CompactionReport): Report returned by compact_cv
+        """
+        with self._lock:
+            self.cvs += 1
+            self.original_tokens += report.original_tokens
+            self.compacted_tokens += report.compacted_tokens
+
+    @property
+    def saved_tokens(self):
+        return self.original_tokens - self.compacted_tokens
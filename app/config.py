@@ -16,16 +16,100 @@ SUPPORTED_FILE_TYPES = ['.pdf']
 DEFAULT_OUTPUT_FILE = "cv_evaluation_results.csv"
 
 # AI evaluation settings
+DEFAULT_MODEL_NAME = "openai/gpt-oss-120b"
 AI_TEMPERATURE = 0.2  # Lower temperature for more consistent evaluations
+TOP_P = 1
+MAX_COMPLETION_TOKENS = 4096  # The JSON answer is ~300 tokens; the rest is reasoning headroom
+REASONING_EFFORT = "medium"   # low | medium | high | none ("none" = not sent, for models without reasoning)
 MAX_RETRIES = 3       # Number of retry attempts for API calls
+JSON_MODE = True      # Request structured JSON output (response_format=json_object)
+
+# Model cascade (see --cascade): a fast model scores every CV first and only
+# uncertain or invalid answers are re-scored by DEFAULT_MODEL_NAME
+FAST_MODEL_NAME = "openai/gpt-oss-20b"
+CASCADE_PASS_SCORE = 70   # The rubric's pass mark
+CASCADE_BAND = 10         # Fast scores within this many points of the pass mark (60-80) are escalated
+FAST_REASONING_EFFORT = None  # Reasoning effort of the fast model (None = same as the main model)
+
+# Per-role generation overrides, keyed by lower-case job role (folder name), e.g.
+#   "intern backend developer": {"reasoning_effort": "low", "max_completion_tokens": 2048}
+# Keys: model, temperature, top_p, max_completion_tokens, reasoning_effort
+ROLE_GENERATION_OVERRIDES = {}
+
+# Concurrency settings
+DEFAULT_WORKERS = 1   # CVs evaluated in parallel (1 = serial)
+DEFAULT_PARSE_WORKERS = None  # PDF parser processes (None = CPU count)
+PARSE_QUEUE_SIZE = 32         # Parsed CVs allowed to wait for evaluation
+
+# Rate limiting (shared by all evaluation workers)
+RATE_LIMIT_RPM = None         # Client-side requests per minute (None = rely on server headers only)
+RATE_LIMIT_TPM = None         # Client-side tokens per minute (None = rely on server headers only)
+EXPECTED_COMPLETION_TOKENS = 1000  # Completion tokens assumed per call when reserving TPM budget
+RATE_LIMIT_MAX_WAIT_SECONDS = 900  # Rate-limited (429) calls of one CV are retried for this long, not MAX_RETRIES times
+
+# Token budgets (see --max-total-tokens / --max-tokens-per-cv)
+MAX_TOTAL_TOKENS = None       # Prompt + completion tokens for a whole run (None = unlimited)
+MAX_TOKENS_PER_CV = None      # Prompt + completion tokens per CV, retries included (None = unlimited)
+MIN_BUDGET_CV_TOKENS = 300    # Below this much room for CV text, an over-budget CV is skipped, not compacted
+
+# HTTP client (one keep-alive connection pool shared by all API calls)
+HTTP_POOL_SIZE = 8               # Pooled connections; raised to --max-in-flight when that is larger
+HTTP_TIMEOUT_SECONDS = 60.0      # Read/write timeout per request (streams may take a while)
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+HTTP_KEEPALIVE_SECONDS = 30.0    # Idle connections are closed after this long
+
+# Hedged requests (see --hedge): duplicate a single-CV call that is slower than usual
+HEDGE_PERCENTILE = 95            # Hedge once a call passes this percentile of recent latencies
+HEDGE_MAX_EXTRA_RATE = 0.05      # Hedges allowed per primary request (0.05 = at most 5% extra requests)
+HEDGE_MIN_SAMPLES = 20           # Completed calls needed before hedging starts
+HEDGE_WINDOW = 200               # Recent calls the percentiles are computed over
+HEDGE_MIN_DELAY_SECONDS = 1.0    # Never hedge a call sooner than this
+
+# Batch evaluation (several CVs per API call)
+DEFAULT_BATCH_SIZE = 1        # 1 = one CV per call
+BATCH_MAX_TOKENS = 12000      # Estimated CV tokens per batch, well below the model's context window
+
+# Local pre-screen (see --prescreen): CVs that mention too few of a role's skill
+# keywords are auto-rejected without an API call
+PRESCREEN_THRESHOLD = 0.15        # Weighted share of the role's keywords a CV must mention
+PRESCREEN_MIN_WORDS = 50          # CVs with fewer words (text did not extract?) always go to the model
+PRESCREEN_MIN_PROFILE_TERMS = 5   # Roles with fewer keywords than this are not pre-screened
+
+# Skill profiles keyed by lower-case job role; replace the keywords built from the role name, e.g.
+#   "data engineer": {"spark|pyspark": 2, "airflow": 1, "sql": 2}   (or a plain list of keywords)
+ROLE_SKILL_PROFILES = {}
+
+# Near-duplicate detection (see --near-duplicates): MinHash over word shingles of the parsed text
+NEAR_DUP_THRESHOLD = 0.9        # Estimated Jaccard similarity at which a CV counts as a resubmission
+NEAR_DUP_NUM_PERM = 128         # MinHash signature length
+NEAR_DUP_BANDS = 16             # LSH bands of 8 rows: pairs above 0.9 similarity are found >99.9% of the time
+NEAR_DUP_SHINGLE_WORDS = 5      # Words per shingle
+NEAR_DUP_MIN_SHINGLES = 30      # Shorter texts (e.g. scans without extracted text) are never matched
+
+# Watch mode (see --watch): new or changed PDFs are screened as they arrive
+WATCH_SETTLE_SECONDS = 2.0        # A file must be unchanged (and end with %%EOF) this long before it is parsed
+WATCH_MAX_SETTLE_SECONDS = 60.0   # Parse an unchanged file without a PDF trailer after this long anyway
+WATCH_POLL_SECONDS = 5.0          # Folder rescan interval when inotify is unavailable
+WATCH_RESCAN_SECONDS = 300.0      # Safety rescan interval with inotify, in case an event was missed
+WATCH_MAX_BATCH = 200             # Most new CVs handed to the pipeline at once
+WATCH_MAINTENANCE_SECONDS = 3600  # Cache eviction interval of a long-running watcher
+METRICS_WINDOW = 10000            # Recent per-CV records kept for latency percentiles while watching
+
+# Results database (see --db): every run's results, queried by the dashboard
+RESULTS_DB = "results.db"
+DB_WRITE_BATCH_SIZE = 50          # Rows per write transaction
+DB_WRITE_INTERVAL_SECONDS = 2.0   # Write the buffer when a row arrives and the oldest one has waited this long
+
+# Cache settings
+CACHE_DIR = os.getenv("CV_CACHE_DIR", ".cache")
+EVAL_CACHE_MAX_AGE_DAYS = 30      # Cached evaluations older than this are re-run
+EVAL_CACHE_MAX_ENTRIES = 50000    # Oldest entries beyond this are evicted
+PARSED_CACHE_MAX_ENTRIES = 50000  # Parsed PDF text, keyed by file hash and parser version
 
 # Logging configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-# Application defaults
-DEFAULT_MODEL_NAME = "llama3-8b-8192"
-
 # Scoring thresholds (can be adjusted based on requirements)
 SCORE_THRESHOLDS = {
     "excellent": (90, 100),
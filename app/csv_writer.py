@@ -1,33 +1,75 @@
 import csv
 import logging
+import os
+import threading
 from pathlib import Path
 
+# ✅ UPDATED: add new columns based on new prompt
+FIELDNAMES = [
+    'output',
+    'educationalQualification',
+    'jobHistory',
+    'skillSet',
+    'level',          # NEW
+    'score',
+    'pass',           # NEW
+    'justification'
+]
 
-def write_results_to_csv(results, output_file):
+# Combined multi-role output: one row per (role, CV)
+LONG_FIELDNAMES = ['role', *FIELDNAMES]
+
+# Model tier that produced each row ('fast' or 'large'), written with --cascade
+TIER_FIELD = 'tier'
+
+# Columns that files written before they existed lack; such files are read with them empty
+OPTIONAL_FIELDS = {TIER_FIELD}
+
+
+def _format_row(result, fieldnames=FIELDNAMES):
+    """Convert an evaluation result into a CSV row of strings."""
+    row = {}
+
+    for field in fieldnames:
+        # Get value safely
+        value = result.get(field, '')
+
+        # Handle None values
+        if value is None:
+            value = ''
+
+        # ✅ IMPORTANT: normalize boolean pass -> string
+        if field == "pass":
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+
+        # Convert to string if not already
+        if not isinstance(value, str):
+            value = str(value)
+
+        row[field] = value
+
+    return row
+
+
+def write_results_to_csv(results, output_file, fieldnames=FIELDNAMES):
     """
     Write evaluation results to a CSV file.
 
+    The file is written to a temporary path and renamed into place, so an
+    interrupted write never leaves a truncated CSV behind.
+
     Args:
         results (list): List of evaluation results
         output_file (str): Path to output CSV file
+        fieldnames (list): Columns to write (FIELDNAMES or LONG_FIELDNAMES)
     """
     logger = logging.getLogger(__name__)
-
-    # ✅ UPDATED: add new columns based on new prompt
-    fieldnames = [
-        'output',
-        'educationalQualification',
-        'jobHistory',
-        'skillSet',
-        'level',          # NEW
-        'score',
-        'pass',           # NEW
-        'justification'
-    ]
+    tmp_file = f"{output_file}.tmp"
 
     try:
         # Write results to CSV
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(tmp_file, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
             # Write header
@@ -35,31 +77,146 @@ def write_results_to_csv(results, output_file):
 
             # Write each result as a row
             for result in results:
-                row = {}
+                writer.writerow(_format_row(result, fieldnames))
 
-                for field in fieldnames:
-                    # Get value safely
-                    value = result.get(field, '')
+        os.replace(tmp_file, output_file)
+        logger.info(f"Successfully wrote {len(results)} results to {output_file}")
 
-                    # Handle None values
-                    if value is None:
-                        value = ''
+    except Exception as e:
+        logger.error(f"Error writing results to CSV: {str(e)}")
+        raise
 
-                    # ✅ IMPORTANT: normalize boolean pass -> string
-                    if field == "pass":
-                        if isinstance(value, bool):
-                            value = "true" if value else "false"
 
-                    # Convert to string if not already
-                    if not isinstance(value, str):
-                        value = str(value)
+def read_results_from_csv(output_file, fieldnames=FIELDNAMES, default_role=None):
+    """
+    Read previously written results, skipping incomplete rows.
 
-                    row[field] = value
+    A run killed mid-write can leave a partial last row; such rows are
+    dropped so the CV is simply evaluated again. OPTIONAL_FIELDS missing
+    from the file's header are read as empty.
 
-                writer.writerow(row)
+    Args:
+        output_file (str): Path to a CSV written by this module
+        fieldnames (list): Columns the file was written with
+        default_role (str): Role of every row of a file written without a
+            'role' column, when reading it as LONG_FIELDNAMES
 
-        logger.info(f"Successfully wrote {len(results)} results to {output_file}")
+    Returns:
+        list: Rows as dicts keyed by `fieldnames`
 
-    except Exception as e:
-        logger.error(f"Error writing results to CSV: {str(e)}")
-        raise
+    Raises:
+        ValueError: If the file's columns do not match `fieldnames`, e.g. a
+            single-role file read as LONG_FIELDNAMES without `default_role`
+    """
+    logger = logging.getLogger(__name__)
+    rows = []
+
+    with open(output_file, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        header = reader.fieldnames or []
+        filled = {field: '' for field in OPTIONAL_FIELDS if field not in header}
+        if 'role' in fieldnames and 'role' not in header and default_role is not None:
+            filled['role'] = default_role
+        if header:
+            missing = [field for field in fieldnames if field not in header and field not in filled]
+            if missing:
+                raise ValueError(f"{output_file} has no {', '.join(missing)} column"
+                                 + (" (it was written without --long-format)" if 'role' in missing else ""))
+            if 'role' in header and 'role' not in fieldnames:
+                raise ValueError(f"{output_file} has a role column (it was written with --long-format)")
+        required = [field for field in fieldnames if field not in filled]
+        for row in reader:
+            if not row.get('output') or any(row.get(field) is None for field in required):
+                logger.warning(f"Skipping incomplete row in {output_file}: {row.get('output', '')!r}")
+                continue
+            rows.append({field: filled[field] if field in filled else row[field] for field in fieldnames})
+
+    return rows
+
+
+def finalize_results_csv(output_file, fieldnames=FIELDNAMES):
+    """
+    Rewrite a streamed results file in a deterministic order.
+
+    Rows are de-duplicated by role and filename (the most recent row wins, so
+    a CV retried after an error replaces its error row) and sorted by role,
+    then filename.
+
+    Args:
+        output_file (str): Path to output CSV file
+        fieldnames (list): Columns the file was written with
+
+    Returns:
+        int: Number of rows in the final file
+    """
+    latest = {}
+    for row in read_results_from_csv(output_file, fieldnames):
+        latest[(row.get('role', ''), row['output'])] = row
+
+    rows = [latest[key] for key in sorted(latest)]
+    write_results_to_csv(rows, output_file, fieldnames)
+    return len(rows)
+
+
+class StreamingCSVWriter:
+    """
+    Append evaluation results to a CSV file as soon as each one is ready.
+
+    Every row is flushed and fsynced before write() returns, so a crash or
+    Ctrl-C loses at most the CVs that were still in flight. Safe to call from
+    multiple threads.
+    """
+
+    def __init__(self, output_file, resume=False, fieldnames=FIELDNAMES, default_role=None):
+        """
+        Args:
+            output_file (str): Path to output CSV file
+            resume (bool): Keep the complete rows already in the file instead
+                of starting a new one
+            fieldnames (list): Columns to write (FIELDNAMES or LONG_FIELDNAMES)
+            default_role (str): When resuming a file without a 'role' column
+                as LONG_FIELDNAMES, the role its rows are migrated to
+
+        Raises:
+            ValueError: If the file to resume has different columns (see
+                read_results_from_csv)
+        """
+        self.output_file = output_file
+        self.fieldnames = fieldnames
+        self._lock = threading.Lock()
+
+        existing = []
+        if resume and Path(output_file).exists():
+            existing = read_results_from_csv(output_file, fieldnames, default_role)
+
+        # Start from a clean file (header + complete rows only) so appended
+        # rows never follow a partially written line
+        write_results_to_csv(existing, output_file, fieldnames)
+
+        self._file = open(output_file, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+
+    def write(self, result):
+        """
+        Append one result and flush it to disk.
+
+        Args:
+            result (dict): Evaluation result including the 'output' filename
+        """
+        row = _format_row(result, self.fieldnames)
+        with self._lock:
+            self._writer.writerow(row)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Close the underlying file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
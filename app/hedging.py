@@ -0,0 +1,159 @@
+"""
+Hedged requests: trim the latency tail of slow generations.
+
+A HedgePolicy keeps the time to first token and the total latency of recent
+single-CV calls. When a call has produced no token by the chosen percentile
+of recent first-token latencies, or has not finished by that percentile of
+total latencies, ai_evaluator sends a duplicate request. The first valid
+response wins and the other stream is closed.
+
+Extra requests are capped: every primary request earns `max_extra_rate`
+credit and every hedge spends one, so hedges never exceed that share of
+primary requests. Hedges also skip the shared rate limiter's queue instead of
+waiting in it, so a hedge is only sent when there is spare capacity.
+"""
+
+import logging
+import threading
+from collections import deque
+
+from metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCancelled(Exception):
+    """Raised by a request that was cancelled because its twin won the race."""
+
+
+class RequestControl:
+    """Signals shared between one in-flight request and the thread waiting on it."""
+
+    def __init__(self, rate_limited=True, optional=False):
+        """
+        Args:
+            rate_limited (bool): Whether the request still has to wait for the
+                shared rate limiter (False when the caller already took capacity)
+            optional (bool): The request is a hedge; if it does not fit in the
+                run's token budget it is dropped without ending the run
+        """
+        self.rate_limited = rate_limited
+        self.optional = optional
+        self.first_token = threading.Event()
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._close = None
+
+    def attach(self, close):
+        """
+        Register how to close the open stream, so cancel() can interrupt it.
+
+        Args:
+            close (callable): Closes the response stream
+        """
+        with self._lock:
+            self._close = close
+        if self.cancelled.is_set():
+            self._close_stream()
+
+    def cancel(self):
+        """Ask the request to stop and close its stream if one is open."""
+        self.cancelled.set()
+        self._close_stream()
+
+    def _close_stream(self):
+        with self._lock:
+            close, self._close = self._close, None
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                # The stream may already be finished or broken
+                logger.debug(f"Closing a cancelled stream failed: {e}")
+
+
+class HedgePolicy:
+    """Thread-safe hedging delays and extra-request budget."""
+
+    def __init__(self, percent=95, max_extra_rate=0.05, min_samples=20, window=200, min_delay=1.0):
+        """
+        Args:
+            percent (float): Percentile of recent latencies after which to hedge (0-100)
+            max_extra_rate (float): Hedges allowed per primary request (e.g. 0.05 = 5%)
+            min_samples (int): Completed calls needed before hedging starts
+            window (int): Recent calls kept for the percentiles
+            min_delay (float): Never hedge sooner than this many seconds
+        """
+        self.percent = percent
+        self.max_extra_rate = max_extra_rate
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._first_token_latencies = deque(maxlen=window)
+        # Unspent credit is capped at one window's worth, so a long quiet stretch
+        # can't fund a burst of hedges
+        self._max_credit = max(1.0, max_extra_rate * window)
+        self._credit = 0.0
+        self.primaries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, latency, first_token_latency=None):
+        """
+        Add a completed call's latencies.
+
+        Args:
+            latency (float): Seconds from sending the request to the end of the stream
+            first_token_latency (float): Seconds until the first token, or None
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            self._first_token_latencies.append(first_token_latency if first_token_latency is not None else latency)
+
+    def delays(self):
+        """
+        Current hedging thresholds.
+
+        Returns:
+            tuple: (first-token delay, total delay) in seconds, or None while
+                fewer than min_samples calls have completed
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = list(self._latencies)
+            first_token_latencies = list(self._first_token_latencies)
+        return (max(self.min_delay, percentile(first_token_latencies, self.percent)),
+                max(self.min_delay, percentile(latencies, self.percent)))
+
+    def note_primary(self):
+        """Count a primary request; earns max_extra_rate hedge credit."""
+        with self._lock:
+            self.primaries += 1
+            self._credit = min(self._max_credit, self._credit + self.max_extra_rate)
+
+    def try_hedge(self):
+        """
+        Spend one credit on a hedge if there is one.
+
+        Returns:
+            bool: True if a hedge may be sent
+        """
+        with self._lock:
+            if self._credit < 1.0:
+                return False
+            self._credit -= 1.0
+            self.hedges += 1
+            return True
+
+    def refund(self):
+        """Return the credit of a hedge that was not sent after all."""
+        with self._lock:
+            self._credit += 1.0
+            self.hedges -= 1
+
+    def note_win(self):
+        """Count a hedge whose response was used instead of the primary's."""
+        with self._lock:
+            self.hedge_wins += 1
@@ -0,0 +1,130 @@
+"""
+Helpers for reading JSON out of streamed model responses.
+
+JsonObjectScanner finds the end of the first top-level JSON object (or
+array) while the response is still streaming, so the stream can be closed as soon as the
+answer is complete. repair_json recovers common near-misses (code fences,
+prose around the object, trailing commas) locally instead of paying for
+another generation.
+"""
+
+import json
+import re
+
+_FENCE_RE = re.compile(r'^```[a-zA-Z]*\s*|\s*```$')
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+class JsonObjectScanner:
+    """
+    Incrementally track brace depth across streamed chunks.
+
+    Braces inside JSON strings (including escaped quotes) are ignored. Once
+    the first top-level object closes, `complete` becomes True and `end`
+    holds the offset just past its closing brace in the text fed so far.
+    With `arrays`, a top-level array counts as well and brackets are tracked
+    too, so `[{...}, {...}]` only completes at its closing bracket.
+    """
+
+    def __init__(self, arrays=False):
+        """
+        Args:
+            arrays (bool): Also accept a top-level array as the value
+        """
+        self.start = None
+        self.end = None
+        self._openers = '{[' if arrays else '{'
+        self._offset = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self):
+        return self.end is not None
+
+    def feed(self, chunk):
+        """
+        Scan the next piece of streamed text.
+
+        Args:
+            chunk (str): Text that directly follows everything fed before
+
+        Returns:
+            bool: True once the first top-level value is complete
+        """
+        if self.end is not None:
+            return True
+
+        for position, char in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._stack:
+                    self._in_string = True
+            elif char in self._openers:
+                if self.start is None:
+                    self.start = self._offset + position
+                self._stack.append(_CLOSERS[char])
+            elif self._stack and char == self._stack[-1]:
+                self._stack.pop()
+                if not self._stack:
+                    self.end = self._offset + position + 1
+                    return True
+
+        self._offset += len(chunk)
+        return False
+
+
+def extract_json_object(text):
+    """
+    Return the first complete top-level {...} in text, or None.
+
+    Args:
+        text (str): Model output that may contain prose or code fences
+
+    Returns:
+        str: The JSON object text, or None if no complete object is found
+    """
+    scanner = JsonObjectScanner()
+    if scanner.feed(text):
+        return text[scanner.start:scanner.end]
+    return None
+
+
+def repair_json(text):
+    """
+    Parse a model response as JSON, repairing common formatting mistakes.
+
+    Tries, in order: the raw text, the text without Markdown code fences, the
+    outermost JSON object, and that object with trailing commas removed.
+
+    Args:
+        text (str): Model output
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If no candidate could be parsed
+    """
+    stripped = _FENCE_RE.sub('', text.strip())
+    candidates = [text, stripped]
+    extracted = extract_json_object(stripped)
+    if extracted is not None:
+        candidates.append(extracted)
+        candidates.append(_TRAILING_COMMA_RE.sub(r'\1', extracted))
+
+    error = None
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError as e:
+            error = error or e
+    raise error
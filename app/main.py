@@ -1,11 +1,39 @@
-import os
 import argparse
 import logging
+import signal
+import threading
+import time
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from pdf_parser import parse_pdf_to_markdown
-from ai_evaluator import evaluate_cv
-from csv_writer import write_results_to_csv
-from prompt_builder import build_evaluation_prompt
+from pdf_parser import get_text_cache, PARSER_VERSION
+from pipeline import run_pipeline
+from ai_evaluator import (evaluate_cv, evaluate_cv_batch, build_error_result, is_error_result,
+                          build_skipped_result, is_skipped_result, build_cv_message, estimate_call_tokens,
+                          resolve_generation_settings, configure_rate_limits, configure_http_client,
+                          configure_token_budget, configure_hedging, DEFAULT_SETTINGS, REASONING_EFFORT_CHOICES,
+                          usage_totals)
+from cache import DiskCache, text_sha256, make_key
+from csv_writer import (StreamingCSVWriter, read_results_from_csv, finalize_results_csv, FIELDNAMES,
+                        LONG_FIELDNAMES, TIER_FIELD)
+from prompt_builder import build_evaluation_prompt, estimate_tokens
+from compactor import CompactionTally, COMPACTOR_VERSION, compact_cv
+from metrics import CallStats, RunMetrics, cv_record
+from result_store import ResultStore
+from results_sidecar import write_sidecar
+from prescreen import build_prescreens, load_profiles, is_prescreened_result, PrescreenTally
+from near_duplicates import NearDuplicateIndex, INDEX_FILENAME
+from cascade import Cascade, CascadeTally, evaluate_cv_cascade, evaluate_cv_batch_cascade
+from roles import plan_role_jobs, role_output_path, group_unique_cvs
+from watcher import FolderWatcher, file_stamp
+from config import (DEFAULT_WORKERS, DEFAULT_PARSE_WORKERS, PARSE_QUEUE_SIZE, CACHE_DIR,
+                    EVAL_CACHE_MAX_AGE_DAYS, EVAL_CACHE_MAX_ENTRIES, DEFAULT_BATCH_SIZE,
+                    BATCH_MAX_TOKENS, RATE_LIMIT_RPM, RATE_LIMIT_TPM, HTTP_POOL_SIZE,
+                    HTTP_TIMEOUT_SECONDS, MAX_TOTAL_TOKENS, MAX_TOKENS_PER_CV, MIN_BUDGET_CV_TOKENS,
+                    HEDGE_PERCENTILE, HEDGE_MAX_EXTRA_RATE, RESULTS_DB, DB_WRITE_BATCH_SIZE,
+                    DB_WRITE_INTERVAL_SECONDS, PRESCREEN_THRESHOLD, NEAR_DUP_THRESHOLD, WATCH_SETTLE_SECONDS,
+                    WATCH_MAX_BATCH, WATCH_MAINTENANCE_SECONDS, METRICS_WINDOW, FAST_MODEL_NAME, CASCADE_BAND,
+                    FAST_REASONING_EFFORT)
 
 
 def setup_logging():
@@ -16,75 +44,1071 @@ def setup_logging():
     )
 
 
+def note_compaction(parsed, compaction_tally=None):
+    """Log how many tokens compaction saved for a CV and add it to the run totals."""
+    report = parsed.compaction
+    if report is None:
+        return
+    if compaction_tally is not None:
+        compaction_tally.add(report)
+    logging.getLogger(__name__).info(
+        f"Compacted {parsed.path.name}: {report.original_tokens} -> {report.compacted_tokens} tokens "
+        f"(saved {report.original_tokens - report.compacted_tokens})"
+        + (f", dropped: {', '.join(report.dropped_sections)}" if report.dropped_sections else ""))
+
+
+def evaluation_cache_key(file_hash, evaluation_prompt, settings=DEFAULT_SETTINGS, cache_variant=None):
+    """Evaluation cache key of a PDF (by content hash) under a prompt and generation settings."""
+    # The model sees the parsed text, so a parser change invalidates evaluations too
+    key_parts = [file_hash, PARSER_VERSION, text_sha256(evaluation_prompt), *settings]
+    if cache_variant:
+        key_parts.append(cache_variant)
+    return make_key(*key_parts)
+
+
+def lookup_cached_evaluation(parsed, evaluation_prompt, settings=DEFAULT_SETTINGS, eval_cache=None, refresh=False,
+                             cache_variant=None):
+    """
+    Look up a parsed CV in the evaluation cache.
+
+    Same PDF bytes + same parser version + same prompt + same model and
+    generation settings (+ same compaction settings) => same evaluation.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        eval_cache (DiskCache): Evaluation cache, or None to disable caching
+        refresh (bool): Ignore cached evaluations but store fresh ones
+        cache_variant (str): Extra key part for settings that change the model input
+
+    Returns:
+        tuple: (cache key or None, cached result or None)
+    """
+    if eval_cache is None:
+        return None, None
+
+    cache_key = evaluation_cache_key(parsed.file_hash, evaluation_prompt, settings, cache_variant)
+    if refresh:
+        return cache_key, None
+
+    cached_result = eval_cache.get(cache_key)
+    if cached_result is not None:
+        cached_result['output'] = parsed.path.name
+        cached_result['file_hash'] = parsed.file_hash
+        logging.getLogger(__name__).info(
+            f"Cache hit for {parsed.path.name}, score: {cached_result.get('score', 'N/A')}")
+    return cache_key, cached_result
+
+
+def find_near_duplicate(parsed, evaluation_prompt, cache_key, near_duplicates, settings=DEFAULT_SETTINGS,
+                        eval_cache=None, refresh=False, cache_variant=None):
+    """
+    Look for an already-evaluated near-duplicate of a CV (a resubmission).
+
+    The first match with a cached evaluation for the same prompt and
+    settings is reused: it is cached unchanged under this CV's key too, and
+    the returned copy's justification notes where it came from. Without such a match (or with
+    `refresh`) the CV is evaluated as usual, but the link is still recorded.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage
+        evaluation_prompt (str): Prompt with evaluation criteria
+        cache_key (str): This CV's evaluation cache key
+        near_duplicates (NearDuplicateIndex): The persistent index
+        settings (GenerationSettings): Model and sampling settings
+        eval_cache (DiskCache): Evaluation cache
+        refresh (bool): Never reuse; re-evaluate
+        cache_variant (str): Extra evaluation cache key part (see lookup_cached_evaluation)
+
+    Returns:
+        tuple: (signature, reused result or None, best Match or None)
+    """
+    signature = near_duplicates.signature(parsed.text)
+    matches = near_duplicates.find(signature, exclude=parsed.file_hash)
+    if not matches:
+        return signature, None, None
+
+    logger = logging.getLogger(__name__)
+    near_duplicates.link(parsed.file_hash, parsed.path.name, matches[0])
+    for match in [] if refresh else matches:
+        reused = eval_cache.get(evaluation_cache_key(match.file_hash, evaluation_prompt, settings, cache_variant))
+        if reused is None:
+            continue
+        # The cache keeps what the model said; only the row gets the note, so notes never stack
+        eval_cache.set(cache_key, reused)
+        reused['justification'] = (f"{reused.get('justification', '')} [Evaluation reused from near-duplicate "
+                                   f"{match.name} ({match.similarity:.0%} similar)]")
+        reused.update(output=parsed.path.name, file_hash=parsed.file_hash, duplicate_of=match.name)
+        logger.info(f"{parsed.path.name} is a near-duplicate of {match.name} ({match.similarity:.0%} similar), "
+                    f"reusing its evaluation, score: {reused.get('score', 'N/A')}")
+        return signature, reused, match
+
+    logger.info(f"{parsed.path.name} is a near-duplicate of {matches[0].name} ({matches[0].similarity:.0%} similar); "
+                + ("re-evaluating (--refresh)" if refresh else "no evaluation to reuse for this role"))
+    return signature, None, matches[0]
+
+
+def index_near_duplicate(parsed, near_duplicates, signature=None):
+    """Add an evaluated CV to the near-duplicate index, computing its signature only if needed."""
+    if near_duplicates is None or parsed.file_hash in near_duplicates:
+        return
+    if signature is None:
+        signature = near_duplicates.signature(parsed.text)
+    near_duplicates.add(parsed.file_hash, parsed.path.name, signature)
+
+
+def flag_near_duplicate(evaluation_result, match):
+    """Note in a fresh evaluation which earlier CV it nearly duplicates (after it was cached without the note)."""
+    if match is not None and not is_error_result(evaluation_result):
+        evaluation_result['justification'] = (f"{evaluation_result.get('justification', '')} [Near-duplicate of "
+                                              f"{match.name} ({match.similarity:.0%} similar)]")
+
+
+def store_evaluation(parsed, evaluation_result, cache_key, eval_cache=None):
+    """Cache a fresh evaluation (unless it is an error) and tag it with the filename and file hash."""
+    if cache_key is not None and not is_error_result(evaluation_result):
+        eval_cache.set(cache_key, evaluation_result)
+
+    # Add filename to result
+    evaluation_result['output'] = parsed.path.name
+    evaluation_result['file_hash'] = parsed.file_hash
+
+    logging.getLogger(__name__).info(
+        f"Completed processing {parsed.path.name}, score: {evaluation_result.get('score', 'N/A')}")
+    return evaluation_result
+
+
+def record_cv_metrics(run_metrics, parsed, result, started, call_stats=None, api_wait=None):
+    """
+    Add a CV's stage timings, tokens and errors to the run metrics.
+
+    Args:
+        run_metrics (RunMetrics): Run metrics, or None when metrics are off
+        parsed (ParsedCV): Output of the parse stage
+        result (dict): The CV's evaluation result
+        started (float): time.monotonic() when the evaluation stage picked the CV up
+        call_stats (CallStats): API call stats, or None for a cache hit
+        api_wait (float): Seconds spent waiting for an API slot
+    """
+    if run_metrics is None:
+        return
+    if is_skipped_result(result):
+        status = 'skipped'
+    elif result.get('duplicate_of'):
+        status = 'duplicate'
+    elif is_prescreened_result(result):
+        status = 'prescreened'
+    elif is_error_result(result):
+        status = 'error'
+    else:
+        status = 'evaluated' if call_stats is not None else 'cached'
+
+    seconds = {'evaluate': time.monotonic() - started}
+    if parsed.queued_at is not None:
+        seconds['queue'] = started - parsed.queued_at
+    if api_wait is not None:
+        seconds['api_wait'] = api_wait
+    timings = parsed.timings or {}
+    run_metrics.add(cv_record(parsed.path.name, status, timings, call_stats, error_class=timings.get('error'),
+                              tier=result.get('tier'), **seconds))
+
+
+def check_token_budget(parsed, evaluation_prompt, settings=DEFAULT_SETTINGS, token_limit=None, token_budget=None):
+    """
+    Pre-flight check of a CV against the per-CV and run token budgets.
+
+    A CV whose estimated prompt + completion tokens exceed `token_limit` is
+    compacted to fit; if even the fixed part of the prompt leaves too little
+    room for CV text, it is skipped instead.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage
+        evaluation_prompt (str): Prompt with evaluation criteria
+        settings (GenerationSettings): Model and sampling settings
+        token_limit (int): Per-CV token budget, or None
+        token_budget (TokenBudget): Run-wide budget, or None
+
+    Returns:
+        tuple: (ParsedCV to evaluate, possibly compacted; skip reason or None)
+    """
+    if token_budget is not None and token_budget.exhausted:
+        return parsed, f"run token budget of {token_budget.max_tokens} exhausted"
+    if token_limit is None:
+        return parsed, None
+
+    estimate = estimate_call_tokens(build_cv_message(parsed.text), evaluation_prompt, settings)
+    if estimate <= token_limit:
+        return parsed, None
+
+    cv_tokens = token_limit - (estimate - estimate_tokens(parsed.text))
+    if cv_tokens < MIN_BUDGET_CV_TOKENS:
+        return parsed, f"estimated {estimate} tokens exceeds the per-CV budget of {token_limit}"
+
+    text, report = compact_cv(parsed.text, cv_tokens)
+    logging.getLogger(__name__).info(
+        f"Compacted {parsed.path.name} to fit the per-CV token budget: estimated {estimate} tokens, "
+        f"CV text {report.original_tokens} -> {report.compacted_tokens} tokens")
+    return parsed._replace(text=text, compaction=report), None
+
+
+def prescreen_cv(parsed, prescreen, evaluation_prompt, settings=DEFAULT_SETTINGS, prescreen_tally=None):
+    """
+    Run the local pre-screen on a CV before it is sent to the model.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage
+        prescreen (Prescreen): The role's skill profile and threshold
+        evaluation_prompt (str): Prompt with evaluation criteria (to estimate the tokens saved)
+        settings (GenerationSettings): Model and sampling settings
+        prescreen_tally (PrescreenTally): Run totals, or None
+
+    Returns:
+        dict: The auto-reject row, or None if the CV should be evaluated
+    """
+    screening = prescreen.check(parsed.text)
+    if screening is None:
+        if prescreen_tally is not None:
+            prescreen_tally.add(False)
+        return None
+
+    if prescreen_tally is not None:
+        prescreen_tally.add(True, estimate_call_tokens(build_cv_message(parsed.text), evaluation_prompt, settings))
+    logging.getLogger(__name__).info(
+        f"Pre-screen rejected {parsed.path.name}: {screening.coverage:.0%} of the role's keywords "
+        f"(threshold {prescreen.threshold:.0%})")
+    result = prescreen.build_result(screening)
+    result['output'] = parsed.path.name
+    result['file_hash'] = parsed.file_hash
+    return result
+
+
+def skip_cv(parsed, reason):
+    """Build the result row for a CV that is not sent to the model."""
+    logging.getLogger(__name__).warning(f"Skipping {parsed.path.name}: {reason}")
+    result = build_skipped_result(reason)
+    result['output'] = parsed.path.name
+    result['file_hash'] = parsed.file_hash
+    return result
+
+
+def evaluate_parsed_cv(parsed, evaluation_prompt, api_slots, settings=DEFAULT_SETTINGS, eval_cache=None,
+                       refresh=False, cache_variant=None, compaction_tally=None, run_metrics=None,
+                       token_limit=None, token_budget=None, prescreen=None, prescreen_tally=None,
+                       near_duplicates=None, cascade=None, cascade_tally=None):
+    """
+    Evaluate a single parsed CV.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage
+        evaluation_prompt (str): Prompt with evaluation criteria
+        api_slots (threading.BoundedSemaphore): Caps concurrent API requests
+        settings (GenerationSettings): Model and sampling settings
+        eval_cache (DiskCache): Evaluation cache, or None to disable caching
+        refresh (bool): Ignore cached evaluations but store fresh ones
+        cache_variant (str): Extra evaluation cache key part (see lookup_cached_evaluation)
+        compaction_tally (CompactionTally): Run totals for compaction savings
+        run_metrics (RunMetrics): Per-CV metrics for the run, or None
+        token_limit (int): Per-CV token budget, or None
+        token_budget (TokenBudget): Run-wide token budget, or None
+        prescreen (Prescreen): Local pre-screen for the role, or None to send every CV
+        prescreen_tally (PrescreenTally): Pre-screen run totals, or None
+        near_duplicates (NearDuplicateIndex): Reuse evaluations of near-duplicate CVs, or None
+        cascade (Cascade): Score with a fast model first and escalate uncertain CVs, or None
+        cascade_tally (CascadeTally): Cascade run totals, or None
+
+    Returns:
+        dict: Evaluation result including the 'output' filename
+    """
+    started = time.monotonic()
+    logger = logging.getLogger(__name__)
+    logger.info(f"Processing {parsed.path.name}")
+    note_compaction(parsed, compaction_tally)
+
+    cache_key, cached_result = lookup_cached_evaluation(parsed, evaluation_prompt, settings, eval_cache, refresh,
+                                                        cache_variant)
+    if cached_result is not None:
+        index_near_duplicate(parsed, near_duplicates)
+        record_cv_metrics(run_metrics, parsed, cached_result, started)
+        return cached_result
+
+    signature = duplicate = None
+    if near_duplicates is not None and cache_key is not None:
+        signature, reused, duplicate = find_near_duplicate(parsed, evaluation_prompt, cache_key, near_duplicates,
+                                                           settings, eval_cache, refresh, cache_variant)
+        if reused is not None:
+            index_near_duplicate(parsed, near_duplicates, signature)
+            record_cv_metrics(run_metrics, parsed, reused, started)
+            return reused
+
+    if prescreen is not None:
+        result = prescreen_cv(parsed, prescreen, evaluation_prompt, settings, prescreen_tally)
+        if result is not None:
+            record_cv_metrics(run_metrics, parsed, result, started)
+            return result
+
+    budget_parsed, skip_reason = check_token_budget(parsed, evaluation_prompt, settings, token_limit, token_budget)
+    if skip_reason is not None:
+        result = skip_cv(parsed, skip_reason)
+        record_cv_metrics(run_metrics, parsed, result, started)
+        return result
+    if budget_parsed is not parsed:
+        # Budget-compacted input differs from what the cache key describes
+        parsed, cache_key = budget_parsed, None
+
+    # Evaluate CV using AI
+    call_stats = CallStats()
+    with api_slots:
+        api_wait = time.monotonic() - started
+        if cascade is not None:
+            evaluation_result = evaluate_cv_cascade(parsed.text, evaluation_prompt, settings, cascade, call_stats,
+                                                    token_limit, cascade_tally, parsed.path.name)
+        else:
+            evaluation_result = evaluate_cv(parsed.text, evaluation_prompt, settings, stats=call_stats,
+                                            token_limit=token_limit)
+
+    result = store_evaluation(parsed, evaluation_result, cache_key, eval_cache)
+    flag_near_duplicate(result, duplicate)
+    if cache_key is not None and not is_error_result(result):
+        index_near_duplicate(parsed, near_duplicates, signature)
+    record_cv_metrics(run_metrics, parsed, result, started, call_stats, api_wait)
+    return result
+
+
+def evaluate_parsed_batch(batch, evaluation_prompt, api_slots, settings=DEFAULT_SETTINGS, eval_cache=None,
+                          refresh=False, cache_variant=None, compaction_tally=None, run_metrics=None,
+                          token_limit=None, token_budget=None, prescreen=None, prescreen_tally=None,
+                          near_duplicates=None, cascade=None, cascade_tally=None):
+    """
+    Evaluate several parsed CVs with one API call.
+
+    Cache hits are answered locally; only the remaining CVs are packed into
+    the batch request.
+
+    Args:
+        batch (list): ParsedCV items from the parse stage
+        evaluation_prompt (str): Prompt with evaluation criteria
+        api_slots (threading.BoundedSemaphore): Caps concurrent API requests
+        settings (GenerationSettings): Model and sampling settings
+        eval_cache (DiskCache): Evaluation cache, or None to disable caching
+        refresh (bool): Ignore cached evaluations but store fresh ones
+        cache_variant (str): Extra evaluation cache key part (see lookup_cached_evaluation)
+        compaction_tally (CompactionTally): Run totals for compaction savings
+        run_metrics (RunMetrics): Per-CV metrics for the run, or None
+        token_limit (int): Per-CV token budget, or None
+        token_budget (TokenBudget): Run-wide token budget, or None
+        prescreen (Prescreen): Local pre-screen for the role, or None to send every CV
+        prescreen_tally (PrescreenTally): Pre-screen run totals, or None
+        near_duplicates (NearDuplicateIndex): Reuse evaluations of near-duplicate CVs, or None
+        cascade (Cascade): Score with a fast model first and escalate uncertain CVs, or None
+        cascade_tally (CascadeTally): Cascade run totals, or None
+
+    Returns:
+        list: Evaluation results in the same order as `batch`
+    """
+    started = time.monotonic()
+    logger = logging.getLogger(__name__)
+    results = [None] * len(batch)
+    pending = []
+
+    for position, parsed in enumerate(batch):
+        note_compaction(parsed, compaction_tally)
+        cache_key, cached_result = lookup_cached_evaluation(parsed, evaluation_prompt, settings, eval_cache, refresh,
+                                                            cache_variant)
+        if cached_result is not None:
+            results[position] = cached_result
+            index_near_duplicate(parsed, near_duplicates)
+            record_cv_metrics(run_metrics, parsed, cached_result, started)
+            continue
+
+        signature = duplicate = None
+        if near_duplicates is not None and cache_key is not None:
+            signature, results[position], duplicate = find_near_duplicate(
+                parsed, evaluation_prompt, cache_key, near_duplicates, settings, eval_cache, refresh, cache_variant)
+            if results[position] is not None:
+                index_near_duplicate(parsed, near_duplicates, signature)
+                record_cv_metrics(run_metrics, parsed, results[position], started)
+                continue
+
+        if prescreen is not None:
+            results[position] = prescreen_cv(parsed, prescreen, evaluation_prompt, settings, prescreen_tally)
+            if results[position] is not None:
+                record_cv_metrics(run_metrics, parsed, results[position], started)
+                continue
+
+        budget_parsed, skip_reason = check_token_budget(parsed, evaluation_prompt, settings, token_limit,
+                                                        token_budget)
+        if skip_reason is not None:
+            results[position] = skip_cv(parsed, skip_reason)
+            record_cv_metrics(run_metrics, parsed, results[position], started)
+        elif budget_parsed is not parsed:
+            pending.append((position, budget_parsed, None, None, duplicate))
+        else:
+            pending.append((position, parsed, cache_key, signature, duplicate))
+
+    if pending:
+        logger.info(f"Processing batch of {len(pending)} CVs: "
+                    f"{', '.join(parsed.path.name for _, parsed, *_ in pending)}")
+        call_stats = [CallStats() for _ in pending]
+        wait_from = time.monotonic()
+        with api_slots:
+            api_wait = time.monotonic() - wait_from
+            cvs = [(parsed.path.name, parsed.text) for _, parsed, *_ in pending]
+            if cascade is not None:
+                evaluations = evaluate_cv_batch_cascade(cvs, evaluation_prompt, settings, cascade, call_stats,
+                                                        token_limit, cascade_tally)
+            else:
+                evaluations = evaluate_cv_batch(cvs, evaluation_prompt, settings, stats=call_stats,
+                                                token_limit=token_limit)
+
+        for (position, parsed, cache_key, signature, duplicate), evaluation_result, cv_stats in zip(
+                pending, evaluations, call_stats):
+            results[position] = store_evaluation(parsed, evaluation_result, cache_key, eval_cache)
+            flag_near_duplicate(results[position], duplicate)
+            if cache_key is not None and not is_error_result(results[position]):
+                index_near_duplicate(parsed, near_duplicates, signature)
+            record_cv_metrics(run_metrics, parsed, results[position], started, cv_stats, api_wait)
+
+    return results
+
+
+def error_row(pdf_file, exc, run_metrics=None):
+    """Build the result row recorded for a CV that could not be processed."""
+    error_result = build_error_result(f'Error: {str(exc)}')
+    error_result['output'] = pdf_file.name
+    if run_metrics is not None:
+        run_metrics.add(cv_record(pdf_file.name, 'error', error_class=type(exc).__name__))
+    return error_result
+
+
+def write_result(result, csv_writer, db_writer=None):
+    """Append a finished CV to the streamed CSV and, if enabled, the results database."""
+    csv_writer.write(result)
+    if db_writer is not None:
+        db_writer.write({**result, 'is_error': is_error_result(result)})
+
+
+def fan_out(parsed, targets):
+    """
+    Copies of a parsed CV for each role that evaluates it.
+
+    Parse-stage timings and the compaction report stay with the first copy
+    only, so run totals count each parse once.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage
+        targets (list): (role index, path) pairs from UniqueCV.targets
+
+    Yields:
+        tuple: (role index, ParsedCV carrying that role's path)
+    """
+    for n, (role_index, path) in enumerate(targets):
+        if n == 0:
+            yield role_index, parsed._replace(path=path)
+        else:
+            yield role_index, parsed._replace(path=path, timings=None, compaction=None, queued_at=None)
+
+
+def evaluate_for_roles(parsed, unique_cvs, role_options):
+    """
+    Evaluate one parsed CV for every role that includes it.
+
+    Args:
+        parsed (ParsedCV): Output of the parse stage; its index points into `unique_cvs`
+        unique_cvs (list): UniqueCV items given to the pipeline
+        role_options (list): evaluate_parsed_cv keyword arguments, one dict per role
+
+    Returns:
+        list: (role index, evaluation result) pairs
+    """
+    return [(role_index, evaluate_parsed_cv(role_parsed, **role_options[role_index]))
+            for role_index, role_parsed in fan_out(parsed, unique_cvs[parsed.index].targets)]
+
+
+def evaluate_batch_for_roles(batch, unique_cvs, role_options):
+    """
+    Evaluate a batch of parsed CVs for every role, one batch call per role.
+
+    Args:
+        batch (list): ParsedCV items from the parse stage
+        unique_cvs (list): UniqueCV items given to the pipeline
+        role_options (list): evaluate_parsed_batch keyword arguments, one dict per role
+
+    Returns:
+        list: One list of (role index, evaluation result) pairs per CV in `batch`
+    """
+    by_role = {}
+    for position, parsed in enumerate(batch):
+        for role_index, role_parsed in fan_out(parsed, unique_cvs[parsed.index].targets):
+            by_role.setdefault(role_index, []).append((position, role_parsed))
+
+    results = [[] for _ in batch]
+    for role_index, items in by_role.items():
+        evaluations = evaluate_parsed_batch([role_parsed for _, role_parsed in items], **role_options[role_index])
+        for (position, _), result in zip(items, evaluations):
+            results[position].append((role_index, result))
+    return results
+
+
+def error_rows_for_roles(pdf_file, exc, targets_by_path, run_metrics=None):
+    """Build the error row of a CV that could not be processed, for every role that includes it."""
+    return [(role_index, error_row(path, exc, run_metrics)) for role_index, path in targets_by_path[pdf_file]]
+
+
+def write_role_results(results, role_writers):
+    """
+    Write a CV's per-role results.
+
+    Args:
+        results (list): (role index, evaluation result) pairs
+        role_writers (list): (role, CSV writer, database writer or None) per role
+    """
+    for role_index, result in results:
+        role, csv_writer, db_writer = role_writers[role_index]
+        write_result({**result, 'role': role}, csv_writer, db_writer)
+
+
+def screen_cvs(unique_cvs, role_options, role_writers, run_metrics=None, by_content=False, **pipeline_options):
+    """
+    Parse distinct CVs once and evaluate each for every role that includes it.
+
+    Args:
+        unique_cvs (list): UniqueCV items from group_unique_cvs
+        role_options (list): evaluate_parsed_cv keyword arguments, one dict per role
+        role_writers (list): (role, CSV writer, database writer or None) per role
+        run_metrics (RunMetrics): Records CVs that fail, or None
+        by_content (bool): Whether `unique_cvs` were grouped (and hashed) by content
+        **pipeline_options: Passed on to run_pipeline
+
+    Returns:
+        list: run_pipeline results, one per distinct CV (None if never scheduled)
+    """
+    fan_out_options = dict(unique_cvs=unique_cvs, role_options=role_options)
+    return run_pipeline(
+        [cv.path for cv in unique_cvs],
+        partial(evaluate_for_roles, **fan_out_options),
+        partial(error_rows_for_roles, targets_by_path={cv.path: cv.targets for cv in unique_cvs},
+                run_metrics=run_metrics),
+        on_result=partial(write_role_results, role_writers=role_writers),
+        handle_batch=partial(evaluate_batch_for_roles, **fan_out_options),
+        file_hashes=[cv.file_hash for cv in unique_cvs] if by_content else None,
+        **pipeline_options
+    )
+
+
+def watch_folders(watcher, role_jobs, screen, should_stop, by_content=False, max_batch=WATCH_MAX_BATCH,
+                  after_batch=None, maintenance=None, maintenance_seconds=WATCH_MAINTENANCE_SECONDS,
+                  completed=None):
+    """
+    Screen CVs as they arrive in the watched folders, until told to stop.
+
+    At most `max_batch` CVs are handed to the pipeline at once (which in turn
+    bounds the CVs in flight with --queue-size); files that settle meanwhile
+    wait in the watcher for the next batch.
+
+    A CV is screened for every role whose folders contain it, except roles
+    that already have its current version from before the watch started
+    (with --roles, a CV screened for only some roles in an earlier run is
+    screened for the others only). New and changed files go to every role.
+
+    Args:
+        watcher (FolderWatcher): Watcher over the role folders
+        role_jobs (list): RoleJob per role; only their folders are used
+        screen (callable): Called as screen(unique_cvs) for each batch; returns run_pipeline results
+        should_stop (callable): Checked between batches, and passed to the pipeline by the caller
+        by_content (bool): Group the CVs of a batch by content hash (see group_unique_cvs)
+        max_batch (int): Most CVs screened per batch
+        after_batch (callable): Called with no arguments after every batch, or None
+        maintenance (callable): Called with no arguments every `maintenance_seconds`, or None
+        maintenance_seconds (float): Interval between maintenance calls
+        completed (list): Per role, {path: file_stamp} of the CVs already in
+            its output when the watch started, or None
+
+    Returns:
+        int: CVs screened
+    """
+    logger = logging.getLogger(__name__)
+    screened = 0
+    next_maintenance = time.monotonic() + maintenance_seconds
+    if completed is None:
+        completed = [{} for _ in role_jobs]
+    while not should_stop():
+        paths = watcher.poll(timeout=1.0, max_files=max_batch)
+        stamps = {path: file_stamp(path) for path in paths}
+        # Popped, since only the first hand-out of a file can be partly done: memory does not grow
+        batch_jobs = [job._replace(pdf_files=[path for path in paths
+                                              if path.parent in job.folders and done.pop(path, None) != stamps[path]])
+                      for job, done in zip(role_jobs, completed)]
+        unique_cvs = group_unique_cvs(batch_jobs, by_content)
+        if unique_cvs:
+            logger.info(f"Watch: screening {len(unique_cvs)} new or changed CVs"
+                        + (f" ({watcher.pending} more waiting)" if watcher.pending else ""))
+            results = screen(unique_cvs)
+            screened += sum(1 for result in results if result is not None)
+            if after_batch is not None:
+                after_batch()
+        if maintenance is not None and time.monotonic() >= next_maintenance:
+            maintenance()
+            next_maintenance = time.monotonic() + maintenance_seconds
+    return screened
+
+
 def main():
     """Main function to process CVs and evaluate them."""
     parser = argparse.ArgumentParser(description='AI-powered CV Screening Tool')
-    parser.add_argument('--folder', type=str, required=True, help='Path to folder containing CVs')
-    parser.add_argument('--output', type=str, default='results.csv', help='Output CSV file path')
-    
+    parser.add_argument('--folder', type=str, nargs='+', required=True,
+                        help='Path to folder containing CVs; each folder name is a job role (several folders '
+                             'are screened in one run, parsing each distinct CV once)')
+    parser.add_argument('--roles', type=str, nargs='+', default=None,
+                        help='Evaluate every CV in --folder for each of these job roles instead of the folder name')
+    parser.add_argument('--output', type=str, default='results.csv',
+                        help='Output CSV file path (with several roles: <output stem>.<role>.csv per role)')
+    parser.add_argument('--long-format', action='store_true',
+                        help='Write every role to --output as one table with a role column')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Number of CVs to evaluate concurrently')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='Maximum concurrent API requests (defaults to --workers)')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help='Number of PDF parser processes (defaults to the CPU count)')
+    parser.add_argument('--queue-size', type=int, default=PARSE_QUEUE_SIZE,
+                        help='Maximum parsed CVs waiting for evaluation')
+    parser.add_argument('--rpm', type=int, default=RATE_LIMIT_RPM,
+                        help='Client-side limit on API requests per minute, shared by all workers')
+    parser.add_argument('--tpm', type=int, default=RATE_LIMIT_TPM,
+                        help='Client-side limit on API tokens per minute, shared by all workers')
+    parser.add_argument('--http-pool-size', type=int, default=None,
+                        help=f'Keep-alive HTTP connections to the API (default: max of {HTTP_POOL_SIZE} '
+                             f'and --max-in-flight, doubled with --hedge)')
+    parser.add_argument('--request-timeout', type=float, default=HTTP_TIMEOUT_SECONDS,
+                        help='Read/write timeout in seconds for each API request')
+    parser.add_argument('--max-total-tokens', type=int, default=MAX_TOTAL_TOKENS,
+                        help='Stop scheduling new CVs once the run has used this many API tokens')
+    parser.add_argument('--max-tokens-per-cv', type=int, default=MAX_TOKENS_PER_CV,
+                        help='Compact (or skip) CVs estimated to need more API tokens than this')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Send a duplicate request when a call is slower than usual; the first valid '
+                             'response wins')
+    parser.add_argument('--hedge-percentile', type=float, default=HEDGE_PERCENTILE,
+                        help='Hedge calls with no first token (or not finished) by this percentile of recent calls')
+    parser.add_argument('--hedge-max-rate', type=float, default=HEDGE_MAX_EXTRA_RATE,
+                        help='Maximum hedged requests as a fraction of regular requests')
+    parser.add_argument('--model', type=str, default=None,
+                        help=f'Model name (default: {DEFAULT_SETTINGS.model})')
+    parser.add_argument('--temperature', type=float, default=None,
+                        help=f'Sampling temperature (default: {DEFAULT_SETTINGS.temperature})')
+    parser.add_argument('--max-completion-tokens', type=int, default=None,
+                        help=f'Cap on generated tokens incl. reasoning (default: {DEFAULT_SETTINGS.max_completion_tokens})')
+    parser.add_argument('--reasoning-effort', choices=REASONING_EFFORT_CHOICES, default=None,
+                        help=f'Reasoning effort for reasoning models; "none" for models without reasoning '
+                             f'(default: {DEFAULT_SETTINGS.reasoning_effort})')
+    parser.add_argument('--cascade', action='store_true',
+                        help='Score every CV with --fast-model first and re-score only uncertain or invalid '
+                             'answers with the main model')
+    parser.add_argument('--fast-model', type=str, default=FAST_MODEL_NAME,
+                        help='First-pass model for --cascade')
+    parser.add_argument('--fast-reasoning-effort', choices=REASONING_EFFORT_CHOICES, default=FAST_REASONING_EFFORT,
+                        help='Reasoning effort of --fast-model (default: same as the main model)')
+    parser.add_argument('--cascade-band', type=float, default=CASCADE_BAND,
+                        help='Escalate fast scores within this many points of the pass mark (70)')
+    parser.add_argument('--prescreen', action='store_true',
+                        help='Auto-reject CVs that mention too few of the role\'s skill keywords, without an API call')
+    parser.add_argument('--prescreen-threshold', type=float, default=PRESCREEN_THRESHOLD,
+                        help='Weighted share of the role\'s keywords (0-1) a CV must mention to be evaluated')
+    parser.add_argument('--prescreen-profiles', type=str, default=None,
+                        help='JSON file of skill keywords per role, replacing those built from the role name')
+    parser.add_argument('--near-duplicates', action='store_true',
+                        help='Reuse the cached evaluation of an earlier CV whose text is nearly identical '
+                             '(resubmissions under a new filename or export date)')
+    parser.add_argument('--near-duplicate-threshold', type=float, default=NEAR_DUP_THRESHOLD,
+                        help='Estimated text similarity (0-1) at which a CV counts as a near-duplicate')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Evaluate up to N CVs per API call (1 = one CV per call)')
+    parser.add_argument('--batch-max-tokens', type=int, default=BATCH_MAX_TOKENS,
+                        help='Maximum estimated CV tokens packed into one batch call')
+    parser.add_argument('--compact', action='store_true',
+                        help='Drop duplicated lines and non-evaluative sections before evaluation')
+    parser.add_argument('--max-cv-tokens', type=int, default=None,
+                        help='Trim each CV to this many tokens, keeping the highest-signal sections '
+                             '(implies --compact)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Keep results already in --output and only process the remaining CVs')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running: screen the remaining CVs, then every new or changed PDF as it '
+                             'arrives, appending to --output (implies --resume; stop with Ctrl-C or SIGTERM)')
+    parser.add_argument('--poll', action='store_true',
+                        help='With --watch, rescan the folders periodically instead of using inotify')
+    parser.add_argument('--settle-seconds', type=float, default=WATCH_SETTLE_SECONDS,
+                        help='With --watch, how long a PDF must be unchanged before it is parsed')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the evaluation and parsed-text caches')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-evaluate every CV and overwrite cached evaluations')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR,
+                        help='Directory for cached evaluations and parsed text')
+    parser.add_argument('--db', type=str, default=RESULTS_DB,
+                        help='SQLite database that accumulates results across runs (read by the dashboard)')
+    parser.add_argument('--no-db', action='store_true',
+                        help='Do not write results to the database (CSV output only)')
+    parser.add_argument('--run-log', type=str, default=None,
+                        help='JSON-lines file with per-CV stage timings and tokens (default: <output>.runlog.jsonl; '
+                             'appended to as CVs finish with --watch)')
+    parser.add_argument('--metrics-file', type=str, default=None,
+                        help='Prometheus text-format metrics file (default: <output>.prom)')
+    parser.add_argument('--no-metrics', action='store_true',
+                        help='Do not write the run log or the metrics file')
+
     args = parser.parse_args()
-    
+
     # Setup logging
     setup_logging()
     logger = logging.getLogger(__name__)
-    
-    # Validate input folder
-    folder_path = Path(args.folder)
-    if not folder_path.exists():
-        logger.error(f"Folder does not exist: {args.folder}")
-        return
-    
-    # Extract job role from folder name
-    job_role = folder_path.name.replace('_', ' ').replace('-', ' ').strip()
-    logger.info(f"Processing CVs for job role: '{job_role}'")
-    
-    # Build evaluation prompt based on job role
-    evaluation_prompt = build_evaluation_prompt(job_role)
-    
-    # Find all PDF files in the folder
-    pdf_files = list(folder_path.glob('*.pdf'))
-    if not pdf_files:
-        logger.warning(f"No PDF files found in {args.folder}")
+
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    max_in_flight = args.max_in_flight or args.workers
+    if max_in_flight < 1:
+        parser.error('--max-in-flight must be at least 1')
+    if args.parse_workers is not None and args.parse_workers < 1:
+        parser.error('--parse-workers must be at least 1')
+    if args.queue_size < 1:
+        parser.error('--queue-size must be at least 1')
+    if args.rpm is not None and args.rpm < 1:
+        parser.error('--rpm must be at least 1')
+    if args.tpm is not None and args.tpm < 1:
+        parser.error('--tpm must be at least 1')
+    if args.http_pool_size is not None and args.http_pool_size < 1:
+        parser.error('--http-pool-size must be at least 1')
+    if args.request_timeout <= 0:
+        parser.error('--request-timeout must be positive')
+    if args.max_total_tokens is not None and args.max_total_tokens < 1:
+        parser.error('--max-total-tokens must be at least 1')
+    if args.max_tokens_per_cv is not None and args.max_tokens_per_cv < 1:
+        parser.error('--max-tokens-per-cv must be at least 1')
+    if not 0 < args.hedge_percentile < 100:
+        parser.error('--hedge-percentile must be between 0 and 100')
+    if not 0 < args.hedge_max_rate <= 1:
+        parser.error('--hedge-max-rate must be above 0 and at most 1')
+    if args.cascade_band < 0:
+        parser.error('--cascade-band must not be negative')
+    if not 0 < args.prescreen_threshold < 1:
+        parser.error('--prescreen-threshold must be between 0 and 1')
+    if not 0 < args.near_duplicate_threshold <= 1:
+        parser.error('--near-duplicate-threshold must be above 0 and at most 1')
+    if args.near_duplicates and args.no_cache:
+        parser.error('--near-duplicates reuses cached evaluations and cannot be combined with --no-cache')
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    if args.max_completion_tokens is not None and args.max_completion_tokens < 1:
+        parser.error('--max-completion-tokens must be at least 1')
+    if args.max_cv_tokens is not None and args.max_cv_tokens < 1:
+        parser.error('--max-cv-tokens must be at least 1')
+    if args.settle_seconds <= 0:
+        parser.error('--settle-seconds must be positive')
+    compact = args.compact or args.max_cv_tokens is not None
+    # A watcher appends to the results of earlier runs
+    resume = args.resume or args.watch
+
+    # Validate input folders
+    for folder in args.folder:
+        if not Path(folder).exists():
+            logger.error(f"Folder does not exist: {folder}")
+            return
+
+    # One job per role: a role per folder (from its name), or the --roles list
+    role_jobs = plan_role_jobs(args.folder, args.roles)
+    if not role_jobs:
+        parser.error('--roles needs at least one non-empty role')
+    multi_role = len(role_jobs) > 1
+    fieldnames = LONG_FIELDNAMES if args.long_format else FIELDNAMES
+    if args.cascade:
+        fieldnames = [*fieldnames, TIER_FIELD]
+    outputs = [args.output if args.long_format or not multi_role else role_output_path(args.output, job.role)
+               for job in role_jobs]
+    shared = [output for output in dict.fromkeys(outputs) if outputs.count(output) > 1]
+    if shared and not args.long_format:
+        clashing = [job.role for job, output in zip(role_jobs, outputs) if output == shared[0]]
+        parser.error(f"roles {', '.join(map(repr, clashing))} would all write {shared[0]}; "
+                     f"rename them or use --long-format")
+
+    # Find all PDF files (sorted so output order is deterministic)
+    if not any(job.pdf_files for job in role_jobs) and not args.watch:
+        logger.warning(f"No PDF files found in {', '.join(args.folder)}")
         return
-    
-    logger.info(f"Found {len(pdf_files)} PDF files to process")
-    
-    results = []
-    
-    # Process each CV
-    for pdf_file in pdf_files:
-        logger.info(f"Processing {pdf_file.name}")
-        
+    all_pdf_files = {pdf_file for job in role_jobs for pdf_file in job.pdf_files}
+
+    # A single-role file resumed with --long-format gets that role filled in
+    default_role = role_jobs[0].role if not multi_role else None
+
+    # Skip CVs that already have a successful row from an earlier run
+    completed_stamps = [{} for _ in role_jobs]
+    if resume:
+        for role_index, (job, output) in enumerate(zip(role_jobs, outputs)):
+            if not Path(output).exists():
+                continue
+            try:
+                rows = read_results_from_csv(output, fieldnames, default_role)
+            except ValueError as e:
+                parser.error(f"cannot resume: {e}; use another --output or the options it was written with")
+            completed = {
+                row['output'] for row in rows
+                if not is_error_result(row) and row.get('role', job.role) == job.role
+            }
+            remaining = [pdf_file for pdf_file in job.pdf_files if pdf_file.name not in completed]
+            if args.watch:
+                # The version each role already has, so a CV is re-screened only for the roles missing it
+                completed_stamps[role_index] = {pdf_file: file_stamp(pdf_file) for pdf_file in job.pdf_files
+                                                if pdf_file.name in completed}
+            logger.info(f"Resuming: {len(job.pdf_files) - len(remaining)} CVs for '{job.role}' already in {output}")
+            role_jobs[role_index] = job._replace(pdf_files=remaining)
+
+    # Parse each distinct CV once; copies across folders are matched by content
+    by_content = len(args.folder) > 1
+    if args.watch:
+        # The watcher hands out the remaining CVs first, then new arrivals
+        remaining = {pdf_file for job in role_jobs for pdf_file in job.pdf_files}
+        seen = all_pdf_files - remaining
+        logger.info(f"Watching {', '.join(args.folder)}: {len(remaining)} CVs to screen now, then new or changed "
+                    f"PDFs as they arrive ({args.workers} workers, {max_in_flight} API requests in flight)")
+    else:
+        unique_cvs = group_unique_cvs(role_jobs, by_content)
+        evaluations = sum(len(job.pdf_files) for job in role_jobs)
+        logger.info(f"Found {len(unique_cvs)} PDF files to process "
+                    f"({args.workers} workers, {max_in_flight} API requests in flight)")
+        if multi_role:
+            logger.info(f"{evaluations} evaluations across {len(role_jobs)} roles from {len(unique_cvs)} distinct CVs")
+
+    eval_cache = None
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir
+        eval_cache = DiskCache(Path(cache_dir) / 'evaluations',
+                               max_age_days=EVAL_CACHE_MAX_AGE_DAYS,
+                               max_entries=EVAL_CACHE_MAX_ENTRIES)
+        eval_cache.evict()
+        get_text_cache(cache_dir).evict()
+
+    near_duplicates = None
+    if args.near_duplicates:
+        near_duplicates = NearDuplicateIndex(Path(cache_dir) / INDEX_FILENAME, args.near_duplicate_threshold)
+        near_duplicates.prune(EVAL_CACHE_MAX_AGE_DAYS)
+        logger.info(f"Near-duplicate index: {len(near_duplicates)} CVs, threshold {args.near_duplicate_threshold:.0%}")
+
+    api_slots = threading.BoundedSemaphore(max_in_flight)
+    configure_rate_limits(args.rpm, args.tpm)
+    hedge_policy = configure_hedging(args.hedge, args.hedge_percentile, args.hedge_max_rate)
+    # Hedges and cancelled losers hold connections on top of the in-flight cap
+    pool_size = max(HTTP_POOL_SIZE, max_in_flight * (2 if hedge_policy is not None else 1))
+    # The client itself is only created when the first API call is made
+    configure_http_client(args.http_pool_size or pool_size, args.request_timeout)
+
+    # Parse in worker processes while evaluations run; each row is appended
+    # to the output as soon as it is ready
+    compaction_tally = CompactionTally() if compact else None
+    cache_variant = f"compact-v{COMPACTOR_VERSION}-{args.max_cv_tokens}" if compact else None
+
+    output_stem = Path(args.output).with_suffix('')
+    run_log = args.run_log or f"{output_stem}.runlog.jsonl"
+    metrics_file = args.metrics_file or f"{output_stem}.prom"
+    if args.watch:
+        # Flat memory over days: stream the run log, keep a window for percentiles
+        run_metrics = RunMetrics(window=METRICS_WINDOW, log_path=None if args.no_metrics else run_log)
+    else:
+        run_metrics = RunMetrics()
+    token_budget = configure_token_budget(args.max_total_tokens)
+
+    prescreens = [None] * len(role_jobs)
+    prescreen_tally = None
+    if args.prescreen:
         try:
-            # Parse PDF to Markdown
-            markdown_content = parse_pdf_to_markdown(pdf_file)
-            
-            # Evaluate CV using AI
-            evaluation_result = evaluate_cv(markdown_content, evaluation_prompt)
-            
-            # Add filename to result
-            evaluation_result['output'] = pdf_file.name
-            
-            results.append(evaluation_result)
-            
-            logger.info(f"Completed processing {pdf_file.name}, score: {evaluation_result.get('score', 'N/A')}")
-            
-        except Exception as e:
-            logger.error(f"Error processing {pdf_file.name}: {str(e)}")
-            # Add error entry to results
-            results.append({
-                'output': pdf_file.name,
-                'educationalQualification': 'Error processing',
-                'jobHistory': 'Error processing',
-                'skillSet': 'Error processing',
-                'score': 0,
-                'justification': f'Error: {str(e)}'
-            })
-    
-    # Write results to CSV
-    write_results_to_csv(results, args.output)
-    logger.info(f"Results saved to {args.output}")
+            profiles = load_profiles(args.prescreen_profiles) if args.prescreen_profiles else None
+        except (OSError, ValueError) as e:
+            parser.error(f"--prescreen-profiles: {e}")
+        prescreens = build_prescreens([job.role for job in role_jobs], args.prescreen_threshold, profiles)
+        prescreen_tally = PrescreenTally()
+
+    cascade_tally = CascadeTally() if args.cascade else None
+
+    role_options = []
+    for job, prescreen in zip(role_jobs, prescreens):
+        logger.info(f"Processing CVs for job role: '{job.role}'")
+
+        # Build evaluation prompt based on job role (once per role)
+        evaluation_prompt = build_evaluation_prompt(job.role)
+
+        # Config defaults, then per-role overrides from config.py, then the command line
+        settings = resolve_generation_settings(
+            job.role,
+            model=args.model,
+            temperature=args.temperature,
+            max_completion_tokens=args.max_completion_tokens,
+            reasoning_effort=args.reasoning_effort
+        )
+        logger.info(f"Generation settings: {dict(settings._asdict())}")
+        cascade = None
+        role_cache_variant = cache_variant
+        if args.cascade:
+            fast_settings = settings._replace(model=args.fast_model,
+                                              reasoning_effort=args.fast_reasoning_effort or settings.reasoning_effort)
+            cascade = Cascade(fast_settings, band=args.cascade_band)
+            # Cascaded results depend on both models and the band
+            role_cache_variant = '|'.join(filter(None, [cache_variant, cascade.cache_variant()]))
+            logger.info(f"Cascade: {cascade.fast_settings.model} first, {settings.model} for scores within "
+                        f"{cascade.band:g} of {cascade.pass_score} or invalid answers")
+        if prescreen is not None:
+            logger.info(f"Pre-screen: {len(prescreen.profile)} keywords ({', '.join(prescreen.profile.terms)}), "
+                        f"threshold {prescreen.threshold:.0%}")
+        elif args.prescreen:
+            logger.warning(f"Not pre-screening '{job.role}': too few skill keywords for this role; add them to "
+                           f"ROLE_SKILL_PROFILES in config.py or a --prescreen-profiles file")
+
+        role_options.append(dict(evaluation_prompt=evaluation_prompt, api_slots=api_slots, settings=settings,
+                                 eval_cache=eval_cache, refresh=args.refresh,
+                                 cache_variant=role_cache_variant, compaction_tally=compaction_tally,
+                                 run_metrics=run_metrics, token_limit=args.max_tokens_per_cv,
+                                 token_budget=token_budget, prescreen=prescreen, prescreen_tally=prescreen_tally,
+                                 near_duplicates=near_duplicates, cascade=cascade, cascade_tally=cascade_tally))
+
+    store = None
+    db_writers = [None] * len(role_jobs)
+    if not args.no_db:
+        store = ResultStore(args.db)
+        for role_index, (job, options) in enumerate(zip(role_jobs, role_options)):
+            settings = options['settings']
+            run_settings = settings._asdict()
+            if options['cascade'] is not None:
+                run_settings.update(fast_model=options['cascade'].fast_settings.model,
+                                    fast_reasoning_effort=options['cascade'].fast_settings.reasoning_effort,
+                                    cascade_band=options['cascade'].band)
+            run_id = store.start_run(job.role, settings.model, text_sha256(options['evaluation_prompt']),
+                                     run_settings, ', '.join(str(folder) for folder in job.folders))
+            db_writers[role_index] = store.writer(run_id, job.role, DB_WRITE_BATCH_SIZE, DB_WRITE_INTERVAL_SECONDS)
+            logger.info(f"Recording results for '{job.role}' in {args.db} (run {run_id})")
+
+    stop_requested = threading.Event()
+    should_stop = (lambda: stop_requested.is_set() or (token_budget is not None and token_budget.exhausted))
+    pipeline_options = dict(parse_workers=args.parse_workers, eval_workers=args.workers,
+                            queue_size=args.queue_size, cache_dir=cache_dir, batch_size=args.batch_size,
+                            batch_max_tokens=args.batch_max_tokens, compact=compact,
+                            max_cv_tokens=args.max_cv_tokens, should_stop=should_stop,
+                            shield_workers=args.watch)
+
+    def request_stop(signum, frame):
+        logger.info(f"{signal.Signals(signum).name} received: finishing the CVs in flight, then stopping "
+                    f"(send it again to stop immediately)")
+        stop_requested.set()
+        signal.signal(signum, default_handlers[signum])
+
+    def maintenance():
+        if eval_cache is not None:
+            eval_cache.evict()
+            get_text_cache(cache_dir).evict()
+        if near_duplicates is not None:
+            near_duplicates.prune(EVAL_CACHE_MAX_AGE_DAYS)
+
+    def after_batch():
+        # The watcher may idle for hours; commit the batch's last rows for the dashboard now
+        for db_writer in db_writers:
+            if db_writer is not None:
+                db_writer.flush()
+        if not args.no_metrics:
+            run_metrics.write_prometheus(metrics_file)
+
+    default_handlers = {}
+    results = []
+    try:
+        with ExitStack() as stack:
+            csv_writers = {}
+            for output in outputs:
+                if output not in csv_writers:
+                    csv_writers[output] = stack.enter_context(
+                        StreamingCSVWriter(output, resume=resume, fieldnames=fieldnames,
+                                           default_role=default_role))
+            role_writers = [(job.role, csv_writers[output], db_writer)
+                            for job, output, db_writer in zip(role_jobs, outputs, db_writers)]
+            screen = partial(screen_cvs, role_options=role_options, role_writers=role_writers,
+                             run_metrics=run_metrics, by_content=by_content, **pipeline_options)
+
+            if args.watch:
+                # Stop gracefully on Ctrl-C or SIGTERM: no new CVs, in-flight ones finish
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    default_handlers[signum] = signal.signal(signum, request_stop)
+                watcher = stack.enter_context(
+                    FolderWatcher(args.folder, settle_seconds=args.settle_seconds, use_inotify=not args.poll,
+                                  seen=seen))
+                logger.info(f"Watching for new CVs ({watcher.mode}); stop with Ctrl-C or SIGTERM")
+                screened = watch_folders(watcher, role_jobs, screen, should_stop, by_content,
+                                         after_batch=after_batch, maintenance=maintenance,
+                                         completed=completed_stamps)
+                logger.info(f"Stopped watching after screening {screened} CVs")
+            else:
+                results = screen(unique_cvs)
+    finally:
+        for signum, handler in default_handlers.items():
+            signal.signal(signum, handler)
+        # Whatever finished is committed, even if the run was interrupted
+        if store is not None:
+            for db_writer in db_writers:
+                db_writer.close()
+            store.close()
+        if near_duplicates is not None:
+            near_duplicates.close()
+
+    if token_budget is not None:
+        logger.info(f"Token budget: {token_budget.used} of {token_budget.max_tokens} tokens used")
+        unscheduled = sum(1 for result in results if result is None)
+        if token_budget.exhausted and args.watch:
+            logger.warning("Token budget exhausted: stopped watching; restart with --watch to continue")
+        elif token_budget.exhausted:
+            logger.warning(f"Token budget exhausted: {unscheduled} CVs were not scheduled; "
+                           f"re-run with --resume to continue")
+
+    if hedge_policy is not None:
+        logger.info(f"Hedging: {hedge_policy.hedges} hedged requests for {hedge_policy.primaries} calls "
+                    f"({hedge_policy.hedge_wins} won)")
+
+    if prescreen_tally is not None and prescreen_tally.screened:
+        logger.info(f"Pre-screen auto-rejected {prescreen_tally.rejected} of {prescreen_tally.screened} CVs, "
+                    f"saving {prescreen_tally.rejected} API calls (~{prescreen_tally.saved_tokens} estimated tokens); "
+                    f"check false rejects with python app/prescreen.py")
+
+    if cascade_tally is not None and cascade_tally.cvs:
+        logger.info(cascade_tally.format_report())
+
+    if compaction_tally is not None and compaction_tally.cvs:
+        logger.info(f"Compaction saved {compaction_tally.saved_tokens} of {compaction_tally.original_tokens} "
+                    f"estimated CV tokens across {compaction_tally.cvs} CVs")
+
+    if usage_totals.requests:
+        logger.info(f"API usage: {usage_totals.requests} requests, {usage_totals.prompt_tokens} prompt tokens "
+                    f"({usage_totals.cached_tokens} cached, {usage_totals.cached_ratio:.0%}), "
+                    f"{usage_totals.completion_tokens} completion tokens "
+                    f"({usage_totals.completion_tokens / usage_totals.requests:.0f} per call)")
+        logger.info(f"API latency: p50 {usage_totals.latency_percentile(50):.2f}s, "
+                    f"p95 {usage_totals.latency_percentile(95):.2f}s, "
+                    f"max {usage_totals.latency_percentile(100):.2f}s")
+
+    run_metrics.finish()
+    logger.info(f"Run summary:\n{run_metrics.format_summary()}")
+    if not args.no_metrics:
+        if args.watch:
+            run_metrics.close_log()
+        else:
+            run_metrics.write_run_log(run_log)
+        run_metrics.write_prometheus(metrics_file)
+        logger.info(f"Run log written to {run_log}, metrics to {metrics_file}")
+
+    for output in dict.fromkeys(outputs):
+        # Rewrite the streamed rows in filename order
+        total = finalize_results_csv(output, fieldnames)
+        logger.info(f"Results saved to {output} ({total} rows)" if args.long_format
+                    else f"Results saved to {output} ({total} CVs)")
+
+        # Typed columnar copy for the dashboard (skipped if pyarrow is not installed)
+        sidecar = write_sidecar(output)
+        if sidecar is not None:
+            logger.info(f"Parquet sidecar written to {sidecar}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
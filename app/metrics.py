@@ -0,0 +1,436 @@
+"""
+Run metrics: per-CV stage timings, token counts, retries and error classes.
+
+Each CV processed in a run produces one record (a flat dict). At the end of
+the run the records are written as a JSON-lines run log, summarised into a
+Prometheus text-format file (for node_exporter's textfile collector or a
+push gateway) and printed as a summary table.
+
+Stages, in the order a CV passes through them:
+    hash, parse, compact    in the parser process
+    queue                   parsed, waiting for an evaluation thread
+    api_wait                waiting for an in-flight API slot
+    rate_limit_wait         waiting for the shared rate limiter
+    first_token             request sent -> first streamed token
+    generation              first token -> end of stream
+    backoff                 sleeping between retries
+    evaluate                the whole evaluation stage for the CV
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+STAGES = ('hash', 'parse', 'compact', 'queue', 'api_wait', 'rate_limit_wait', 'first_token',
+          'generation', 'backoff', 'evaluate')
+
+TOKEN_KINDS = ('prompt', 'cached', 'completion')
+
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_PREFIX = 'cv_screening'
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (list): Numbers, in any order
+        percent (float): 0-100
+
+    Returns:
+        float: The value at that percentile (0.0 for an empty list)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class CallStats:
+    """
+    What happened during the API calls made for one CV (or one batch request).
+
+    Filled in by ai_evaluator; not thread-safe, since each CV is evaluated by
+    a single thread (racing hedged requests get their own CallStats, merged
+    in afterwards).
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.retries = 0
+        self.rate_limit_wait = 0.0
+        self.backoff = 0.0
+        self.first_token = 0.0
+        self.generation = 0.0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.errors = []
+
+    def add_call(self, usage, latency, first_token_latency, rate_limit_wait):
+        """
+        Record one completed API call.
+
+        Args:
+            usage (dict): Token usage from the stream, or None
+            latency (float): Seconds from sending the request to the end of the stream
+            first_token_latency (float): Seconds until the first token, or None
+            rate_limit_wait (float): Seconds spent waiting for the rate limiter
+        """
+        self.attempts += 1
+        self.rate_limit_wait += rate_limit_wait
+        first_token = first_token_latency if first_token_latency is not None else latency
+        self.first_token += first_token
+        self.generation += latency - first_token
+        if usage is not None:
+            self.prompt_tokens += usage['prompt_tokens']
+            self.cached_tokens += usage['cached_tokens']
+            self.completion_tokens += usage['completion_tokens']
+
+    def add_error(self, exc, retried):
+        """
+        Record a failed attempt.
+
+        Args:
+            exc (Exception): The error
+            retried (bool): Whether another attempt follows
+        """
+        self.attempts += 1
+        self.errors.append(type(exc).__name__)
+        if retried:
+            self.retries += 1
+
+    def merge(self, other, timings=True):
+        """
+        Add the stats of a request raced against another (a hedged call).
+
+        Args:
+            other (CallStats): Stats of one of the racing requests
+            timings (bool): Also add its durations (only for the request
+                whose response was used; the loser ran concurrently)
+        """
+        self.attempts += other.attempts
+        self.retries += other.retries
+        self.errors.extend(other.errors)
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_tokens += other.cached_tokens
+        self.completion_tokens += other.completion_tokens
+        if timings:
+            self.rate_limit_wait += other.rate_limit_wait
+            self.backoff += other.backoff
+            self.first_token += other.first_token
+            self.generation += other.generation
+
+    def add_share(self, other, share, counts=True):
+        """
+        Add a share of another CallStats (a batch call split across its CVs).
+
+        Every CV in the batch waited for the whole call, so durations are
+        added in full; tokens are split by `share`.
+
+        Args:
+            other (CallStats): Stats of the shared call
+            share (float): Fraction of the tokens to attribute to this CV
+            counts (bool): Also add attempts, retries and errors (pass True
+                for exactly one CV per batch so run totals stay exact)
+        """
+        if counts:
+            self.attempts += other.attempts
+            self.retries += other.retries
+            self.errors.extend(other.errors)
+        self.rate_limit_wait += other.rate_limit_wait
+        self.backoff += other.backoff
+        self.first_token += other.first_token
+        self.generation += other.generation
+        self.prompt_tokens += round(other.prompt_tokens * share)
+        self.cached_tokens += round(other.cached_tokens * share)
+        self.completion_tokens += round(other.completion_tokens * share)
+
+
+def cv_record(filename, status, parse_timings=None, call_stats=None, error_class=None, tier=None, **seconds):
+    """
+    Build the run-log record for one CV.
+
+    Args:
+        filename (str): CV filename
+        status (str): 'evaluated', 'cached', 'prescreened', 'duplicate', 'skipped' or 'error'
+        parse_timings (dict): ParsedCV.timings from the parse stage, or None
+        call_stats (CallStats): API call stats, or None if no call was made
+        error_class (str): Exception class name for failed CVs
+        tier (str): Cascade tier ('fast' or 'large') that produced the result, if cascading
+        **seconds: Other stage durations, e.g. queue=0.2, api_wait=0.1, evaluate=3.4
+
+    Returns:
+        dict: Flat record with '<stage>_seconds', token and retry fields
+    """
+    record = {'file': filename, 'status': status}
+    if tier:
+        record['tier'] = tier
+    stages = dict(seconds)
+    parse_timings = parse_timings or {}
+    for stage in ('hash', 'parse', 'compact'):
+        if stage in parse_timings:
+            stages[stage] = parse_timings[stage]
+    record['pages'] = parse_timings.get('pages')
+    record['parse_cache_hit'] = parse_timings.get('cache_hit')
+
+    if call_stats is not None:
+        stages.update(rate_limit_wait=call_stats.rate_limit_wait, first_token=call_stats.first_token,
+                      generation=call_stats.generation, backoff=call_stats.backoff)
+    for stage in STAGES:
+        if stage in stages:
+            record[f'{stage}_seconds'] = round(stages[stage], 4)
+
+    record['attempts'] = call_stats.attempts if call_stats else 0
+    record['retries'] = call_stats.retries if call_stats else 0
+    record['prompt_tokens'] = call_stats.prompt_tokens if call_stats else 0
+    record['cached_tokens'] = call_stats.cached_tokens if call_stats else 0
+    record['completion_tokens'] = call_stats.completion_tokens if call_stats else 0
+    record['hedges'] = call_stats.hedges if call_stats else 0
+    record['hedge_wins'] = call_stats.hedge_wins if call_stats else 0
+    errors = list(call_stats.errors) if call_stats else []
+    if error_class and error_class not in errors:
+        errors.append(error_class)
+    record['errors'] = errors
+    return record
+
+
+class RunMetrics:
+    """
+    Thread-safe collection of per-CV records for one run.
+
+    Counts and totals cover every record. With a `window`, only the most
+    recent records are kept for percentiles, and with a `log_path` each
+    record is appended to the run log as it arrives. A long-running --watch
+    process uses both, so its memory use does not grow with uptime.
+    """
+
+    def __init__(self, window=None, log_path=None):
+        """
+        Args:
+            window (int): Recent records kept for percentiles (None = all)
+            log_path (str): Stream records to this run log (appended to), or None
+        """
+        self._lock = threading.Lock()
+        self.records = deque(maxlen=window) if window else []
+        self._log = open(log_path, 'a', encoding='utf-8') if log_path else None
+        self._cvs = 0
+        self._statuses = {}
+        self._tiers = {}
+        self._errors = {}
+        self._counters = {'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0}
+        self._tokens = {kind: 0 for kind in TOKEN_KINDS}
+        self._stage_totals = {}
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        self.finished = None
+
+    def add(self, record):
+        """
+        Add one CV's record.
+
+        Args:
+            record (dict): Output of cv_record
+        """
+        with self._lock:
+            self.records.append(record)
+            self._cvs += 1
+            self._statuses[record['status']] = self._statuses.get(record['status'], 0) + 1
+            if 'tier' in record:
+                self._tiers[record['tier']] = self._tiers.get(record['tier'], 0) + 1
+            for error in record['errors']:
+                self._errors[error] = self._errors.get(error, 0) + 1
+            for counter in self._counters:
+                self._counters[counter] += record.get(counter, 0)
+            for kind in TOKEN_KINDS:
+                self._tokens[kind] += record[f'{kind}_tokens']
+            for stage in STAGES:
+                if f'{stage}_seconds' in record:
+                    count, total = self._stage_totals.get(stage, (0, 0.0))
+                    self._stage_totals[stage] = (count + 1, total + record[f'{stage}_seconds'])
+            if self._log is not None:
+                self._log.write(json.dumps({'type': 'cv', **record}, ensure_ascii=False) + '\n')
+                self._log.flush()
+
+    def finish(self):
+        """Mark the end of the run (fixes the duration used for throughput)."""
+        self.finished = time.monotonic()
+
+    @property
+    def duration(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def summary(self):
+        """
+        Aggregate the records.
+
+        Returns:
+            dict: Counts by status and cascade tier, token and retry totals, error classes,
+                per-stage totals and percentiles, and throughput (percentiles
+                and max cover the records in the window)
+        """
+        with self._lock:
+            records = list(self.records)
+            cvs = self._cvs
+            statuses = dict(self._statuses)
+            tiers = dict(self._tiers)
+            errors = dict(self._errors)
+            counters = dict(self._counters)
+            tokens = dict(self._tokens)
+            stage_totals = dict(self._stage_totals)
+
+        stages = {}
+        for stage in STAGES:
+            if stage not in stage_totals:
+                continue
+            count, total = stage_totals[stage]
+            values = [record[f'{stage}_seconds'] for record in records if f'{stage}_seconds' in record]
+            stages[stage] = {
+                'count': count,
+                'sum': round(total, 4),
+                'p50': round(percentile(values, 50), 4),
+                'p95': round(percentile(values, 95), 4),
+                'p99': round(percentile(values, 99), 4),
+                'max': round(max(values, default=0.0), 4),
+            }
+
+        duration = self.duration
+        return {
+            'cvs': cvs,
+            'statuses': statuses,
+            'tiers': tiers,
+            'duration_seconds': round(duration, 3),
+            'cvs_per_minute': round(cvs / duration * 60, 2) if duration > 0 else 0.0,
+            'api_attempts': counters['attempts'],
+            'retries': counters['retries'],
+            'hedges': counters['hedges'],
+            'hedge_wins': counters['hedge_wins'],
+            'tokens': tokens,
+            'errors': errors,
+            'stages': stages,
+        }
+
+    def write_run_log(self, path):
+        """
+        Write one JSON line per CV followed by a run summary line.
+
+        Args:
+            path (str): Output file
+        """
+        with self._lock:
+            records = list(self.records)
+        with open(path, 'w', encoding='utf-8') as log_file:
+            for record in records:
+                log_file.write(json.dumps({'type': 'cv', **record}, ensure_ascii=False) + '\n')
+            log_file.write(json.dumps({'type': 'run', 'started_at': self.started_at, **self.summary()},
+                                      ensure_ascii=False) + '\n')
+
+    def close_log(self):
+        """Append the run summary line to a streamed run log and close it."""
+        with self._lock:
+            log_file, self._log = self._log, None
+        if log_file is not None:
+            log_file.write(json.dumps({'type': 'run', 'started_at': self.started_at, **self.summary()},
+                                      ensure_ascii=False) + '\n')
+            log_file.close()
+
+    def write_prometheus(self, path):
+        """
+        Write run totals and stage summaries in Prometheus text format.
+
+        The file is written to a temporary path and renamed into place, as
+        the textfile collector expects.
+
+        Args:
+            path (str): Output file (conventionally *.prom)
+        """
+        summary = self.summary()
+        with self._lock:
+            records = list(self.records)
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}" if label_text
+                             else f"{METRIC_PREFIX}_{name} {value}")
+
+        metric('cvs_total', 'counter', 'CVs processed in the run, by outcome.',
+               [({'status': status}, count) for status, count in sorted(summary['statuses'].items())])
+        if summary['tiers']:
+            metric('cvs_by_tier_total', 'counter', 'Cascaded CVs by the model tier that produced the result.',
+                   [({'tier': tier}, count) for tier, count in sorted(summary['tiers'].items())])
+        metric('api_attempts_total', 'counter', 'API requests attempted.', [({}, summary['api_attempts'])])
+        metric('retries_total', 'counter', 'API requests retried after an error.', [({}, summary['retries'])])
+        metric('hedges_total', 'counter', 'Duplicate requests sent for slow calls.', [({}, summary['hedges'])])
+        metric('hedge_wins_total', 'counter', 'Hedged requests whose response was used.',
+               [({}, summary['hedge_wins'])])
+        metric('tokens_total', 'counter', 'Tokens reported by the API.',
+               [({'kind': kind}, summary['tokens'][kind]) for kind in TOKEN_KINDS])
+        metric('errors_total', 'counter', 'Errors by exception class.',
+               [({'class': name}, count) for name, count in sorted(summary['errors'].items())])
+
+        samples = []
+        for stage in STAGES:
+            values = [record[f'{stage}_seconds'] for record in records if f'{stage}_seconds' in record]
+            if not values:
+                continue
+            for quantile in SUMMARY_QUANTILES:
+                samples.append(({'stage': stage, 'quantile': f'{quantile:g}'}, percentile(values, quantile * 100)))
+        metric('stage_seconds', 'summary', 'Per-CV time spent in each stage.', samples)
+        # _sum and _count belong to the same summary family
+        for stage, stats in summary['stages'].items():
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]}')
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+        metric('run_duration_seconds', 'gauge', 'Wall-clock duration of the run.',
+               [({}, summary['duration_seconds'])])
+        metric('throughput_cvs_per_minute', 'gauge', 'CVs processed per minute over the run.',
+               [({}, summary['cvs_per_minute'])])
+        metric('run_start_timestamp_seconds', 'gauge', 'Unix time the run started.',
+               [({}, round(self.started_at, 3))])
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as prom_file:
+            prom_file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+    def format_summary(self):
+        """
+        Render the run summary as a plain-text table.
+
+        Returns:
+            str: Multi-line summary
+        """
+        summary = self.summary()
+        statuses = ', '.join(f"{count} {status}" for status, count in sorted(summary['statuses'].items()))
+        tokens = summary['tokens']
+        lines = [
+            f"{summary['cvs']} CVs in {summary['duration_seconds']:.1f}s "
+            f"({summary['cvs_per_minute']:.1f} CVs/min): {statuses or 'none'}",
+            f"API: {summary['api_attempts']} requests, {summary['retries']} retries; tokens: "
+            f"{tokens['prompt']} prompt ({tokens['cached']} cached), {tokens['completion']} completion",
+        ]
+        if summary['hedges']:
+            lines.append(f"Hedged requests: {summary['hedges']} sent, {summary['hedge_wins']} won")
+        if summary['errors']:
+            lines.append("Errors: " + ', '.join(f"{name} x{count}" for name, count in sorted(summary['errors'].items())))
+
+        lines.append(f"{'stage':<16} {'count':>6} {'total s':>9} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'max s':>8}")
+        for stage, stats in summary['stages'].items():
+            lines.append(f"{stage:<16} {stats['count']:>6} {stats['sum']:>9.2f} {stats['p50']:>8.3f} "
+                         f"{stats['p95']:>8.3f} {stats['p99']:>8.3f} {stats['max']:>8.3f}")
+        return '\n'.join(lines)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
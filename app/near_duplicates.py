@@ -0,0 +1,293 @@
+"""
+Near-duplicate CV detection with MinHash and locality-sensitive hashing.
+
+Resubmitted CVs often differ only in filename, export date or photo, so
+their byte hash, and with it the evaluation cache key, changes. Here each
+parsed text is reduced to a MinHash signature over word shingles. Numbers
+are left out of the shingles, so a new date or phone number barely moves
+the signature. The fraction of equal signature slots estimates the Jaccard
+similarity of two CVs' shingle sets.
+
+Signatures are split into bands, and every band is stored as a bucket row
+in a SQLite index that persists between runs, next to the caches. A lookup
+fetches only the CVs sharing at least one bucket with the new one, a few
+indexed queries however large the corpus grows. Their full signatures are
+then compared to confirm the similarity.
+
+NumPy is imported on first use, so the CLI does not pay for it at startup.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+from config import NEAR_DUP_NUM_PERM, NEAR_DUP_BANDS, NEAR_DUP_SHINGLE_WORDS, NEAR_DUP_MIN_SHINGLES
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'near_duplicates.db'
+
+# Words without digits; numbers (dates, phone numbers) change between re-exports
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+# Fixed seed so signatures stay comparable across runs and machines
+_SEED = 0x5EED
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS signatures (
+    file_hash TEXT PRIMARY KEY,
+    name TEXT,
+    signature BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    file_hash TEXT NOT NULL REFERENCES signatures(file_hash) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS links (
+    file_hash TEXT PRIMARY KEY,
+    name TEXT,
+    duplicate_of TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    linked_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_buckets ON buckets(band, bucket);
+CREATE INDEX IF NOT EXISTS idx_buckets_file ON buckets(file_hash);
+"""
+
+# An indexed CV similar to the one looked up; `similarity` is the estimated
+# Jaccard similarity of their shingle sets
+Match = namedtuple('Match', ['file_hash', 'name', 'similarity'])
+
+
+def shingles(text, size=NEAR_DUP_SHINGLE_WORDS):
+    """
+    Hashed word shingles of a text.
+
+    Args:
+        text (str): Parsed CV text
+        size (int): Words per shingle
+
+    Returns:
+        set: 32-bit hashes of every run of `size` consecutive words
+    """
+    words = _WORD_RE.findall(text.lower())
+    return {zlib.crc32(' '.join(words[start:start + size]).encode('utf-8'))
+            for start in range(max(0, len(words) - size + 1))}
+
+
+class MinHasher:
+    """Computes MinHash signatures with a fixed family of hash functions."""
+
+    def __init__(self, num_perm=NEAR_DUP_NUM_PERM):
+        """
+        Args:
+            num_perm (int): Signature length
+        """
+        import numpy as np
+
+        rng = np.random.default_rng(_SEED)
+        # Multiply-shift hashing: odd 64-bit multipliers, keep the high 32 bits
+        self._multipliers = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._offsets = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_hashes):
+        """
+        MinHash signature of a set of shingle hashes.
+
+        Args:
+            shingle_hashes (set): Output of shingles()
+
+        Returns:
+            numpy.ndarray: uint32 array of length num_perm
+        """
+        import numpy as np
+
+        values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+        # uint64 arithmetic wraps around, which is what multiply-shift hashing wants
+        hashed = (np.outer(values, self._multipliers) + self._offsets) >> np.uint64(32)
+        return hashed.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures (share of equal slots)."""
+    return float((signature == other).mean())
+
+
+class NearDuplicateIndex:
+    """
+    Persistent LSH index of MinHash signatures, keyed by PDF file hash.
+
+    Thread-safe: one connection is shared by all evaluation threads and
+    serialized with a lock, like ResultStore.
+    """
+
+    def __init__(self, path, threshold, num_perm=NEAR_DUP_NUM_PERM, bands=NEAR_DUP_BANDS,
+                 shingle_words=NEAR_DUP_SHINGLE_WORDS, min_shingles=NEAR_DUP_MIN_SHINGLES):
+        """
+        Args:
+            path (str | Path): Index database (created if missing)
+            threshold (float): Minimum estimated similarity for a match (0-1)
+            num_perm (int): Signature length; must be a multiple of `bands`
+            bands (int): LSH bands; more bands find less similar candidates
+            shingle_words (int): Words per shingle
+            min_shingles (int): Texts with fewer shingles (e.g. scans with no
+                extracted text) are neither indexed nor matched
+
+        Raises:
+            ValueError: If num_perm is not a multiple of bands
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = str(path)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_words = shingle_words
+        self.min_shingles = min_shingles
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            with self._conn:
+                self._conn.executescript(SCHEMA)
+                self._check_parameters(f"{num_perm}/{bands}/{shingle_words}/{_SEED}")
+
+    def _check_parameters(self, parameters):
+        """Signatures made with other parameters can't be compared; start over if they changed."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'parameters'").fetchone()
+        if row is not None and row[0] == parameters:
+            return
+        if row is not None:
+            logger.info(f"Near-duplicate parameters changed; clearing {self.path}")
+            self._conn.execute("DELETE FROM buckets")
+            self._conn.execute("DELETE FROM signatures")
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('parameters', ?)", (parameters,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def signature(self, text):
+        """
+        MinHash signature of a parsed CV.
+
+        Args:
+            text (str): Parsed CV text
+
+        Returns:
+            numpy.ndarray: The signature, or None if the text is too short to compare
+        """
+        shingle_hashes = shingles(text, self.shingle_words)
+        if len(shingle_hashes) < self.min_shingles:
+            return None
+        return self._hasher.signature(shingle_hashes)
+
+    def _buckets(self, signature):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            yield band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'big', signed=True)
+
+    def find(self, signature, exclude=None):
+        """
+        Indexed CVs at least `threshold` similar to a signature.
+
+        Args:
+            signature (numpy.ndarray): Output of signature()
+            exclude (str): File hash to leave out (the CV itself)
+
+        Returns:
+            list: Match items, most similar first
+        """
+        import numpy as np
+
+        if signature is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for band, bucket in self._buckets(signature):
+                candidates.update(row[0] for row in self._conn.execute(
+                    "SELECT file_hash FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+            candidates.discard(exclude)
+            rows = [self._conn.execute("SELECT file_hash, name, signature FROM signatures WHERE file_hash = ?",
+                                       (file_hash,)).fetchone() for file_hash in candidates]
+
+        matches = []
+        for file_hash, name, stored in filter(None, rows):
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= self.threshold:
+                matches.append(Match(file_hash, name, score))
+        return sorted(matches, key=lambda match: -match.similarity)
+
+    def add(self, file_hash, name, signature):
+        """
+        Index a CV (no-op if it is already indexed or too short to compare).
+
+        Args:
+            file_hash (str): SHA-256 of the PDF bytes
+            name (str): Filename, for links and logs
+            signature (numpy.ndarray): Output of signature()
+        """
+        if signature is None:
+            return
+        with self._lock, self._conn:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO signatures (file_hash, name, signature, added_at) VALUES (?, ?, ?, ?)",
+                (file_hash, name, signature.tobytes(), time.time())).rowcount
+            if inserted:
+                self._conn.executemany("INSERT INTO buckets (band, bucket, file_hash) VALUES (?, ?, ?)",
+                                       [(band, bucket, file_hash) for band, bucket in self._buckets(signature)])
+
+    def link(self, file_hash, name, match):
+        """
+        Record that a CV was recognised as a near-duplicate of another.
+
+        Args:
+            file_hash (str): SHA-256 of the new PDF
+            name (str): Its filename
+            match (Match): The indexed CV it duplicates
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO links (file_hash, name, duplicate_of, similarity, linked_at) "
+                "VALUES (?, ?, ?, ?, ?)", (file_hash, name, match.file_hash, match.similarity, time.time()))
+
+    def prune(self, max_age_days):
+        """
+        Drop signatures older than the evaluations they could lead to.
+
+        Args:
+            max_age_days (float): Age limit, normally EVAL_CACHE_MAX_AGE_DAYS
+
+        Returns:
+            int: Signatures removed
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM signatures WHERE added_at < ?", (cutoff,)).rowcount
+
+    def __contains__(self, file_hash):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM signatures WHERE file_hash = ?", (file_hash,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
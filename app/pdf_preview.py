@@ -0,0 +1,160 @@
+"""
+Server-side page previews for CV PDFs.
+
+Pages are rendered with PyMuPDF into PNG (or JPEG) images one at a time, on
+request, and kept in a byte-bounded LRU cache keyed by (file hash, page,
+DPI, format). The dashboard shows the images instead of shipping the whole
+PDF to the browser. Re-renders and repeated previews of the same CV cost
+nothing, and a renamed or copied file shares cache entries with the
+original.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from cache import file_sha256
+
+# Formats PyMuPDF can write directly (WebP would need Pillow)
+IMAGE_FORMATS = {'png': 'image/png', 'jpeg': 'image/jpeg'}
+
+# PyMuPDF is imported on first render, like in pdf_parser
+
+
+class _FileHashes:
+    """Memoized file hashes, invalidated when a file's size or mtime changes."""
+
+    def __init__(self, max_entries=1024):
+        self._lock = threading.Lock()
+        self._hashes = OrderedDict()
+        self.max_entries = max_entries
+
+    def get(self, path):
+        stat = os.stat(path)
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._hashes:
+                self._hashes.move_to_end(key)
+                return self._hashes[key]
+        digest = file_sha256(path)
+        with self._lock:
+            self._hashes[key] = digest
+            while len(self._hashes) > self.max_entries:
+                self._hashes.popitem(last=False)
+        return digest
+
+
+class PagePreviewCache:
+    """
+    Thread-safe LRU cache of rendered PDF pages, bounded by total image bytes.
+
+    One instance is meant to be shared by every dashboard session.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Upper bound on the cached image bytes
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+        self._page_counts = {}
+        self._bytes = 0
+        self._hashes = _FileHashes()
+        self.hits = 0
+        self.misses = 0
+
+    def file_hash(self, pdf_path):
+        """Content hash of a PDF (memoized while its size and mtime are unchanged)."""
+        return self._hashes.get(pdf_path)
+
+    def page_count(self, pdf_path):
+        """
+        Number of pages in a PDF (opens the file once per content hash).
+
+        Args:
+            pdf_path (str | Path): PDF file
+
+        Returns:
+            int: Page count
+        """
+        file_hash = self._hashes.get(pdf_path)
+        with self._lock:
+            if file_hash in self._page_counts:
+                return self._page_counts[file_hash]
+
+        import fitz  # PyMuPDF
+
+        with fitz.open(str(pdf_path)) as doc:
+            count = doc.page_count
+        with self._lock:
+            self._page_counts[file_hash] = count
+        return count
+
+    def page_image(self, pdf_path, page_number, dpi=100, image_format='png'):
+        """
+        Render one page, or return it from the cache.
+
+        Args:
+            pdf_path (str | Path): PDF file
+            page_number (int): 0-based page index
+            dpi (int): Render resolution
+            image_format (str): Key of IMAGE_FORMATS
+
+        Returns:
+            bytes: Encoded image
+
+        Raises:
+            ValueError: If the format is not supported
+            IndexError: If the page does not exist
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported preview format {image_format!r}; use one of {', '.join(IMAGE_FORMATS)}")
+
+        key = (self._hashes.get(pdf_path), page_number, dpi, image_format)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        image = render_page(pdf_path, page_number, dpi, image_format)
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = image
+                self._bytes += len(image)
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+        return image
+
+
+def render_page(pdf_path, page_number, dpi=100, image_format='png'):
+    """
+    Render a single page of a PDF to an image.
+
+    Only the requested page is loaded; the rest of the document is never
+    rasterized.
+
+    Args:
+        pdf_path (str | Path): PDF file
+        page_number (int): 0-based page index
+        dpi (int): Render resolution
+        image_format (str): Key of IMAGE_FORMATS
+
+    Returns:
+        bytes: Encoded image
+
+    Raises:
+        IndexError: If the page does not exist
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(pdf_path)) as doc:
+        if not 0 <= page_number < doc.page_count:
+            raise IndexError(f"{pdf_path} has no page {page_number + 1}")
+        pixmap = doc.load_page(page_number).get_pixmap(dpi=dpi, alpha=False)
+        return pixmap.tobytes('jpg' if image_format == 'jpeg' else image_format)
@@ -0,0 +1,262 @@
+"""
+Staged CV processing pipeline.
+
+PDF parsing is CPU-bound and runs in a process pool; evaluation is I/O-bound
+and runs in a thread pool. The two stages are connected by a bounded hand-off
+so parsing overlaps with API calls without buffering a whole folder in memory.
+"""
+
+import logging
+import queue
+import signal
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from cache import file_sha256
+from compactor import compact_cv
+from pdf_parser import parse_pdf_to_markdown
+from prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# A parsed CV handed from the parse stage to the evaluation stage;
+# `compaction` is a CompactionReport, or None when compaction is off;
+# `timings` holds parse-stage durations (see parse_cv) and `queued_at` the
+# time.monotonic() at which the CV entered the evaluation queue
+ParsedCV = namedtuple('ParsedCV', ['index', 'path', 'file_hash', 'text', 'compaction', 'timings', 'queued_at'],
+                      defaults=(None, None))
+
+_DONE = object()
+
+# How long an evaluation thread waits for more parsed CVs to fill a batch
+BATCH_WAIT_SECONDS = 0.5
+
+# Threads hashing files up front (hashlib releases the GIL on large reads)
+HASH_WORKERS = 8
+
+
+def hash_files(pdf_files, workers=HASH_WORKERS):
+    """
+    Content hashes of several files, computed in a thread pool.
+
+    Args:
+        pdf_files (list): Paths of the files
+        workers (int): Hashing threads
+
+    Returns:
+        list: SHA-256 hex digests, in input order
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(file_sha256, pdf_files))
+
+
+def parse_cv(index, pdf_file, cache_dir, compact=False, max_cv_tokens=None, file_hash=None):
+    """
+    Hash, parse and optionally compact one PDF. Runs in a worker process.
+
+    Args:
+        index (int): Position of the file in the input list
+        pdf_file (Path): Path to the PDF file
+        cache_dir (str): Root cache directory for parsed text, or None to disable
+        compact (bool): Run the compaction stage on the parsed text
+        max_cv_tokens (int): Token budget for compacted text, or None for no limit
+        file_hash (str): The file's content hash if already known
+
+    Returns:
+        ParsedCV: The parsed CV; `timings` has 'hash', 'parse' and 'compact'
+            seconds plus the parser's 'cache_hit', 'pages' and 'error' stats
+    """
+    started = time.perf_counter()
+    if file_hash is None:
+        file_hash = file_sha256(pdf_file)
+    hashed = time.perf_counter()
+
+    timings = {}
+    text = parse_pdf_to_markdown(pdf_file, cache_dir=cache_dir, file_hash=file_hash, stats=timings)
+    extracted = time.perf_counter()
+    timings.update(hash=hashed - started, parse=extracted - hashed)
+
+    compaction = None
+    if compact:
+        text, compaction = compact_cv(text, max_cv_tokens)
+        timings['compact'] = time.perf_counter() - extracted
+    return ParsedCV(index, pdf_file, file_hash, text, compaction, timings)
+
+
+def ignore_shutdown_signals():
+    """Parser process initializer: leave SIGINT and SIGTERM to the parent process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def run_pipeline(pdf_files, handle_parsed, on_error, parse_workers=None, eval_workers=1,
+                 queue_size=32, cache_dir=None, on_result=None,
+                 handle_batch=None, batch_size=1, batch_max_tokens=None,
+                 compact=False, max_cv_tokens=None, should_stop=None, file_hashes=None,
+                 shield_workers=False):
+    """
+    Parse PDFs in a process pool and evaluate them in a thread pool.
+
+    At most `queue_size` CVs are parsed-but-not-yet-evaluated at any time; once
+    that many are waiting, no further parse jobs are submitted until the
+    evaluation stage catches up.
+
+    Args:
+        pdf_files (list): Paths of the PDF files to process
+        handle_parsed (callable): Called as handle_parsed(parsed) in an evaluation
+            thread; returns the result for that CV
+        on_error (callable): Called as on_error(pdf_file, exc) when parsing or
+            handle_parsed fails; returns the result to record instead
+        parse_workers (int): Parser processes (None = number of CPUs)
+        eval_workers (int): Evaluation threads
+        queue_size (int): Maximum number of parsed CVs waiting for evaluation
+        cache_dir (str): Root cache directory for parsed text, or None to disable
+        on_result (callable): Called as on_result(result) from the evaluation
+            thread as soon as each CV's result is available
+        handle_batch (callable): Called as handle_batch(parsed_list) when
+            batching; returns one result per parsed CV, in order
+        batch_size (int): Maximum CVs per handle_batch call (1 disables batching)
+        batch_max_tokens (int): Maximum estimated tokens of CV text per batch
+        compact (bool): Compact parsed text before evaluation
+        max_cv_tokens (int): Token budget per compacted CV, or None for no limit
+        should_stop (callable): Checked before each new CV is scheduled; once it
+            returns True no further CVs are parsed (CVs already in flight finish)
+        file_hashes (list): Content hashes of `pdf_files` if already computed,
+            so the parse stage does not hash them again
+        shield_workers (bool): Parser processes ignore SIGINT and SIGTERM, for
+            callers that shut down gracefully through `should_stop` (a signal
+            sent to the whole process group would otherwise kill parses in flight)
+
+    Returns:
+        list: One result per input file, in input order (None for CVs that
+            were never scheduled)
+    """
+    batching = handle_batch is not None and batch_size > 1
+    results = [None] * len(pdf_files)
+    parsed_queue = queue.Queue()
+    slots = threading.BoundedSemaphore(queue_size)
+
+    def record_error(index, pdf_file, exc):
+        logger.error(f"Error processing {pdf_file.name}: {str(exc)}")
+        results[index] = on_error(pdf_file, exc)
+
+    def produce():
+        def on_parsed(future, index, pdf_file):
+            exc = future.exception()
+            if exc is not None:
+                parsed_queue.put((index, pdf_file, exc))
+            else:
+                parsed_queue.put((index, pdf_file, future.result()._replace(queued_at=time.monotonic())))
+
+        try:
+            with ProcessPoolExecutor(max_workers=parse_workers,
+                                     initializer=ignore_shutdown_signals if shield_workers else None) as executor:
+                for index, pdf_file in enumerate(pdf_files):
+                    # Backpressure: wait until the evaluation stage frees a slot
+                    slots.acquire()
+                    if should_stop is not None and should_stop():
+                        slots.release()
+                        logger.warning(f"Stopped scheduling: {len(pdf_files) - index} CVs left unprocessed")
+                        break
+                    try:
+                        future = executor.submit(parse_cv, index, pdf_file, cache_dir, compact, max_cv_tokens,
+                                                 file_hashes[index] if file_hashes is not None else None)
+                    except Exception as exc:
+                        parsed_queue.put((index, pdf_file, exc))
+                        continue
+                    future.add_done_callback(
+                        lambda f, i=index, p=pdf_file: on_parsed(f, i, p))
+        finally:
+            for _ in range(eval_workers):
+                parsed_queue.put(_DONE)
+
+    def finish(index, pdf_file):
+        slots.release()
+        if on_result is not None:
+            try:
+                on_result(results[index])
+            except Exception as exc:
+                logger.error(f"Error saving result for {pdf_file.name}: {str(exc)}")
+
+    def process_one(item):
+        index, pdf_file, parsed = item
+        try:
+            if isinstance(parsed, BaseException):
+                record_error(index, pdf_file, parsed)
+            else:
+                results[index] = handle_parsed(parsed)
+        except Exception as exc:
+            record_error(index, pdf_file, exc)
+        finally:
+            finish(index, pdf_file)
+
+    def process_batch(items):
+        batch = [parsed for _, _, parsed in items]
+        try:
+            for (index, _, _), result in zip(items, handle_batch(batch)):
+                results[index] = result
+        except Exception as exc:
+            for index, pdf_file, _ in items:
+                record_error(index, pdf_file, exc)
+        finally:
+            for index, pdf_file, _ in items:
+                finish(index, pdf_file)
+
+    def consume():
+        while True:
+            item = parsed_queue.get()
+            if item is _DONE:
+                return
+            process_one(item)
+
+    def consume_batches():
+        carry = None
+        done = False
+        while not done:
+            item = carry if carry is not None else parsed_queue.get()
+            carry = None
+            if item is _DONE:
+                return
+            if isinstance(item[2], BaseException):
+                process_one(item)
+                continue
+
+            # Fill the batch up to batch_size CVs and batch_max_tokens of text
+            items = [item]
+            tokens = estimate_tokens(item[2].text)
+            while len(items) < batch_size:
+                try:
+                    item = parsed_queue.get(timeout=BATCH_WAIT_SECONDS)
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                if isinstance(item[2], BaseException):
+                    process_one(item)
+                    continue
+                item_tokens = estimate_tokens(item[2].text)
+                if batch_max_tokens is not None and tokens + item_tokens > batch_max_tokens:
+                    carry = item
+                    break
+                items.append(item)
+                tokens += item_tokens
+
+            process_batch(items)
+
+    producer = threading.Thread(target=produce, name='cv-parse-producer', daemon=True)
+    consumers = [
+        threading.Thread(target=consume_batches if batching else consume,
+                         name=f'cv-eval-{n}', daemon=True)
+        for n in range(eval_workers)
+    ]
+    producer.start()
+    for consumer in consumers:
+        consumer.start()
+
+    producer.join()
+    for consumer in consumers:
+        consumer.join()
+
+    return results
@@ -0,0 +1,550 @@
+"""
+Local pre-screen: reject clearly irrelevant CVs without an API call.
+
+Each role gets a skill profile, a set of weighted keywords (with aliases)
+taken from ROLE_SKILL_PROFILES, a JSON profiles file, or built-in keywords
+matched against the words of the role name. A CV's relevance is the
+weighted share of profile keywords its parsed text mentions. CVs below the
+threshold get an auto-reject row instead of an evaluation.
+
+Keyword counts are computed for many CVs at once: one document-term matrix
+over the whole batch, folded into a (CVs x keywords) matrix with a single
+NumPy matrix product, which the calibration report below relies on. Run this module
+directly to measure a threshold on a labelled sample, i.e. the CVs of an
+earlier run that the model already evaluated:
+
+    python app/prescreen.py --folder "/cv_data/data engineer" --labels results.csv
+
+It reports, per threshold, how many API calls would be saved and how many
+CVs the model passed that the filter would have rejected.
+
+NumPy is imported on first use, so the CLI does not pay for it at startup.
+"""
+
+import argparse
+import csv
+import json
+import re
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from config import (PRESCREEN_THRESHOLD, PRESCREEN_MIN_WORDS, PRESCREEN_MIN_PROFILE_TERMS, ROLE_SKILL_PROFILES,
+                    CACHE_DIR)
+
+# Justification prefix of auto-rejected rows
+PRESCREEN_PREFIX = "Auto-rejected by local pre-screen: "
+
+# Words, keeping tech spellings like "c++", "c#", "node.js", "ci/cd" and "scikit-learn" whole
+_TOKEN_RE = re.compile(r"[^\W_][\w+#]*(?:[./\-][\w+#]+)*")
+
+# Role-name words that say nothing about the skills needed
+ROLE_STOP_WORDS = {
+    'intern', 'internship', 'fresher', 'junior', 'middle', 'mid', 'senior', 'lead', 'principal', 'staff',
+    'chief', 'head', 'developer', 'engineer', 'engineering', 'specialist', 'associate', 'executive',
+    'officer', 'manager', 'expert', 'of', 'and', 'for', 'the', 'in', 'a', 'i', 'ii', 'iii',
+}
+
+# Built-in keywords for common role words; '|' separates aliases of one keyword
+ROLE_KEYWORDS = {
+    'backend': ['python', 'java', 'go|golang', 'node.js|nodejs|node', 'c#|.net|dotnet|asp.net', 'php', 'sql',
+                'postgresql|postgres', 'mysql', 'mongodb', 'redis', 'rest|restful|rest api', 'api|apis',
+                'microservices|microservice', 'docker', 'kubernetes|k8s', 'kafka|rabbitmq', 'spring|spring boot',
+                'django|flask|fastapi', 'express|nestjs', 'git'],
+    'frontend': ['javascript|js', 'typescript|ts', 'react|reactjs|react.js', 'vue|vuejs|vue.js', 'angular',
+                 'html|html5', 'css|css3', 'sass|scss|tailwind', 'redux', 'next.js|nextjs', 'webpack|vite',
+                 'responsive', 'ui', 'git'],
+    'full stack': ['javascript|js', 'typescript|ts', 'react|reactjs|react.js', 'vue|vuejs|vue.js|angular',
+                   'html|html5', 'css|css3', 'node.js|nodejs|node', 'python|java|php|c#', 'sql', 'mysql|postgresql',
+                   'mongodb', 'rest|restful|rest api', 'api|apis', 'docker', 'git'],
+    'fullstack': ['javascript|js', 'typescript|ts', 'react|reactjs|react.js', 'vue|vuejs|vue.js|angular',
+                  'html|html5', 'css|css3', 'node.js|nodejs|node', 'python|java|php|c#', 'sql', 'mysql|postgresql',
+                  'mongodb', 'rest|restful|rest api', 'api|apis', 'docker', 'git'],
+    'web': ['javascript|js', 'html|html5', 'css|css3', 'react|vue|angular', 'php|node.js|nodejs', 'sql',
+            'api|apis', 'git'],
+    'mobile': ['android', 'ios', 'kotlin', 'swift', 'flutter|dart', 'react native', 'java', 'objective-c',
+               'firebase', 'mobile', 'app store|google play', 'git'],
+    'android': ['android', 'kotlin', 'java', 'jetpack|jetpack compose', 'android studio', 'gradle', 'firebase',
+                'retrofit', 'mvvm', 'git'],
+    'ios': ['ios', 'swift', 'swiftui', 'objective-c', 'xcode', 'uikit', 'cocoapods', 'mvvm', 'app store', 'git'],
+    'flutter': ['flutter', 'dart', 'android', 'ios', 'firebase', 'bloc|provider|riverpod', 'mobile', 'git'],
+    'java': ['java', 'spring|spring boot', 'hibernate|jpa', 'maven|gradle', 'junit', 'sql', 'microservices',
+             'rest|restful|rest api', 'git'],
+    'python': ['python', 'django', 'flask', 'fastapi', 'pandas', 'sql', 'pytest', 'rest|restful|rest api', 'git'],
+    'php': ['php', 'laravel', 'symfony', 'mysql', 'wordpress', 'composer', 'rest|restful|rest api', 'git'],
+    'golang': ['go|golang', 'gin|echo', 'grpc', 'microservices', 'docker', 'sql', 'redis', 'git'],
+    '.net': ['c#', '.net|dotnet|asp.net', 'entity framework', 'sql server|mssql', 'linq', 'azure', 'git'],
+    'nodejs': ['node.js|nodejs|node', 'javascript|js', 'typescript|ts', 'express|nestjs', 'mongodb', 'sql',
+               'rest|restful|rest api', 'git'],
+    'react': ['react|reactjs|react.js', 'javascript|js', 'typescript|ts', 'redux', 'next.js|nextjs', 'html|html5',
+              'css|css3', 'git'],
+    'data': ['sql', 'python', 'excel', 'pandas', 'statistics|statistical', 'etl', 'data pipeline|data pipelines',
+             'power bi|powerbi|tableau|looker', 'spark|pyspark', 'dashboard|dashboards', 'data warehouse|dwh'],
+    'data engineer': ['sql', 'python', 'spark|pyspark', 'airflow', 'kafka', 'etl|elt', 'data warehouse|dwh',
+                      'bigquery|snowflake|redshift', 'dbt', 'hadoop|hive', 'aws|gcp|azure', 'scala',
+                      'data pipeline|data pipelines', 'docker'],
+    'data analyst': ['sql', 'excel', 'power bi|powerbi', 'tableau|looker', 'python|r', 'statistics|statistical',
+                     'dashboard|dashboards', 'reporting|report', 'pandas', 'data visualization|visualization'],
+    'data scientist': ['python', 'machine learning', 'statistics|statistical', 'pandas', 'numpy',
+                       'scikit-learn|sklearn', 'sql', 'deep learning', 'tensorflow|pytorch|keras', 'model|models',
+                       'regression|classification'],
+    'machine learning': ['python', 'machine learning', 'deep learning', 'pytorch', 'tensorflow|keras',
+                         'scikit-learn|sklearn', 'numpy', 'pandas', 'nlp', 'computer vision', 'model|models',
+                         'mlops|mlflow'],
+    'ai': ['python', 'machine learning', 'deep learning', 'pytorch', 'tensorflow|keras', 'nlp', 'llm|llms',
+           'computer vision', 'transformers|hugging face', 'model|models'],
+    'devops': ['docker', 'kubernetes|k8s', 'terraform', 'ansible', 'jenkins|gitlab ci|github actions',
+               'ci/cd|cicd', 'aws', 'gcp|azure', 'linux', 'bash|shell', 'prometheus|grafana', 'helm', 'nginx'],
+    'cloud': ['aws', 'azure', 'gcp', 'terraform', 'kubernetes|k8s', 'docker', 'linux', 'iam', 'ci/cd|cicd'],
+    'qa': ['testing|test', 'test case|test cases', 'selenium', 'automation|automated', 'manual testing',
+           'jira', 'postman|api testing', 'cypress|playwright', 'junit|testng|pytest', 'test plan|test plans',
+           'regression', 'bug|bugs'],
+    'tester': ['testing|test', 'test case|test cases', 'selenium', 'automation|automated', 'manual testing',
+               'jira', 'postman|api testing', 'bug|bugs', 'regression', 'test plan|test plans'],
+    'security': ['security', 'penetration testing|pentest', 'owasp', 'siem', 'firewall', 'vulnerability',
+                 'network', 'linux', 'incident response', 'iso 27001'],
+    'business analyst': ['requirements|requirement', 'stakeholder|stakeholders', 'user stories|user story',
+                         'use case|use cases', 'bpmn|uml', 'jira|confluence', 'sql', 'documentation', 'srs|brd',
+                         'agile|scrum'],
+    'designer': ['figma', 'sketch|adobe xd', 'prototype|prototyping', 'wireframe|wireframes', 'user research',
+                 'photoshop|illustrator', 'design system', 'ui', 'ux'],
+    'ux': ['figma', 'user research', 'usability', 'wireframe|wireframes', 'prototype|prototyping', 'persona|personas',
+           'ux', 'ui', 'design system'],
+    'project manager': ['agile', 'scrum', 'jira', 'stakeholder|stakeholders', 'planning', 'risk management|risk',
+                        'budget', 'kanban', 'pmp', 'roadmap', 'team'],
+    'product': ['roadmap', 'user stories|user story', 'stakeholder|stakeholders', 'agile|scrum', 'jira',
+                'market research', 'kpi|kpis', 'product', 'analytics'],
+    'embedded': ['c', 'c++', 'embedded', 'microcontroller|mcu', 'rtos', 'arm', 'firmware', 'linux', 'uart|spi|i2c'],
+    'game': ['unity', 'unreal|unreal engine', 'c#', 'c++', 'game', '3d', 'shader|shaders'],
+}
+
+# Relevance of one CV: `coverage` is the weighted share of profile keywords
+# found, `matched`/`missing` the keywords by descending weight, `words` the
+# length of the CV text in words
+Screening = namedtuple('Screening', ['coverage', 'matched', 'missing', 'words'])
+
+
+def tokenize(text):
+    """Lower-case words of a text (see _TOKEN_RE)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _normalize_terms(terms):
+    """Accept a keyword list or a {keyword: weight} mapping; return {keyword: weight}."""
+    if isinstance(terms, dict):
+        return {str(term): float(weight) for term, weight in terms.items() if float(weight) > 0}
+    return {str(term): 1.0 for term in terms}
+
+
+def load_profiles(path):
+    """
+    Read skill profiles from a JSON file.
+
+    Args:
+        path (str | Path): JSON object keyed by job role; each value is a list
+            of keywords or a {keyword: weight} object ('|' separates aliases)
+
+    Returns:
+        dict: Profiles keyed by lower-case role
+
+    Raises:
+        ValueError: If the file is not a JSON object of lists or objects
+    """
+    with open(path, 'r', encoding='utf-8') as profile_file:
+        data = json.load(profile_file)
+    if not isinstance(data, dict) or not all(isinstance(terms, (list, dict)) for terms in data.values()):
+        raise ValueError(f"{path}: expected a JSON object mapping each role to a list or object of keywords")
+    return {role.strip().lower(): terms for role, terms in data.items()}
+
+
+def _ngram_key(token_ids, base):
+    """One integer per n-gram of token ids (its digits in `base`); n-grams of one length never collide."""
+    key = 0
+    for token_id in token_ids:
+        key = key * base + token_id
+    return key
+
+
+class SkillProfile:
+    """The weighted keywords that make a CV relevant to one role."""
+
+    def __init__(self, role, terms):
+        """
+        Args:
+            role (str): Job role
+            terms (list | dict): Keywords, or {keyword: weight}; '|' separates
+                aliases of one keyword, e.g. "postgresql|postgres"
+        """
+        self.role = role
+        self.terms = []
+        self._columns = {}
+        self._weights = []
+        for term, weight in _normalize_terms(terms).items():
+            column = len(self.terms)
+            # An alias already claimed by an earlier keyword stays with that keyword
+            aliases = [(alias.strip(), tuple(tokenize(alias))) for alias in term.split('|')]
+            aliases = [(name, words) for name, words in aliases if words and words not in self._columns]
+            if not aliases:
+                continue
+            self.terms.append(aliases[0][0])
+            self._weights.append(weight)
+            for _, words in aliases:
+                self._columns[words] = column
+        self._max_words = max((len(alias) for alias in self._columns), default=1)
+        # Every word used by an alias, sorted; word i has token id i + 1 (0 = any other word)
+        self._vocabulary = sorted({word for alias in self._columns for word in alias})
+        self._matrices = None
+
+    @classmethod
+    def for_role(cls, role, profiles=None):
+        """
+        The configured profile of a role, or one built from its name.
+
+        Without a configured profile, the keywords of every ROLE_KEYWORDS entry
+        found in the role name are combined, plus the role name's own
+        non-generic words (so "kotlin developer" looks for "kotlin").
+
+        Args:
+            role (str): Job role
+            profiles (dict): Profiles keyed by lower-case role, checked before
+                ROLE_SKILL_PROFILES
+
+        Returns:
+            SkillProfile: The profile (possibly empty for an unknown role)
+        """
+        key = role.strip().lower()
+        for source in (profiles or {}, ROLE_SKILL_PROFILES):
+            if key in source:
+                return cls(role, source[key])
+
+        words = tokenize(key)
+        phrases = {' '.join(words[start:start + size])
+                   for size in (1, 2) for start in range(len(words) - size + 1)}
+        terms = {}
+        covered = set()
+        for role_word, keywords in ROLE_KEYWORDS.items():
+            role_words = tokenize(role_word)
+            if ' '.join(role_words) in phrases:
+                covered.update(role_words)
+                for keyword in keywords:
+                    terms.setdefault(keyword, 1.0)
+        for word in words:
+            if word not in ROLE_STOP_WORDS and word not in covered and len(word) > 1:
+                # The role's own words count double: "kotlin developer" must mention Kotlin
+                terms[word] = 2.0
+        return cls(role, terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _alias_matrices(self):
+        """
+        NumPy lookup tables, built on first use.
+
+        Returns:
+            tuple: (vocabulary, keys, term_matrix): the alias words as a
+                string array; per alias length, the sorted n-gram keys of the
+                aliases of that length and their alias indices; and an
+                (aliases x keywords) 0/1 matrix mapping each alias to its keyword
+        """
+        if self._matrices is None:
+            import numpy as np
+
+            base = len(self._vocabulary) + 1
+            token_ids = {word: index + 1 for index, word in enumerate(self._vocabulary)}
+            aliases = list(self._columns)
+            keys = {}
+            for size in range(1, self._max_words + 1):
+                sized = [(_ngram_key([token_ids[word] for word in alias], base), index)
+                         for index, alias in enumerate(aliases) if len(alias) == size]
+                sized.sort()
+                keys[size] = (np.asarray([key for key, _ in sized], dtype=np.int64),
+                              np.asarray([index for _, index in sized], dtype=np.int64))
+            term_matrix = np.zeros((len(aliases), len(self.terms)), dtype=np.int64)
+            term_matrix[np.arange(len(aliases)), [self._columns[alias] for alias in aliases]] = 1
+            self._matrices = (np.asarray(self._vocabulary, dtype=str), keys, term_matrix)
+        return self._matrices
+
+    def counts(self, texts):
+        """
+        Keyword occurrence counts for several CVs.
+
+        The whole batch is tokenized into one token-id array, every n-gram
+        up to the longest alias is looked up at once, and the resulting
+        (CVs x aliases) document-term matrix is folded into keywords with a
+        single matrix product.
+
+        Args:
+            texts (list): Parsed CV texts
+
+        Returns:
+            tuple: (counts, words): an int matrix of shape (len(texts),
+                len(self)), and an int array with each text's word count
+        """
+        import numpy as np
+
+        token_lists = [tokenize(text) for text in texts]
+        words = np.asarray([len(tokens) for tokens in token_lists], dtype=np.int64)
+        vocabulary, keys, term_matrix = self._alias_matrices()
+        if not vocabulary.size or not words.sum():
+            return np.zeros((len(texts), len(self.terms)), dtype=np.int64), words
+
+        tokens = np.asarray([token for tokens in token_lists for token in tokens], dtype=str)
+        documents = np.repeat(np.arange(len(texts)), words)
+        # Token ids: position in the vocabulary plus one, or 0 for words no alias uses
+        positions = np.minimum(np.searchsorted(vocabulary, tokens), vocabulary.size - 1)
+        ids = np.where(vocabulary[positions] == tokens, positions + 1, 0).astype(np.int64)
+
+        base = vocabulary.size + 1
+        matched_documents, matched_aliases = [], []
+        for size, (alias_keys, alias_indices) in keys.items():
+            if not alias_keys.size or size > ids.size:
+                continue
+            starts = np.arange(ids.size - size + 1)
+            # N-grams must not run across two CVs
+            starts = starts[documents[starts] == documents[starts + size - 1]]
+            ngram_keys = np.zeros(starts.size, dtype=np.int64)
+            for offset in range(size):
+                ngram_keys = ngram_keys * base + ids[starts + offset]
+            found = np.minimum(np.searchsorted(alias_keys, ngram_keys), alias_keys.size - 1)
+            hits = alias_keys[found] == ngram_keys
+            matched_documents.append(documents[starts[hits]])
+            matched_aliases.append(alias_indices[found[hits]])
+
+        aliases = term_matrix.shape[0]
+        cells = (np.concatenate(matched_documents) * aliases + np.concatenate(matched_aliases)
+                 if matched_documents else np.zeros(0, dtype=np.int64))
+        document_terms = np.bincount(cells, minlength=len(texts) * aliases).reshape(len(texts), aliases)
+        return document_terms @ term_matrix, words
+
+    def coverage(self, texts):
+        """
+        Weighted share of keywords each CV mentions at least once.
+
+        Args:
+            texts (list): Parsed CV texts
+
+        Returns:
+            tuple: (coverage, words): float array in [0, 1] and word counts
+        """
+        import numpy as np
+
+        counts, words = self.counts(texts)
+        weights = np.asarray(self._weights, dtype=float)
+        if not weights.size:
+            return np.zeros(len(texts)), words
+        return (counts > 0) @ weights / weights.sum(), words
+
+    def screen(self, text):
+        """
+        Relevance of one CV, with the keywords behind it.
+
+        Args:
+            text (str): Parsed CV text
+
+        Returns:
+            Screening: Coverage, matched and missing keywords, word count
+        """
+        counts, words = self.counts([text])
+        order = sorted(range(len(self.terms)), key=lambda column: -self._weights[column])
+        matched = [self.terms[column] for column in order if counts[0, column]]
+        missing = [self.terms[column] for column in order if not counts[0, column]]
+        total = sum(self._weights)
+        found = sum(self._weights[column] for column in range(len(self.terms)) if counts[0, column])
+        return Screening(found / total if total else 0.0, matched, missing, int(words[0]))
+
+
+class Prescreen:
+    """A role's skill profile plus the threshold for auto-rejecting CVs."""
+
+    def __init__(self, profile, threshold=PRESCREEN_THRESHOLD, min_words=PRESCREEN_MIN_WORDS):
+        """
+        Args:
+            profile (SkillProfile): The role's keywords
+            threshold (float): Coverage (0-1) below which a CV is rejected
+            min_words (int): CVs with fewer words are never rejected (the text
+                probably did not extract; let the model see it)
+        """
+        self.profile = profile
+        self.threshold = threshold
+        self.min_words = min_words
+
+    def check(self, text):
+        """
+        Screen one CV.
+
+        Args:
+            text (str): Parsed CV text
+
+        Returns:
+            Screening: The screening if the CV should be rejected, else None
+        """
+        screening = self.profile.screen(text)
+        if screening.words < self.min_words or screening.coverage >= self.threshold:
+            return None
+        return screening
+
+    def build_result(self, screening):
+        """
+        Build the auto-reject row for a screened-out CV.
+
+        Returns:
+            dict: A complete result (score 0, pass false) whose justification
+                starts with PRESCREEN_PREFIX
+        """
+        matched = ', '.join(screening.matched) or 'none'
+        missing = ', '.join(screening.missing[:8])
+        return {
+            "educationalQualification": "Not assessed (pre-screen)",
+            "jobHistory": "Not assessed (pre-screen)",
+            "skillSet": f"Matched role keywords: {matched}",
+            "level": "",
+            "score": 0,
+            "pass": False,
+            "justification": (f"{PRESCREEN_PREFIX}the CV mentions {screening.coverage:.0%} of the "
+                              f"'{self.profile.role}' skill profile (threshold {self.threshold:.0%}). "
+                              f"Missing: {missing}."),
+        }
+
+
+def is_prescreened_result(result):
+    """Return True if the result is a pre-screen auto-reject row."""
+    return str(result.get("justification", "")).startswith(PRESCREEN_PREFIX)
+
+
+def build_prescreens(roles, threshold=PRESCREEN_THRESHOLD, profiles=None, min_words=PRESCREEN_MIN_WORDS):
+    """
+    One Prescreen per role, or None for roles too vague to screen.
+
+    Args:
+        roles (list): Job roles
+        threshold (float): Coverage below which a CV is rejected
+        profiles (dict): Profiles from a JSON file (see load_profiles), or None
+        min_words (int): See Prescreen
+
+    Returns:
+        list: Prescreen or None, in the order of `roles`
+    """
+    prescreens = []
+    for role in roles:
+        profile = SkillProfile.for_role(role, profiles)
+        if len(profile) < PRESCREEN_MIN_PROFILE_TERMS:
+            prescreens.append(None)
+        else:
+            prescreens.append(Prescreen(profile, threshold, min_words))
+    return prescreens
+
+
+class PrescreenTally:
+    """Thread-safe counts of CVs screened and API calls saved across a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.screened = 0
+        self.rejected = 0
+        self.saved_tokens = 0
+
+    def add(self, rejected, estimated_tokens=0):
+        """
+        Record one screened CV.
+
+        Args:
+            rejected (bool): Whether it was auto-rejected
+            estimated_tokens (int): Estimated tokens of the call it saved
+        """
+        with self._lock:
+            self.screened += 1
+            if rejected:
+                self.rejected += 1
+                self.saved_tokens += estimated_tokens
+
+
+def calibrate(profile, texts, labels, thresholds, min_words=PRESCREEN_MIN_WORDS):
+    """
+    What each threshold would have done to a labelled sample.
+
+    Args:
+        profile (SkillProfile): The role's keywords
+        texts (list): Parsed CV texts
+        labels (list): The model's pass decision (bool) for each text
+        thresholds (list): Coverage thresholds to try
+        min_words (int): See Prescreen
+
+    Returns:
+        list: One dict per threshold with 'threshold', 'rejected' (calls
+            saved), 'false_rejects' (CVs the model passed) and 'passed'
+    """
+    import numpy as np
+
+    coverage, words = profile.coverage(texts)
+    passed = np.asarray(labels, dtype=bool)
+    report = []
+    for threshold in thresholds:
+        rejected = (coverage < threshold) & (words >= min_words)
+        report.append({'threshold': threshold, 'rejected': int(rejected.sum()),
+                       'false_rejects': int((rejected & passed).sum()), 'passed': int(passed.sum())})
+    return report
+
+
+def read_labels(results_csv, role=None):
+    """
+    Pass decisions of model-evaluated CVs in a results CSV.
+
+    Error rows and earlier auto-rejects are left out, since the model never
+    judged them.
+
+    Args:
+        results_csv (str | Path): A results CSV written by main.py
+        role (str): With a combined multi-role CSV, the role to read
+
+    Returns:
+        dict: {filename: passed}
+    """
+    labels = {}
+    with open(results_csv, 'r', newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if role is not None and row.get('role', role) != role:
+                continue
+            if row.get('pass') not in ('true', 'false') or is_prescreened_result(row):
+                continue
+            labels[row['output']] = row['pass'] == 'true'
+    return labels
+
+
+def main():
+    """Report calls saved and false rejects of pre-screen thresholds on a labelled sample."""
+    from pdf_parser import parse_pdf_to_markdown
+    from roles import role_from_folder
+
+    parser = argparse.ArgumentParser(description='Calibrate the local pre-screen on CVs the model already evaluated')
+    parser.add_argument('--folder', type=str, required=True, help='Folder with the labelled CVs')
+    parser.add_argument('--labels', type=str, required=True, help='Results CSV of an earlier run over that folder')
+    parser.add_argument('--role', type=str, default=None, help='Job role (default: from the folder name)')
+    parser.add_argument('--profiles', type=str, default=None, help='JSON skill profiles (see load_profiles)')
+    parser.add_argument('--thresholds', type=float, nargs='+',
+                        default=[0.05, 0.1, PRESCREEN_THRESHOLD, 0.2, 0.25, 0.3, 0.4],
+                        help='Coverage thresholds to report')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR, help='Parsed-text cache directory')
+    args = parser.parse_args()
+
+    role = args.role or role_from_folder(args.folder)
+    profile = SkillProfile.for_role(role, load_profiles(args.profiles) if args.profiles else None)
+    labels = read_labels(args.labels, args.role)
+    pdf_files = [pdf_file for pdf_file in sorted(Path(args.folder).glob('*.pdf')) if pdf_file.name in labels]
+    if not pdf_files:
+        parser.error(f"none of the CVs in {args.folder} have a pass decision in {args.labels}")
+
+    texts = [parse_pdf_to_markdown(pdf_file, cache_dir=args.cache_dir) for pdf_file in pdf_files]
+    report = calibrate(profile, texts, [labels[pdf_file.name] for pdf_file in pdf_files],
+                       sorted(set(args.thresholds)))
+
+    print(f"Role '{role}': {len(profile)} keywords ({', '.join(profile.terms)})")
+    print(f"Labelled sample: {len(pdf_files)} CVs, {report[0]['passed']} passed by the model")
+    print(f"{'threshold':>9}  {'rejected':>8}  {'calls saved':>11}  {'false rejects':>13}")
+    for row in report:
+        print(f"{row['threshold']:>9.0%}  {row['rejected']:>8}  {row['rejected'] / len(pdf_files):>11.1%}  "
+              f"{row['false_rejects']:>13}")
+
+
+if __name__ == "__main__":
+    main()
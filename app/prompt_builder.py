@@ -1,9 +1,31 @@
 # prompt_builder.py
+from functools import lru_cache
 
+# Rough characters-per-token ratio for English/Vietnamese CV text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimate the number of tokens in a piece of text.
+
+    Args:
+        text (str): Text that will be sent to the model
+
+    Returns:
+        int: Approximate token count (never less than 1 for non-empty text)
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=None)
 def build_evaluation_prompt(job_role: str) -> str:
     """
     Build a strict, production-grade evaluation prompt based on the job role.
 
+    Memoized: the prompt for a role is formatted once and the identical
+    string is reused for every CV.
+
     Args:
         job_role (str): The job role for which to evaluate CVs
 
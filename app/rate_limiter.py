@@ -0,0 +1,236 @@
+"""
+Client-side rate limiting shared by every API worker.
+
+A RateLimiter holds two token buckets, one for requests per minute and one
+for tokens per minute. Every call waits for capacity in both before it is
+sent. When the server reports remaining quota or reset times (x-ratelimit-*
+headers) or rejects a call with a Retry-After, all workers pause together
+until the reported reset, plus a little jitter so they don't resume in
+lockstep.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Extra random delay added to server-provided reset times
+RESET_JITTER_SECONDS = 0.5
+
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_duration(value):
+    """
+    Parse a rate-limit reset value into seconds.
+
+    Accepts plain seconds ("7", "0.5") and Go-style durations as sent in
+    Groq's x-ratelimit-reset-* headers ("2m59.56s", "7.66s", "250ms").
+
+    Args:
+        value (str): Header value
+
+    Returns:
+        float: Seconds, or None if the value cannot be parsed
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt (int): 1 for the first retry, 2 for the second, ...
+        base (float): Delay scale in seconds
+        cap (float): Maximum delay in seconds
+
+    Returns:
+        float: Seconds to wait, uniformly drawn from [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    A classic token bucket refilled continuously at `rate` units per second.
+
+    Not thread-safe on its own; RateLimiter serializes access.
+    """
+
+    def __init__(self, capacity, rate):
+        """
+        Args:
+            capacity (float): Maximum units the bucket can hold (burst size)
+            rate (float): Units added per second
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill(now)
+        # Requests larger than the bucket wait for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        """Remove units; the level may go negative to record overdraft."""
+        self.level -= amount
+
+    def drain_to(self, level, now):
+        """Lower the level to what the server reports as remaining."""
+        self._refill(now)
+        self.level = min(self.level, level)
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute limiter.
+
+    Either limit may be None, in which case only server feedback (headers
+    and Retry-After) throttles requests.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Args:
+            requests_per_minute (int): Client-side RPM budget, or None
+            tokens_per_minute (int): Client-side TPM budget, or None
+        """
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+
+    def acquire(self, estimated_tokens=0):
+        """
+        Block until one request of `estimated_tokens` tokens may be sent.
+
+        Args:
+            estimated_tokens (int): Expected prompt + completion tokens
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if self.requests is not None:
+                    wait = max(wait, self.requests.wait_time(1, now))
+                if self.tokens is not None:
+                    wait = max(wait, self.tokens.wait_time(estimated_tokens, now))
+                if wait <= 0:
+                    if self.requests is not None:
+                        self.requests.take(1)
+                    if self.tokens is not None:
+                        self.tokens.take(estimated_tokens)
+                    return
+            time.sleep(wait)
+
+    def try_acquire(self, estimated_tokens=0):
+        """
+        Take capacity for one request only if it is available right now.
+
+        Used for optional extra requests (hedges) that should never queue
+        behind, or delay, the regular ones.
+
+        Args:
+            estimated_tokens (int): Expected prompt + completion tokens
+
+        Returns:
+            bool: True if the request may be sent
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._paused_until > now:
+                return False
+            if self.requests is not None and self.requests.wait_time(1, now) > 0:
+                return False
+            if self.tokens is not None and self.tokens.wait_time(estimated_tokens, now) > 0:
+                return False
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(estimated_tokens)
+            return True
+
+    def adjust_tokens(self, delta):
+        """
+        Correct the token bucket once actual usage is known.
+
+        Args:
+            delta (int): Actual tokens minus the estimate passed to acquire()
+        """
+        if self.tokens is None or not delta:
+            return
+        with self._lock:
+            self.tokens.take(delta)
+
+    def pause_for(self, seconds):
+        """
+        Stop every worker from sending for `seconds` (plus jitter).
+
+        Args:
+            seconds (float): Server-provided wait, e.g. from Retry-After
+        """
+        until = time.monotonic() + seconds + random.uniform(0, RESET_JITTER_SECONDS)
+        with self._lock:
+            if until > self._paused_until:
+                self._paused_until = until
+                logger.warning(f"Rate limited: pausing API calls for {seconds:.1f}s")
+
+    def update_from_headers(self, headers):
+        """
+        Apply x-ratelimit-* headers from a response.
+
+        When the server says a budget is exhausted, all workers pause until
+        its reset time; otherwise the local buckets are lowered to the
+        reported remaining quota.
+
+        Args:
+            headers (Mapping): Response headers (case-insensitive mapping)
+        """
+        if not headers:
+            return
+
+        retry_after = parse_reset_duration(headers.get('retry-after'))
+        if retry_after:
+            self.pause_for(retry_after)
+
+        now = time.monotonic()
+        for kind, bucket in (('requests', self.requests), ('tokens', self.tokens)):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+
+            if remaining <= 0:
+                reset = parse_reset_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if reset:
+                    self.pause_for(reset)
+            elif bucket is not None:
+                with self._lock:
+                    bucket.drain_to(remaining, now)
@@ -0,0 +1,389 @@
+"""
+SQLite store for evaluation results, shared by the CLI and the dashboard.
+
+Every CLI run adds a row to `runs` (role, model, prompt hash and generation
+settings) and one row per CV to `evaluations`. When a CV is evaluated again
+for the same role, the new row becomes the `latest` one and older rows are
+kept as history. The dashboard only reads latest rows, through partial
+indexes on role, score, level and pass, so filtering and sorting happen in
+SQL no matter how many runs have accumulated.
+
+The database runs in WAL mode, so the dashboard can read while a run is
+writing. Rows are written in batched transactions (see ResultWriter).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from csv_writer import FIELDNAMES
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    role TEXT NOT NULL,
+    model TEXT,
+    prompt_hash TEXT,
+    settings TEXT,
+    folder TEXT,
+    cvs INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    role TEXT NOT NULL,
+    output TEXT NOT NULL,
+    file_hash TEXT,
+    educationalQualification TEXT,
+    jobHistory TEXT,
+    skillSet TEXT,
+    level TEXT,
+    score REAL,
+    pass INTEGER,
+    justification TEXT,
+    tier TEXT,
+    is_error INTEGER NOT NULL DEFAULT 0,
+    latest INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_evaluations_file ON evaluations(role, output) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_evaluations_run ON evaluations(run_id);
+CREATE INDEX IF NOT EXISTS idx_evaluations_score ON evaluations(score) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_evaluations_role_score ON evaluations(role, score) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_evaluations_role_level ON evaluations(role, level, score) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_evaluations_role_pass ON evaluations(role, pass, score) WHERE latest = 1;
+"""
+
+# Sort keys the dashboard may ask for, mapped to SQL
+SORT_COLUMNS = {'score': 'score', 'output': 'output', 'level': 'level', 'created_at': 'created_at'}
+
+_RESULT_COLUMNS = ['id', 'run_id', 'role', *FIELDNAMES, 'tier', 'file_hash', 'created_at']
+
+
+def _to_score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_pass(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return int(value.strip().lower() == 'true')
+    return None
+
+
+class ResultStore:
+    """
+    Connection to a results database.
+
+    One connection is shared by all threads and serialized with a lock;
+    SQLite writes are serialized anyway, and WAL readers in other processes
+    (the dashboard) are never blocked by it.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str | Path): Database file (created if missing)
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(f"{self.path} has schema version {version}; "
+                                   f"this version of the tool supports up to {SCHEMA_VERSION}")
+            with self._conn:
+                self._conn.executescript(SCHEMA)
+                # Version 2: the cascade tier of each evaluation
+                columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(evaluations)")}
+                if 'tier' not in columns:
+                    self._conn.execute("ALTER TABLE evaluations ADD COLUMN tier TEXT")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- Writing -----------------------------------------------------------
+
+    def start_run(self, role, model=None, prompt_hash=None, settings=None, folder=None):
+        """
+        Record the start of a CLI run.
+
+        Args:
+            role (str): Job role evaluated
+            model (str): Model name
+            prompt_hash (str): SHA-256 of the role's evaluation prompt
+            settings (dict): Generation settings, stored as JSON
+            folder (str): CV folder
+
+        Returns:
+            int: The run id
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, role, model, prompt_hash, settings, folder) VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), role, model, prompt_hash, json.dumps(settings) if settings is not None else None,
+                 folder))
+            return cursor.lastrowid
+
+    def finish_run(self, run_id):
+        """Stamp a run's end time and CV/error counts."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, "
+                "cvs = (SELECT COUNT(*) FROM evaluations WHERE run_id = runs.id), "
+                "errors = (SELECT COUNT(*) FROM evaluations WHERE run_id = runs.id AND is_error = 1) "
+                "WHERE id = ?", (time.time(), run_id))
+
+    def add_results(self, run_id, role, results):
+        """
+        Insert results in one transaction.
+
+        Each new row replaces the previous latest row for the same role and
+        filename.
+
+        Args:
+            run_id (int): Run the results belong to
+            role (str): Job role
+            results (list): Result dicts with the FIELDNAMES keys (plus an
+                optional 'file_hash', 'tier' and 'is_error')
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            for result in results:
+                self._conn.execute("UPDATE evaluations SET latest = 0 WHERE role = ? AND output = ? AND latest = 1",
+                                   (role, result['output']))
+                self._conn.execute(
+                    "INSERT INTO evaluations (run_id, role, output, file_hash, educationalQualification, jobHistory, "
+                    "skillSet, level, score, pass, justification, tier, is_error, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, role, result['output'], result.get('file_hash'),
+                     result.get('educationalQualification'), result.get('jobHistory'), result.get('skillSet'),
+                     result.get('level'), _to_score(result.get('score')), _to_pass(result.get('pass')),
+                     result.get('justification'), result.get('tier') or None, int(bool(result.get('is_error'))),
+                     now))
+
+    def writer(self, run_id, role, batch_size=50, flush_seconds=2.0):
+        """
+        Create a buffered writer for one run.
+
+        Args:
+            run_id (int): Run id from start_run()
+            role (str): Job role
+            batch_size (int): Rows per transaction
+            flush_seconds (float): Longest a row waits in the buffer
+
+        Returns:
+            ResultWriter: Writer to use as a context manager
+        """
+        return ResultWriter(self, run_id, role, batch_size, flush_seconds)
+
+    # --- Reading -----------------------------------------------------------
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def roles(self):
+        """
+        Returns:
+            list: (role, number of latest evaluations) tuples, largest first
+        """
+        rows = self._query("SELECT role, COUNT(*) AS cvs FROM evaluations WHERE latest = 1 AND is_error = 0 "
+                           "GROUP BY role ORDER BY cvs DESC, role")
+        return [(row['role'], row['cvs']) for row in rows]
+
+    def levels(self, role=None):
+        """Distinct levels among the latest evaluations (NULL levels reported as 'unknown')."""
+        where, params = self._where(role)
+        rows = self._query(f"SELECT DISTINCT COALESCE(level, 'unknown') AS level FROM evaluations {where} "
+                           f"ORDER BY level", params)
+        return [row['level'] for row in rows]
+
+    def score_bounds(self, role=None):
+        """
+        Returns:
+            tuple: (lowest score, highest score), or (0, 100) with no rows
+        """
+        where, params = self._where(role)
+        row = self._query(f"SELECT MIN(score) AS low, MAX(score) AS high FROM evaluations {where}", params)[0]
+        return (row['low'], row['high']) if row['low'] is not None else (0, 100)
+
+    @staticmethod
+    def _where(role=None, level=None, passed=None, min_score=None, max_score=None):
+        """
+        Build the WHERE clause for the latest successful evaluations.
+
+        `latest = 1` is always present, so the partial indexes apply.
+        """
+        clauses = ["latest = 1", "is_error = 0"]
+        params = []
+        if role is not None:
+            clauses.append("role = ?")
+            params.append(role)
+        if level is not None:
+            if level == 'unknown':
+                clauses.append("(level IS NULL OR level = 'unknown')")
+            else:
+                clauses.append("level = ?")
+                params.append(level)
+        if passed is not None:
+            clauses.append("pass = ?")
+            params.append(int(passed))
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("score <= ?")
+            params.append(max_score)
+        return "WHERE " + " AND ".join(clauses), params
+
+    def summary(self, **filters):
+        """
+        Aggregate the latest evaluations matching the filters.
+
+        Args:
+            **filters: role, level, passed, min_score, max_score
+
+        Returns:
+            dict: total, passed, avg_score and max_score
+        """
+        where, params = self._where(**filters)
+        row = self._query(f"SELECT COUNT(*) AS total, COALESCE(SUM(pass = 1), 0) AS passed, "
+                          f"AVG(score) AS avg_score, MAX(score) AS max_score FROM evaluations {where}", params)[0]
+        return row
+
+    def evaluations(self, sort='score', descending=True, limit=None, offset=0, **filters):
+        """
+        Latest evaluations matching the filters, sorted and paged in SQL.
+
+        Args:
+            sort (str): Key of SORT_COLUMNS
+            descending (bool): Sort order
+            limit (int): Maximum rows, or None for all
+            offset (int): Rows to skip
+            **filters: role, level, passed, min_score, max_score
+
+        Returns:
+            list: Row dicts (pass as bool or None)
+        """
+        where, params = self._where(**filters)
+        order = f"{SORT_COLUMNS[sort]} {'DESC' if descending else 'ASC'}, output"
+        sql = f"SELECT {', '.join(_RESULT_COLUMNS)} FROM evaluations {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = [*params, limit, offset]
+        rows = self._query(sql, params)
+        for row in rows:
+            row['pass'] = bool(row['pass']) if row['pass'] is not None else None
+            row['level'] = row['level'] or 'unknown'
+        return rows
+
+    def score_histogram(self, bin_width=5, **filters):
+        """
+        Returns:
+            list: (bin start, count) tuples for the matching evaluations
+        """
+        where, params = self._where(**filters)
+        rows = self._query(f"SELECT CAST(score / ? AS INTEGER) * ? AS bin, COUNT(*) AS cvs FROM evaluations {where} "
+                           f"GROUP BY bin ORDER BY bin", [bin_width, bin_width, *params])
+        return [(row['bin'], row['cvs']) for row in rows]
+
+    def pass_rate_by_level(self, **filters):
+        """
+        Returns:
+            list: (level, pass rate in percent, CVs) tuples
+        """
+        where, params = self._where(**filters)
+        rows = self._query(f"SELECT COALESCE(level, 'unknown') AS level, 100.0 * AVG(pass = 1) AS rate, "
+                           f"COUNT(*) AS cvs FROM evaluations {where} GROUP BY 1 ORDER BY 1", params)
+        return [(row['level'], row['rate'], row['cvs']) for row in rows]
+
+
+class ResultWriter:
+    """
+    Buffer results and write them to a ResultStore in batched transactions.
+
+    Buffered rows are written when a new row arrives and the buffer holds
+    `batch_size` rows or its oldest row has waited `flush_seconds`, and on
+    flush() or close(). There is no timer: a caller that may go idle with
+    rows buffered (e.g. --watch between batches) must call flush(). Rows
+    still buffered when the process is killed are lost from the database
+    (the streamed CSV keeps them). Safe to call from multiple threads.
+    """
+
+    def __init__(self, store, run_id, role, batch_size=50, flush_seconds=2.0):
+        self.store = store
+        self.run_id = run_id
+        self.role = role
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pending = []
+        self._oldest = None
+        self.written = 0
+
+    def write(self, result):
+        """
+        Queue one result (a dict with the FIELDNAMES keys).
+
+        Args:
+            result (dict): Evaluation result including the 'output' filename
+        """
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(dict(result))
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self):
+        """Write all buffered rows now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        self.store.add_results(self.run_id, self.role, rows)
+        self.written += len(rows)
+
+    def close(self):
+        """Flush and stamp the run as finished."""
+        self.flush()
+        self.store.finish_run(self.run_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
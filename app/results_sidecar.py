@@ -0,0 +1,246 @@
+"""
+Typed columnar copy of a results CSV, and an incremental CSV loader.
+
+After a run, main.py writes `<output>.parquet` next to the results CSV. It
+holds the rows already normalized (numeric score, boolean pass, filled-in
+level) and records the size and mtime of the CSV it was built from, so a
+reader can tell whether it is still current.
+
+CsvResultsLoader is what the dashboard uses to read a results CSV when there
+is no results database. With a database (written by default) the dashboard
+queries SQLite instead, one page of rows at a time, so neither the sidecar
+nor this loader is involved. It:
+- re-reads nothing while the file's size and mtime are unchanged
+- reads the sidecar when it matches the CSV
+- while a run is appending rows, parses only the bytes added since the
+  last load
+
+pandas and pyarrow are imported on first use, so the CLI does not pay for
+them at startup.
+"""
+
+import io
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = '.parquet'
+
+# Parquet schema metadata key holding the source CSV's size and mtime
+SOURCE_METADATA_KEY = b'cv_results_source'
+
+# Bytes before the read offset compared on reload to detect a rewritten file
+_MARKER_BYTES = 256
+
+
+def sidecar_path(csv_path):
+    """Path of the Parquet sidecar for a results CSV."""
+    return Path(csv_path).with_suffix(SIDECAR_SUFFIX)
+
+
+def normalize_results(df):
+    """
+    Give results columns their proper types.
+
+    The score becomes a float, and rows without a numeric score are dropped.
+    Pass becomes a nullable boolean, and a missing level becomes 'unknown'.
+
+    Args:
+        df (pandas.DataFrame): Rows as read from a results CSV
+
+    Returns:
+        pandas.DataFrame: The typed rows
+    """
+    import pandas as pd
+
+    df['score'] = pd.to_numeric(df['score'], errors='coerce')
+    df = df.dropna(subset=['score']).copy()
+    df['score'] = df['score'].astype(float)
+
+    # The CSV writer stores pass as "true"/"false"
+    df['pass'] = df['pass'].astype(str).str.lower().map({'true': True, 'false': False}).astype('boolean')
+
+    if 'level' in df.columns:
+        df['level'] = df['level'].fillna("unknown")
+    return df
+
+
+def _complete_length(data):
+    """
+    Length of the prefix of CSV bytes that ends on a complete record.
+
+    A record ends at a newline outside quotes. Quotes are balanced at such
+    a point, because the csv module escapes a quote inside a field by
+    doubling it.
+    """
+    end = len(data)
+    quotes = data.count(b'"')
+    while end > 0:
+        newline = data.rfind(b'\n', 0, end)
+        if newline < 0:
+            return 0
+        quotes -= data.count(b'"', newline + 1, end)
+        if quotes % 2 == 0:
+            return newline + 1
+        end = newline
+    return 0
+
+
+def _source_stamp(stat):
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_sidecar(csv_path):
+    """
+    Write the Parquet sidecar for a finished results CSV.
+
+    Args:
+        csv_path (str | Path): Results CSV
+
+    Returns:
+        Path: The sidecar, or None if pandas/pyarrow are unavailable or the
+            CSV could not be read
+    """
+    try:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        logger.info(f"Not writing a Parquet sidecar ({e}); install pyarrow to enable it")
+        return None
+
+    csv_path = Path(csv_path)
+    path = sidecar_path(csv_path)
+    try:
+        stat = csv_path.stat()
+        df = normalize_results(pd.read_csv(csv_path))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[SOURCE_METADATA_KEY] = json.dumps(_source_stamp(stat)).encode('utf-8')
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        logger.warning(f"Failed to write Parquet sidecar {path}: {e}")
+        return None
+    return path
+
+
+def read_sidecar(csv_path, stat):
+    """
+    Read the sidecar if it was built from the CSV as it is now.
+
+    Args:
+        csv_path (str | Path): Results CSV
+        stat (os.stat_result): Current stat of the CSV
+
+    Returns:
+        pandas.DataFrame: The typed rows, or None if there is no current sidecar
+    """
+    path = sidecar_path(csv_path)
+    if not path.exists():
+        return None
+    try:
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_schema(path).metadata or {}
+        source = json.loads(metadata.get(SOURCE_METADATA_KEY, b'null'))
+        if source != _source_stamp(stat):
+            return None
+        return pq.read_table(path).to_pandas()
+    except Exception as e:
+        # Missing pyarrow or a damaged file: parse the CSV instead
+        logger.debug(f"Ignoring Parquet sidecar {path}: {e}")
+        return None
+
+
+class CsvResultsLoader:
+    """
+    Keeps the typed rows of one results CSV up to date across reloads.
+
+    Thread-safe, so one instance can be shared by every dashboard session.
+    """
+
+    def __init__(self, csv_path):
+        """
+        Args:
+            csv_path (str | Path): Results CSV
+        """
+        self.csv_path = Path(csv_path)
+        self._lock = threading.Lock()
+        self._df = None
+        self._columns = None
+        self._key = None
+        self._inode = None
+        self._offset = 0
+        self._marker = b''
+
+    def load(self):
+        """
+        Return the current rows, doing as little work as the change allows.
+
+        Returns:
+            pandas.DataFrame: Typed rows, one per CV and role (the latest row wins)
+
+        Raises:
+            FileNotFoundError: If the CSV does not exist
+        """
+        stat = self.csv_path.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key == self._key:
+                return self._df
+            if not self._append(stat):
+                self._reload(stat)
+            self._key = key
+            return self._df
+
+    def _reload(self, stat):
+        import pandas as pd
+
+        df = read_sidecar(self.csv_path, stat)
+        if df is not None:
+            offset = stat.st_size
+        else:
+            data = self.csv_path.read_bytes()
+            offset = _complete_length(data)
+            df = normalize_results(pd.read_csv(io.BytesIO(data[:offset])))
+        self._set(df, stat, offset)
+
+    def _append(self, stat):
+        """Parse only the bytes appended since the last load; False if a full reload is needed."""
+        import pandas as pd
+
+        if self._df is None or stat.st_ino != self._inode or stat.st_size < self._offset:
+            return False
+        with open(self.csv_path, 'rb') as csv_file:
+            csv_file.seek(self._offset - len(self._marker))
+            if csv_file.read(len(self._marker)) != self._marker:
+                # Same file, different content before our offset: it was rewritten in place
+                return False
+            data = csv_file.read()
+
+        length = _complete_length(data)
+        if length:
+            rows = pd.read_csv(io.BytesIO(data[:length]), names=self._columns, header=None)
+            df = pd.concat([self._df, normalize_results(rows)], ignore_index=True)
+            self._set(df, stat, self._offset + length)
+            logger.debug(f"Loaded {len(rows)} appended rows from {self.csv_path}")
+        return True
+
+    def _set(self, df, stat, offset):
+        # A CV retried after an error is appended again; its latest row wins
+        # (per role, in a combined multi-role table)
+        key = ['role', 'output'] if 'role' in df.columns else ['output']
+        self._df = df.drop_duplicates(subset=key, keep='last').reset_index(drop=True)
+        self._columns = list(df.columns)
+        self._inode = stat.st_ino
+        self._offset = offset
+        with open(self.csv_path, 'rb') as csv_file:
+            start = max(0, offset - _MARKER_BYTES)
+            csv_file.seek(start)
+            self._marker = csv_file.read(offset - start)
@@ -0,0 +1,127 @@
+"""
+Multi-role runs: parse each CV once, evaluate it for every role.
+
+A run can screen several job folders (each named after its role) or one
+candidate pool against an explicit list of roles. The work is planned as a
+list of distinct CVs. Each one is parsed once, and its text is then fanned
+out to one evaluation per role that includes it. When the CVs come from more
+than one folder, distinct means distinct content, so a CV copied into two
+role folders is still parsed only once.
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+from pathlib import Path
+
+from pipeline import hash_files
+
+# One role of a run and the CVs it evaluates (possibly shared with other roles)
+RoleJob = namedtuple('RoleJob', ['role', 'folders', 'pdf_files'])
+
+# One distinct CV to parse; `targets` lists the (role index, path) pairs it is
+# evaluated for, and `file_hash` is None when CVs were grouped by path only
+UniqueCV = namedtuple('UniqueCV', ['path', 'file_hash', 'targets'])
+
+_SLUG_RE = re.compile(r'[\W_]+')
+
+# Letters NFKD does not decompose into a base letter plus accents
+_SLUG_LETTERS = str.maketrans({'đ': 'd', 'ø': 'o', 'ł': 'l', 'ß': 'ss'})
+
+
+def role_from_folder(folder):
+    """
+    Job role named by a CV folder.
+
+    Args:
+        folder (Path): Folder of CVs, e.g. ".../junior_full-stack developer"
+
+    Returns:
+        str: The role, e.g. "junior full stack developer"
+    """
+    return Path(folder).name.replace('_', ' ').replace('-', ' ').strip()
+
+
+def plan_role_jobs(folders, roles=None):
+    """
+    Work out which CVs each role evaluates.
+
+    Without `roles`, every folder is one role named after the folder
+    (folders with the same role name are merged). With `roles`, every CV in
+    every folder is evaluated for each listed role. Role names differing only
+    in case are one role, named by their first spelling.
+
+    Args:
+        folders (list): Folders of PDF CVs
+        roles (list): Explicit job roles, or None
+
+    Returns:
+        list: RoleJob per role, in the order given, with sorted PDF lists
+    """
+    folders = [Path(folder) for folder in folders]
+    if roles:
+        pdf_files = sorted({pdf_file for folder in folders for pdf_file in folder.glob('*.pdf')})
+        names = {}
+        for role in roles:
+            if role.strip():
+                names.setdefault(role.strip().casefold(), role.strip())
+        return [RoleJob(role, folders, pdf_files) for role in names.values()]
+
+    by_role = {}
+    for folder in folders:
+        role = role_from_folder(folder)
+        by_role.setdefault(role.casefold(), (role, []))[1].append(folder)
+    return [RoleJob(role, role_folders,
+                    sorted({pdf_file for folder in role_folders for pdf_file in folder.glob('*.pdf')}))
+            for role, role_folders in by_role.values()]
+
+
+def role_output_path(output, role):
+    """
+    Per-role results file for a multi-role run.
+
+    Args:
+        output (str): The --output path, e.g. "results.csv"
+        role (str): Job role, e.g. "Data Engineer"
+
+    Accents are dropped, so "Kế toán" gives "results.ke-toan.csv". Different
+    roles can still share a slug (e.g. "C++" and "C#"); callers must check.
+
+    Returns:
+        str: e.g. "results.data-engineer.csv"
+    """
+    output = Path(output)
+    decomposed = unicodedata.normalize('NFKD', role.casefold().translate(_SLUG_LETTERS))
+    letters = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    slug = _SLUG_RE.sub('-', letters).strip('-') or 'role'
+    return str(output.with_name(f"{output.stem}.{slug}{output.suffix or '.csv'}"))
+
+
+def group_unique_cvs(role_jobs, by_content=False):
+    """
+    Collapse the CVs of all roles into the distinct CVs to parse.
+
+    Args:
+        role_jobs (list): RoleJob per role
+        by_content (bool): Group by content hash instead of by path, so
+            copies of a PDF under different paths are parsed once
+
+    Returns:
+        list: UniqueCV items in first-seen order
+    """
+    targets = [(role_index, pdf_file) for role_index, job in enumerate(role_jobs) for pdf_file in job.pdf_files]
+    if by_content:
+        # A path shared by several roles only needs hashing once
+        paths = list(dict.fromkeys(pdf_file for _, pdf_file in targets))
+        hashes = dict(zip(paths, hash_files(paths)))
+    else:
+        hashes = {}
+
+    unique = {}
+    for role_index, pdf_file in targets:
+        file_hash = hashes.get(pdf_file)
+        key = file_hash if by_content else pdf_file
+        if key not in unique:
+            unique[key] = UniqueCV(pdf_file, file_hash, [])
+        unique[key].targets.append((role_index, pdf_file))
+    return list(unique.values())
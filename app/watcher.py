@@ -0,0 +1,304 @@
+"""
+Detect new or changed PDFs in CV folders for --watch mode.
+
+On Linux the folders are watched with inotify (through libc, no extra
+dependency), so a new file is noticed as soon as it is written. Everywhere
+else, or when inotify is unavailable (some network and container file
+systems), the folders are rescanned every few seconds instead. With inotify
+the folders are still rescanned now and then, in case an event was missed.
+
+A file is only handed out once it has stopped changing: its size and mtime
+must be unchanged for a settle period, and it must end with a PDF trailer
+(`%%EOF`), so a CV that is still being copied or uploaded is not parsed
+half-written. A file without a trailer is handed out after a longer wait so
+that it still ends up with an error row.
+
+Memory stays proportional to the number of files in the folders: deleted
+files are forgotten, and nothing else accumulates.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from config import WATCH_SETTLE_SECONDS, WATCH_MAX_SETTLE_SECONDS, WATCH_POLL_SECONDS, WATCH_RESCAN_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len; followed by the NUL-padded name
+
+# Bytes at the end of a file searched for the PDF trailer (it may be followed by whitespace)
+_TAIL_BYTES = 1024
+
+
+class Inotify:
+    """Minimal non-blocking inotify reader for a few directories."""
+
+    def __init__(self, folders):
+        """
+        Args:
+            folders (list): Directories to watch (not recursive)
+
+        Raises:
+            OSError: If inotify is not available on this system
+        """
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError('libc not found')
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._folders = {}
+        try:
+            for folder in folders:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}", str(folder))
+                self._folders[wd] = Path(folder)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def read(self, timeout):
+        """
+        Wait for events.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            list: (path, deleted) pairs for PDFs that changed or disappeared,
+                or None if the kernel queue overflowed and events were lost
+        """
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if wd in self._folders and name.endswith(b'.pdf'):
+                events.append((self._folders[wd] / os.fsdecode(name), bool(mask & (IN_DELETE | IN_MOVED_FROM))))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def file_stamp(path):
+    """(size, mtime in ns) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def has_pdf_trailer(path):
+    """Whether a file ends with a PDF trailer, i.e. was (probably) written completely."""
+    try:
+        with open(path, 'rb') as pdf_file:
+            pdf_file.seek(0, os.SEEK_END)
+            pdf_file.seek(max(0, pdf_file.tell() - _TAIL_BYTES))
+            return b'%%EOF' in pdf_file.read()
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """
+    Hands out PDFs in a set of folders that are new or changed since they
+    were last handed out, once they have finished being written.
+    """
+
+    def __init__(self, folders, settle_seconds=WATCH_SETTLE_SECONDS, max_settle_seconds=WATCH_MAX_SETTLE_SECONDS,
+                 poll_seconds=WATCH_POLL_SECONDS, rescan_seconds=WATCH_RESCAN_SECONDS, use_inotify=True,
+                 seen=()):
+        """
+        Args:
+            folders (list): Folders of PDF CVs (not recursive, like --folder)
+            settle_seconds (float): How long a file must be unchanged (with a
+                PDF trailer) before it is handed out
+            max_settle_seconds (float): How long an unchanged file without a
+                trailer waits before it is handed out anyway
+            poll_seconds (float): Rescan interval without inotify
+            rescan_seconds (float): Rescan interval with inotify
+            use_inotify (bool): Use inotify when available (False forces polling)
+            seen (iterable): Paths already processed; their current version
+                is not handed out
+        """
+        self.folders = [Path(folder) for folder in folders]
+        self.settle_seconds = settle_seconds
+        self.max_settle_seconds = max(settle_seconds, max_settle_seconds)
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = Inotify(self.folders)
+            except OSError as e:
+                logger.warning(f"inotify unavailable ({e}); polling every {poll_seconds:g}s instead")
+        self.mode = 'inotify' if self._inotify is not None else 'polling'
+        self.scan_seconds = rescan_seconds if self._inotify is not None else poll_seconds
+
+        # Version (file_stamp) of every file handed out, or seen at startup
+        self._handed_out = {}
+        for path in map(Path, seen):
+            stamp = file_stamp(path)
+            if stamp is not None:
+                self._handed_out[path] = stamp
+        # path -> (stamp, monotonic time the stamp was first seen) while settling
+        self._settling = {}
+        # Settled files waiting to be handed out, in the order they settled
+        self._ready = {}
+        self._next_scan = 0.0
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def pending(self):
+        """Files noticed but not handed out yet (still settling, or ready)."""
+        return len(self._settling) + len(self._ready)
+
+    def _forget(self, path):
+        self._handed_out.pop(path, None)
+        self._settling.pop(path, None)
+        self._ready.pop(path, None)
+
+    def _notice(self, path, now):
+        """Start (or restart) the settle period of a file if it differs from what was handed out."""
+        stamp = file_stamp(path)
+        if stamp is None:
+            self._forget(path)
+            return
+        if path in self._ready:
+            if self._ready[path] == stamp:
+                return
+            # Changed again before it was handed out
+            del self._ready[path]
+        if stamp == self._handed_out.get(path):
+            self._settling.pop(path, None)
+            return
+        settling = self._settling.get(path)
+        if settling is None or settling[0] != stamp:
+            self._settling[path] = (stamp, now)
+
+    def _scan(self, now):
+        present = set()
+        for folder in self.folders:
+            try:
+                entries = list(os.scandir(folder))
+            except OSError as e:
+                logger.warning(f"Cannot scan {folder}: {e}")
+                continue
+            for entry in entries:
+                if entry.name.endswith('.pdf') and entry.is_file():
+                    path = folder / entry.name
+                    present.add(path)
+                    self._notice(path, now)
+        # Forget deleted files so the state does not grow with uptime
+        for path in [path for path in self._handed_out if path not in present]:
+            self._forget(path)
+        for path in [path for path in self._settling if path not in present]:
+            self._forget(path)
+
+    def _settle(self, now):
+        for path, (stamp, since) in list(self._settling.items()):
+            current = file_stamp(path)
+            if current is None:
+                self._forget(path)
+                continue
+            if current != stamp:
+                self._settling[path] = (current, now)
+                continue
+            waited = now - since
+            if waited >= self.max_settle_seconds or (waited >= self.settle_seconds and has_pdf_trailer(path)):
+                if waited >= self.max_settle_seconds and not has_pdf_trailer(path):
+                    logger.warning(f"{path.name} has no PDF trailer after {waited:.0f}s; processing it anyway")
+                del self._settling[path]
+                self._ready[path] = stamp
+
+    def poll(self, timeout, max_files=None):
+        """
+        Wait up to `timeout` seconds for files that are ready.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+            max_files (int): Hand out at most this many files (the rest stay
+                queued for the next call), or None for all
+
+        Returns:
+            list: Paths of new or changed PDFs that have finished being written
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if now >= self._next_scan:
+                self._scan(now)
+                self._next_scan = now + self.scan_seconds
+            self._settle(now)
+            if self._ready or now >= deadline:
+                break
+
+            # Sleep until something can change: an event, a settle check or a rescan
+            wait = min(deadline, self._next_scan) - now
+            if self._settling:
+                wait = min(wait, self.settle_seconds / 2)
+            if self._inotify is None:
+                time.sleep(max(0.0, wait))
+                continue
+            events = self._inotify.read(wait)
+            if events is None:
+                logger.warning('inotify queue overflowed; rescanning folders')
+                self._next_scan = 0.0
+                continue
+            now = time.monotonic()
+            for path, deleted in events:
+                if deleted:
+                    self._forget(path)
+                else:
+                    self._notice(path, now)
+
+        paths = list(self._ready)[:max_files]
+        for path in paths:
+            self._handed_out[path] = self._ready.pop(path)
+        return paths
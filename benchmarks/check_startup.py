@@ -0,0 +1,95 @@
+"""
+Startup-time regression check for the CLI.
+
+Runs `python app/main.py --help` in fresh interpreters and fails if the
+median wall time exceeds a fixed budget, or if importing the CLI pulls in
+modules that should only load on first use (the Groq SDK, httpx, PyMuPDF,
+NumPy).
+
+Usage:
+    python benchmarks/check_startup.py [--runs 5] [--budget 0.5]
+
+Exits with status 1 on a regression, so it can run in CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / 'app'
+
+# Median seconds allowed for `main.py --help`, interpreter start-up included
+STARTUP_BUDGET_SECONDS = 0.5
+
+# Modules that must not be imported just by loading the CLI
+LAZY_MODULES = ('groq', 'httpx', 'fitz', 'dotenv', 'numpy')
+
+_IMPORT_PROBE = (
+    "import sys, main; "
+    "print(','.join(m for m in {modules!r} if m in sys.modules))"
+)
+
+
+def time_help(runs):
+    """
+    Time `main.py --help` in fresh interpreters.
+
+    Args:
+        runs (int): Number of runs
+
+    Returns:
+        list: Wall time of each run in seconds
+    """
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, str(APP_DIR / 'main.py'), '--help'],
+                       check=True, stdout=subprocess.DEVNULL, cwd=APP_DIR)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def eagerly_imported_modules():
+    """
+    Return the LAZY_MODULES that importing main.py loads.
+
+    Returns:
+        list: Module names that were imported eagerly
+    """
+    output = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(modules=LAZY_MODULES)],
+                            check=True, capture_output=True, text=True, cwd=APP_DIR).stdout
+    return [name for name in output.strip().split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that CLI startup stays within budget')
+    parser.add_argument('--runs', type=int, default=5, help='Number of timed runs')
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_SECONDS,
+                        help='Maximum median startup time in seconds')
+    args = parser.parse_args()
+
+    failed = False
+
+    eager = eagerly_imported_modules()
+    if eager:
+        print(f"FAIL: importing main.py loads {', '.join(eager)} (should be lazy)")
+        failed = True
+
+    timings = time_help(args.runs)
+    median = statistics.median(timings)
+    print(f"main.py --help: median {median:.3f}s, max {max(timings):.3f}s over {args.runs} runs "
+          f"(budget {args.budget:.3f}s)")
+    if median > args.budget:
+        print("FAIL: startup time is over budget")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
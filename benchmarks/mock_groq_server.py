@@ -0,0 +1,287 @@
+"""
+Local stand-in for Groq's streaming chat-completions endpoint.
+
+Answers POST /openai/v1/chat/completions with a Server-Sent Events stream
+shaped like Groq's (content deltas, then a final chunk carrying x_groq.usage),
+over HTTP/1.1 keep-alive. Time-to-first-token, tokens per second, the share
+of 500 errors, the share of 429 rate-limit responses and the share of slow
+"straggler" generations are configurable.
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+Run standalone:
+    python benchmarks/mock_groq_server.py --port 8765 --ttft 0.3 --tokens-per-sec 300
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic_cvs import CANDIDATE_ID_PREFIX
+
+CHARS_PER_TOKEN = 4
+
+_CANDIDATE_RE = re.compile(re.escape(CANDIDATE_ID_PREFIX) + r'\d+')
+_BATCH_FILENAME_RE = re.compile(r'=== CV: (.*?) ===')
+
+
+class MockConfig:
+    """Behaviour of the mock server; shared by all handler threads."""
+
+    def __init__(self, ttft=0.2, tokens_per_sec=400.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1.0, seed=0, straggler_rate=0.0, straggler_factor=10.0):
+        """
+        Args:
+            ttft (float): Seconds before the first content chunk
+            tokens_per_sec (float): Streaming speed after the first token
+            error_rate (float): Share of requests answered with HTTP 500
+            rate_limit_rate (float): Share of requests answered with HTTP 429
+            retry_after (float): Retry-After seconds sent with 429 responses
+            seed (int): Seed for error injection and scores
+            straggler_rate (float): Share of responses whose first token is delayed
+            straggler_factor (float): Stragglers wait ttft * straggler_factor
+        """
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.straggler_rate = straggler_rate
+        self.straggler_factor = straggler_factor
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def as_dict(self):
+        return {'ttft': self.ttft, 'tokens_per_sec': self.tokens_per_sec,
+                'error_rate': self.error_rate, 'rate_limit_rate': self.rate_limit_rate,
+                'retry_after': self.retry_after, 'straggler_rate': self.straggler_rate,
+                'straggler_factor': self.straggler_factor}
+
+
+class MockStats:
+    """
+    Per-request counters and per-CV timings observed by the server.
+
+    A CV's latency runs from the first request that mentions its candidate ID
+    to the end of the first successful response for it, so it includes
+    retries and rate-limit waits.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors_injected = 0
+        self.rate_limits_injected = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.first_seen = {}
+        self.completed = {}
+
+    def seen(self, candidates, now):
+        with self.lock:
+            self.requests += 1
+            for candidate in candidates:
+                self.first_seen.setdefault(candidate, now)
+
+    def done(self, candidates, now, prompt_tokens, completion_tokens):
+        with self.lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            for candidate in candidates:
+                self.completed.setdefault(candidate, now)
+
+    def cv_latencies(self):
+        """Seconds from first request to completed response, per completed CV."""
+        with self.lock:
+            return [self.completed[c] - self.first_seen[c] for c in self.completed]
+
+
+def _evaluation(seed_text, filename=None):
+    """A valid evaluation object with a score derived from the CV text."""
+    score = int(hashlib.sha256(seed_text.encode('utf-8')).hexdigest(), 16) % 101
+    result = {
+        "educationalQualification": "B.Sc. in Computer Science",
+        "jobHistory": "Two years building web applications with React and Node.js.",
+        "skillSet": "JavaScript, TypeScript, React, Node.js, PostgreSQL, Docker",
+        "level": "junior",
+        "score": score,
+        "pass": score >= 70,
+        "justification": "Synthetic evaluation produced by the benchmark mock server.",
+    }
+    if filename is not None:
+        result = {"filename": filename, **result}
+    return result
+
+
+def _response_body(user_content):
+    """Build the JSON answer for a single-CV or batch request."""
+    filenames = _BATCH_FILENAME_RE.findall(user_content)
+    if filenames:
+        parts = re.split(r'=== CV: .*? ===', user_content)[1:]
+        return json.dumps({"results": [_evaluation(part, name) for name, part in zip(filenames, parts)]})
+    return json.dumps(_evaluation(user_content))
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Set by make_server
+    config = None
+    stats = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            # The client dropped a keep-alive connection (e.g. a cancelled hedged request)
+            pass
+
+    def _send_json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_event(self, data):
+        """Send one SSE event as an HTTP chunk."""
+        payload = f"data: {data}\n\n".encode('utf-8')
+        self.wfile.write(f"{len(payload):X}\r\n".encode('ascii') + payload + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        received = time.monotonic()
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        messages = request.get('messages', [])
+        user_content = messages[-1]['content'] if messages else ''
+        prompt_text = ''.join(message.get('content', '') for message in messages)
+        candidates = set(_CANDIDATE_RE.findall(user_content))
+        self.stats.seen(candidates, received)
+
+        config = self.config
+        with config.lock:
+            roll = config.random.random()
+            straggler = config.random.random() < config.straggler_rate
+        if roll < config.rate_limit_rate:
+            with self.stats.lock:
+                self.stats.rate_limits_injected += 1
+            self._send_json(429, {"error": {"message": "Rate limit reached (injected)",
+                                            "type": "tokens", "code": "rate_limit_exceeded"}},
+                            headers=[('retry-after', f"{config.retry_after:g}"),
+                                     ('x-ratelimit-remaining-tokens', '0'),
+                                     ('x-ratelimit-reset-tokens', f"{config.retry_after:g}s")])
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            with self.stats.lock:
+                self.stats.errors_injected += 1
+            self._send_json(500, {"error": {"message": "Internal server error (injected)"}})
+            return
+
+        body = _response_body(user_content)
+        tokens = [body[i:i + CHARS_PER_TOKEN] for i in range(0, len(body), CHARS_PER_TOKEN)]
+        prompt_tokens = len(prompt_text) // CHARS_PER_TOKEN
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('x-ratelimit-remaining-requests', '14000')
+        self.send_header('x-ratelimit-remaining-tokens', '1000000')
+        self.send_header('x-ratelimit-reset-tokens', '0.1s')
+        self.end_headers()
+
+        base = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": request.get('model', 'mock')}
+        time.sleep(config.ttft * config.straggler_factor if straggler else config.ttft)
+        interval = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+        try:
+            for token in tokens:
+                self._write_event(json.dumps({**base, "choices": [{"index": 0, "delta": {"content": token},
+                                                        "finish_reason": None}]}))
+                if interval:
+                    time.sleep(interval)
+            self._write_event(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                               "x_groq": {"id": "req-mock", "usage": {
+                                   "prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                                   "total_tokens": prompt_tokens + len(tokens)}}}))
+            self._write_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early (e.g. after the JSON object ended)
+            self.close_connection = True
+            return
+
+        self.stats.done(candidates, time.monotonic(), prompt_tokens, len(tokens))
+
+
+def make_server(config, host='127.0.0.1', port=0):
+    """
+    Create a mock server bound to host:port (port 0 picks a free port).
+
+    Returns:
+        tuple: (ThreadingHTTPServer, MockStats)
+    """
+    stats = MockStats()
+    handler = type('Handler', (MockGroqHandler,), {'config': config, 'stats': stats})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, stats
+
+
+def start_server(config, host='127.0.0.1', port=0):
+    """
+    Start a mock server in a background thread.
+
+    Returns:
+        tuple: (ThreadingHTTPServer, MockStats, base_url)
+    """
+    server, stats = make_server(config, host, port)
+    thread = threading.Thread(target=server.serve_forever, name='mock-groq', daemon=True)
+    thread.start()
+    return server, stats, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Groq streaming chat-completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ttft', type=float, default=0.2, help='Time to first token in seconds')
+    parser.add_argument('--tokens-per-sec', type=float, default=400.0, help='Streaming speed')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of HTTP 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of HTTP 429 responses')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on 429')
+    parser.add_argument('--straggler-rate', type=float, default=0.0, help='Share of slow generations')
+    parser.add_argument('--straggler-factor', type=float, default=10.0,
+                        help='Time-to-first-token multiplier for slow generations')
+    args = parser.parse_args()
+
+    config = MockConfig(args.ttft, args.tokens_per_sec, args.error_rate, args.rate_limit_rate,
+                        args.retry_after, straggler_rate=args.straggler_rate,
+                        straggler_factor=args.straggler_factor)
+    server, _ = make_server(config, args.host, args.port)
+    print(f"Mock Groq server on http://{args.host}:{args.port} ({config.as_dict()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+PDF parser micro-benchmark and regression gate.
+
+Times parse_pdf_to_markdown per document and per page over a fixed corpus:
+synthetic CVs in every layout from synthetic_cvs.LAYOUTS (single-column,
+two-column template, image-heavy, scan) at several page counts, plus the
+sample CVs shipped with the repository. It also records the peak Python
+allocation during a parse (tracemalloc; PyMuPDF's own C allocations are not
+included) and the shape of the extracted text.
+
+Results are compared against benchmarks/parser_baseline.json. The run fails
+when a document gets slower or allocates more than the thresholds allow, when
+its character or header count changes, or when a synthetic CV's known
+section headers are no longer detected.
+
+Usage:
+    python benchmarks/parser_benchmark.py                    # compare with the baseline
+    python benchmarks/parser_benchmark.py --update-baseline  # record a new baseline
+
+Timings are machine-specific: record the baseline on the machine that runs
+the check.
+"""
+
+import argparse
+import hashlib
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'app'))
+
+import fitz  # noqa: E402  PyMuPDF
+from pdf_parser import PARSER_VERSION, parse_pdf_to_markdown  # noqa: E402
+from synthetic_cvs import LAYOUTS, generate_layout_pdf  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'parser_baseline.json'
+CORPUS_DIR = ROOT / '.cache' / 'benchmarks' / 'parser-corpus'
+SAMPLE_CV_DIR = ROOT / 'junior fullstack developer'
+
+# Page counts generated for every synthetic layout
+PAGE_COUNTS = (1, 3)
+
+# Default regression thresholds
+TIME_THRESHOLD = 0.25         # 25% slower than the baseline
+ALLOC_THRESHOLD = 0.25        # 25% more peak Python allocation
+MIN_TIME_DELTA_SECONDS = 0.001  # Ignore differences below timer noise
+CHAR_TOLERANCE = 0.01         # 1% change in extracted characters
+
+
+def build_parser_corpus():
+    """
+    Generate the synthetic documents (if missing) and list the corpus.
+
+    Returns:
+        list: (name, path, expected headers or None) tuples
+    """
+    CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+    corpus = []
+    for layout in LAYOUTS:
+        for pages in PAGE_COUNTS:
+            path = CORPUS_DIR / f"{layout}-{pages}p.pdf"
+            expected = LAYOUTS[layout][1]
+            if not path.exists():
+                generate_layout_pdf(path, layout, pages=pages, seed=pages)
+            corpus.append((f"synthetic/{path.stem}", path, expected))
+
+    for path in sorted(SAMPLE_CV_DIR.glob('*.pdf')):
+        corpus.append((f"sample/{path.name}", path, None))
+    return corpus
+
+
+def measure(path, repeat):
+    """
+    Benchmark parsing one PDF (without the parsed-text cache).
+
+    Args:
+        path (Path): PDF to parse
+        repeat (int): Timed runs after one warm-up run
+
+    Returns:
+        tuple: (measurement dict, extracted text)
+    """
+    with fitz.open(str(path)) as doc:
+        pages = doc.page_count
+
+    text = parse_pdf_to_markdown(path, cache_dir=None)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_pdf_to_markdown(path, cache_dir=None)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    parse_pdf_to_markdown(path, cache_dir=None)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(timings)
+    return {
+        'pages': pages,
+        'seconds': round(seconds, 6),
+        'seconds_per_page': round(seconds / max(pages, 1), 6),
+        'peak_alloc_kib': round(peak / 1024, 1),
+        'chars': len(text),
+        'headers': sum(1 for line in text.split('\n') if line.startswith('# ')),
+        'text_sha256': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+    }, text
+
+
+def missing_headers(text, expected):
+    """Expected section headers that were not extracted as '# ' lines."""
+    found = {line[2:].strip() for line in text.split('\n') if line.startswith('# ')}
+    return [header for header in expected if header not in found]
+
+
+def compare(name, current, baseline, time_threshold, alloc_threshold):
+    """
+    Compare one document's measurement with its baseline.
+
+    Returns:
+        list: Human-readable regression descriptions (empty if none)
+    """
+    problems = []
+    slower = current['seconds'] - baseline['seconds']
+    if slower > MIN_TIME_DELTA_SECONDS and current['seconds'] > baseline['seconds'] * (1 + time_threshold):
+        problems.append(f"{name}: {current['seconds'] * 1000:.2f}ms vs baseline "
+                        f"{baseline['seconds'] * 1000:.2f}ms (+{slower / baseline['seconds']:.0%})")
+    if current['peak_alloc_kib'] > baseline['peak_alloc_kib'] * (1 + alloc_threshold):
+        problems.append(f"{name}: peak allocation {current['peak_alloc_kib']:.0f} KiB vs baseline "
+                        f"{baseline['peak_alloc_kib']:.0f} KiB")
+    char_change = abs(current['chars'] - baseline['chars'])
+    if char_change > max(1, baseline['chars'] * CHAR_TOLERANCE):
+        problems.append(f"{name}: extracted {current['chars']} characters vs baseline {baseline['chars']}")
+    if current['headers'] != baseline['headers']:
+        problems.append(f"{name}: detected {current['headers']} headers vs baseline {baseline['headers']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the PDF parser against a stored baseline')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per document')
+    parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD,
+                        help='Allowed slowdown as a fraction of the baseline')
+    parser.add_argument('--alloc-threshold', type=float, default=ALLOC_THRESHOLD,
+                        help='Allowed growth in peak Python allocation as a fraction of the baseline')
+    parser.add_argument('--baseline', type=str, default=str(BASELINE_FILE), help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--report', type=str, default=None, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    problems = []
+    for name, path, expected in build_parser_corpus():
+        results[name], text = measure(path, args.repeat)
+        if expected is not None:
+            missing = missing_headers(text, expected)
+            if missing:
+                problems.append(f"{name}: section headers not detected: {', '.join(missing)}")
+
+    print(f"{'document':<48} {'pages':>5} {'ms/doc':>9} {'ms/page':>9} {'alloc KiB':>10} {'chars':>7} {'hdrs':>5}")
+    for name, result in results.items():
+        print(f"{name[:48]:<48} {result['pages']:>5} {result['seconds'] * 1000:>9.2f} "
+              f"{result['seconds_per_page'] * 1000:>9.2f} {result['peak_alloc_kib']:>10.0f} "
+              f"{result['chars']:>7} {result['headers']:>5}")
+
+    report = {'parser_version': PARSER_VERSION, 'pymupdf': fitz.VersionBind, 'documents': results}
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+        print(f"Baseline written to {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))['documents']
+        for name, result in results.items():
+            if name in baseline:
+                problems.extend(compare(name, result, baseline[name], args.time_threshold, args.alloc_threshold))
+            else:
+                print(f"note: {name} is not in the baseline")
+    else:
+        print(f"note: no baseline at {baseline_path}; run with --update-baseline to record one")
+
+    if problems:
+        print("\nRegressions:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
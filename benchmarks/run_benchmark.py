@@ -0,0 +1,163 @@
+"""
+Offline end-to-end throughput benchmark.
+
+Generates a synthetic CV corpus, starts the mock Groq server, runs
+app/main.py against it and prints a JSON report with CVs/minute, per-CV
+latency percentiles and peak RSS. No API quota is used.
+
+Usage:
+    python benchmarks/run_benchmark.py --cvs 200 --ttft 0.3 --tokens-per-sec 300 \\
+        --rate-limit-rate 0.02 --report bench.json -- --workers 8
+
+Arguments after `--` are passed to app/main.py unchanged.
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mock_groq_server import MockConfig, start_server
+from synthetic_cvs import build_corpus
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN = ROOT / 'app' / 'main.py'
+DEFAULT_CORPUS_DIR = ROOT / '.cache' / 'benchmarks'
+
+MIN_CVS = 10
+MAX_CVS = 10000
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def count_rows(output_file):
+    """
+    Count result rows and error rows in the output CSV.
+
+    Returns:
+        tuple: (rows, error rows)
+    """
+    rows = errors = 0
+    with open(output_file, newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            rows += 1
+            if row.get('educationalQualification') == 'Error processing':
+                errors += 1
+    return rows, errors
+
+
+def run_benchmark(cvs, mock_config, main_args=(), corpus_dir=DEFAULT_CORPUS_DIR):
+    """
+    Run app/main.py over a synthetic corpus against the mock server.
+
+    Args:
+        cvs (int): Number of CVs in the corpus
+        mock_config (MockConfig): Mock server behaviour
+        main_args (list): Extra command-line arguments for app/main.py
+        corpus_dir (Path): Where generated corpora are kept between runs
+
+    Returns:
+        dict: The benchmark report
+    """
+    started = time.perf_counter()
+    folder = build_corpus(corpus_dir, cvs)
+    corpus_seconds = time.perf_counter() - started
+
+    server, stats, base_url = start_server(mock_config)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            output_file = Path(workdir) / 'results.csv'
+            env = dict(os.environ, GROQ_BASE_URL=base_url, GROQ_API_KEY='benchmark')
+            command = [sys.executable, str(MAIN), '--folder', str(folder), '--output', str(output_file),
+                       '--no-cache', *main_args]
+
+            started = time.perf_counter()
+            completed = subprocess.run(command, env=env, cwd=workdir,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            wall_seconds = time.perf_counter() - started
+
+            if completed.returncode != 0:
+                raise RuntimeError(f"main.py exited with {completed.returncode}:\n{completed.stderr[-2000:]}")
+            rows, error_rows = count_rows(output_file)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Largest resident set of any finished child (main.py or a parser process); KiB on Linux
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    latencies = stats.cv_latencies()
+
+    return {
+        'cvs': cvs,
+        'rows': rows,
+        'error_rows': error_rows,
+        'wall_seconds': round(wall_seconds, 3),
+        'cvs_per_minute': round(rows / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        'cv_latency_seconds': {
+            'p50': round(percentile(latencies, 50), 4),
+            'p95': round(percentile(latencies, 95), 4),
+            'p99': round(percentile(latencies, 99), 4),
+            'max': round(max(latencies, default=0.0), 4),
+        },
+        'peak_rss_mb': round(peak_rss_kib / 1024, 1),
+        'requests': stats.requests,
+        'errors_injected': stats.errors_injected,
+        'rate_limits_injected': stats.rate_limits_injected,
+        'prompt_tokens': stats.prompt_tokens,
+        'completion_tokens': stats.completion_tokens,
+        'corpus_seconds': round(corpus_seconds, 3),
+        'mock': mock_config.as_dict(),
+        'main_args': list(main_args),
+    }
+
+
+def main():
+    argv = sys.argv[1:]
+    main_args = []
+    if '--' in argv:
+        split = argv.index('--')
+        argv, main_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description='Offline CV pipeline throughput benchmark')
+    parser.add_argument('--cvs', type=int, default=100, help=f'Corpus size ({MIN_CVS}-{MAX_CVS})')
+    parser.add_argument('--ttft', type=float, default=0.2, help='Mock time to first token in seconds')
+    parser.add_argument('--tokens-per-sec', type=float, default=400.0, help='Mock streaming speed')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of HTTP 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of HTTP 429 responses')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on 429')
+    parser.add_argument('--straggler-rate', type=float, default=0.0, help='Share of slow mock generations')
+    parser.add_argument('--straggler-factor', type=float, default=10.0,
+                        help='Time-to-first-token multiplier for slow mock generations')
+    parser.add_argument('--corpus-dir', type=str, default=str(DEFAULT_CORPUS_DIR),
+                        help='Where generated corpora are kept between runs')
+    parser.add_argument('--report', type=str, default=None, help='Also write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    if not MIN_CVS <= args.cvs <= MAX_CVS:
+        parser.error(f'--cvs must be between {MIN_CVS} and {MAX_CVS}')
+
+    mock_config = MockConfig(args.ttft, args.tokens_per_sec, args.error_rate, args.rate_limit_rate,
+                             args.retry_after, straggler_rate=args.straggler_rate,
+                             straggler_factor=args.straggler_factor)
+    report = run_benchmark(args.cvs, mock_config, main_args, Path(args.corpus_dir))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.report:
+        Path(args.report).write_text(text + '\n', encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
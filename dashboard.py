@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
 import os
-import base64
-import streamlit.components.v1 as components
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+from csv_writer import FIELDNAMES  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+from results_sidecar import CsvResultsLoader  # noqa: E402
+from pdf_preview import PagePreviewCache  # noqa: E402
 
 # Set page configuration
 st.set_page_config(
@@ -20,32 +22,61 @@ st.set_page_config(
 DEFAULT_CV_FOLDER = "./junior fullstack developer"
 CV_FOLDER = st.sidebar.text_input("CV Folder Path", value=DEFAULT_CV_FOLDER, help="Path to folder containing original CV PDFs")
 
+# Results database written by app/main.py; results.csv is used when there is none
+DEFAULT_DB_PATH = "results.db"
+DB_PATH = st.sidebar.text_input("Results Database", value=DEFAULT_DB_PATH,
+                                help="SQLite database written by app/main.py (falls back to results.csv)")
+
+# Rows per page of the rankings table
+ROWS_PER_PAGE = 200
+
+# CV previews are rendered to images on the server; rendered pages are shared by all sessions
+PREVIEW_DPI = st.sidebar.select_slider("Preview Resolution (DPI)", options=[72, 100, 150], value=100)
+PREVIEW_CACHE_BYTES = 128 * 1024 * 1024
+
 # Title
 st.title("🔍 AI-Powered CV Screening Dashboard")
 st.markdown("---")
 
+@st.cache_resource
+def preview_cache():
+    """LRU cache of rendered pages keyed by file hash, page and DPI."""
+    return PagePreviewCache(max_bytes=PREVIEW_CACHE_BYTES)
+
+
 # Helper function to display PDF
-def display_pdf(file_path):
-    """Display PDF file in Streamlit"""
+def display_pdf(file_path, key):
+    """
+    Display a CV as page images rendered on the server.
+
+    The first page is shown straight away and further pages are rendered
+    only when asked for. The PDF itself is read only when a download is
+    requested.
+    """
     try:
-        with open(file_path, "rb") as f:
-            pdf_bytes = f.read()
-        
-        # Download button
-        st.download_button(
-            label="📥 Download CV",
-            data=pdf_bytes,
-            file_name=os.path.basename(file_path),
-            mime="application/pdf"
-        )
-        
-        # PDF.js viewer - works on all browsers
-        base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
-        pdf_viewer = f"""
-        <iframe src="https://mozilla.github.io/pdf.js/web/viewer.html?file=data:application/pdf;base64,{base64_pdf}" 
-                width="100%" height="800" style="border:none;"></iframe>
-        """
-        components.html(pdf_viewer, height=800, scrolling=True)
+        previews = preview_cache()
+        pages = previews.page_count(file_path)
+        # Scoped to the file's content, so another candidate in the same slot starts at page one
+        candidate_key = f"{key}_{previews.file_hash(file_path)[:16]}"
+        shown_key = f"preview_pages_{candidate_key}"
+        shown = min(st.session_state.get(shown_key, 1), pages)
+
+        for page in range(shown):
+            st.image(previews.page_image(file_path, page, dpi=PREVIEW_DPI), caption=f"Page {page + 1} of {pages}")
+
+        if shown < pages and st.button(f"⬇️ Show page {shown + 1} of {pages}", key=f"more_pages_{candidate_key}"):
+            st.session_state[shown_key] = shown + 1
+            st.rerun()
+
+        if st.button("📥 Prepare CV download", key=f"prepare_download_{key}"):
+            with open(file_path, "rb") as f:
+                st.download_button(
+                    label="📥 Download CV",
+                    data=f.read(),
+                    file_name=os.path.basename(file_path),
+                    mime="application/pdf",
+                    key=f"download_{key}"
+                )
         return True
     except FileNotFoundError:
         st.warning(f"⚠️ CV file not found: {file_path}")
@@ -63,105 +94,192 @@ def cv_exists(cv_filename, cv_folder):
     return os.path.isfile(get_cv_path(cv_filename, cv_folder))
 
 # Load the results CSV
-@st.cache_data
+@st.cache_resource
+def results_loader(csv_path):
+    """One incremental loader per CSV, shared by all sessions; it notices rewrites and appended rows."""
+    return CsvResultsLoader(csv_path)
+
+
 def load_data():
     # Support both local and deployed paths
     csv_path = 'results.csv'
     if not os.path.exists(csv_path):
         csv_path = './results.csv'
-    df = pd.read_csv(csv_path)
+    # Typed rows, from the Parquet sidecar when it matches the CSV's size and mtime
+    return results_loader(os.path.abspath(csv_path)).load()
 
-    # --- FIX 1: Normalize score column ---
-    # Convert score to numeric safely
-    df['score'] = pd.to_numeric(df['score'], errors='coerce')
 
-    # Drop rows where score is invalid
-    df = df.dropna(subset=['score'])
+@st.cache_resource
+def open_store(db_path):
+    """One shared connection per database file (ResultStore is thread-safe)."""
+    return ResultStore(db_path)
 
-    # Ensure score is float
-    df['score'] = df['score'].astype(float)
 
-    # --- FIX 2: Normalize pass column ---
-    # CSV writer saves pass as string -> convert back to boolean
-    df['pass'] = (
-        df['pass']
-        .astype(str)
-        .str.lower()
-        .map({'true': True, 'false': False})
-    )
+class CsvResults:
+    """
+    results.csv behind the same query methods as ResultStore.
+
+    Used when there is no results database (e.g. a deployment that only
+    ships the CSV). Filtering happens in pandas, so it suits small files.
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+    def roles(self):
+        # Only a combined multi-role CSV (--long-format) has a role column
+        if 'role' not in self.df.columns:
+            return []
+        return list(self.df['role'].value_counts().items())
+
+    def _filtered(self, role=None, level=None, passed=None, min_score=None, max_score=None):
+        df = self.df
+        if role is not None:
+            df = df[df['role'] == role]
+        if level is not None:
+            df = df[df['level'] == level]
+        if passed is not None:
+            # pass is a nullable boolean; rows without it match neither filter
+            df = df[df['pass'].eq(passed).fillna(False)]
+        if min_score is not None:
+            df = df[df['score'] >= min_score]
+        if max_score is not None:
+            df = df[df['score'] <= max_score]
+        return df
+
+    def levels(self, role=None):
+        return sorted(self._filtered(role=role)['level'].unique().tolist())
+
+    def score_bounds(self, role=None):
+        df = self._filtered(role=role)
+        if df.empty:
+            return 0, 100
+        return df['score'].min(), df['score'].max()
+
+    def summary(self, **filters):
+        df = self._filtered(**filters)
+        return {'total': len(df), 'passed': int(df['pass'].eq(True).fillna(False).sum()),
+                'avg_score': df['score'].mean() if len(df) else None,
+                'max_score': df['score'].max() if len(df) else None}
 
-    # --- FIX 3: Clean level column (avoid nan issues) ---
-    if 'level' in df.columns:
-        df['level'] = df['level'].fillna("unknown")
+    def evaluations(self, sort='score', descending=True, limit=None, offset=0, **filters):
+        df = self._filtered(**filters).sort_values(by=[sort, 'output'], ascending=[not descending, True])
+        if limit is not None:
+            df = df.iloc[offset:offset + limit]
+        return df.to_dict('records')
 
-    return df
+    def score_histogram(self, bin_width=5, **filters):
+        bins = (self._filtered(**filters)['score'] // bin_width * bin_width).value_counts().sort_index()
+        return list(bins.items())
+
+    def pass_rate_by_level(self, **filters):
+        df = self._filtered(**filters)
+        grouped = df.groupby('level').agg(rate=('pass', lambda x: x.eq(True).fillna(False).mean() * 100),
+                                          cvs=('output', 'count'))
+        return [(level, row['rate'], row['cvs']) for level, row in grouped.iterrows()]
+
+
+def open_results():
+    """
+    The results database if it exists, else results.csv.
+
+    The database is queried in SQL for each page, so it needs no loader. The
+    Parquet sidecar and the incremental CsvResultsLoader only serve the CSV
+    fallback, e.g. a deployment that ships results.csv without results.db.
+    """
+    if os.path.exists(DB_PATH):
+        return open_store(DB_PATH)
+    return CsvResults(load_data())
 
 
 try:
-    df = load_data()
-    
+    source = open_results()
+
+    # Filters
+    st.sidebar.header("Filters")
+
+    # Job role filter (the database can hold several roles)
+    roles = source.roles()
+    selected_role = None
+    if roles:
+        role_labels = {f"{role} ({count})": role for role, count in roles}
+        selected_role = role_labels[st.sidebar.selectbox("Job Role", options=list(role_labels), index=0)]
+
+    # Job level filter
+    levels = ['All'] + source.levels(selected_role)
+    selected_level = st.sidebar.selectbox("Select Level", options=levels, index=0)
+
+    # Pass status filter
+    pass_status = ['All', 'Passed', 'Not Passed']
+    selected_pass = st.sidebar.selectbox("Pass Status", options=pass_status, index=0)
+
+    # Score range filter
+    low, high = source.score_bounds(selected_role)
+    min_score, max_score = int(low), int(high)
+    if min_score < max_score:
+        score_range = st.sidebar.slider("Score Range", min_value=min_score, max_value=max_score,
+                                        value=(min_score, max_score))
+    else:
+        score_range = (min_score, max_score)
+
+    # Sorting
+    sort_options = {'Score': 'score', 'Filename': 'output', 'Level': 'level'}
+    sort_by = sort_options[st.sidebar.selectbox("Sort By", options=list(sort_options), index=0)]
+    descending = st.sidebar.checkbox("Descending", value=True)
+
+    # Filters are applied by the data source (in SQL for the database)
+    filters = dict(
+        role=selected_role,
+        level=selected_level if selected_level != 'All' else None,
+        passed={'Passed': True, 'Not Passed': False}.get(selected_pass),
+        min_score=score_range[0],
+        max_score=score_range[1],
+    )
+    summary = source.summary(role=selected_role)
+
     # Display basic statistics
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
-        st.metric(label="Total CVs Processed", value=len(df))
-    
+        st.metric(label="Total CVs Processed", value=summary['total'])
+
     with col2:
-        passed_candidates = len(df[df['pass'] == True])
-        st.metric(label="Candidates Passed", value=passed_candidates)
-    
+        st.metric(label="Candidates Passed", value=summary['passed'])
+
     with col3:
-        avg_score = df['score'].mean()
+        avg_score = summary['avg_score'] or 0
         st.metric(label="Average Score", value=f"{avg_score:.1f}/100")
-    
+
     with col4:
-        highest_score = df['score'].max()
+        highest_score = summary['max_score'] or 0
         st.metric(label="Highest Score", value=f"{highest_score}/100")
-    
+
     st.markdown("---")
-    
-    # Filters
-    st.sidebar.header("Filters")
-    
-    # Job level filter
-    levels = ['All'] + sorted(df['level'].unique().tolist())
-    selected_level = st.sidebar.selectbox("Select Level", options=levels, index=0)
-    
-    # Pass status filter
-    pass_status = ['All', 'Passed', 'Not Passed']
-    selected_pass = st.sidebar.selectbox("Pass Status", options=pass_status, index=0)
-    
-    # Score range filter
-    min_score, max_score = int(df['score'].min()), int(df['score'].max())
-    score_range = st.sidebar.slider("Score Range", min_value=min_score, max_value=max_score, 
-                                   value=(min_score, max_score))
-    
-    # Apply filters
-    filtered_df = df.copy()
-    if selected_level != 'All':
-        filtered_df = filtered_df[filtered_df['level'] == selected_level]
-    
-    if selected_pass == 'Passed':
-        filtered_df = filtered_df[filtered_df['pass'] == True]
-    elif selected_pass == 'Not Passed':
-        filtered_df = filtered_df[filtered_df['pass'] == False]
-    
-    filtered_df = filtered_df[(filtered_df['score'] >= score_range[0]) & 
-                             (filtered_df['score'] <= score_range[1])]
-    
-    # Display filtered dataframe
-    st.subheader(f"Candidate Rankings ({len(filtered_df)} candidates)")
-    
-    # Sort by score descending
-    filtered_df_sorted = filtered_df.sort_values(by='score', ascending=False)
-    
+
+    # Display filtered rows, one page at a time
+    filtered_total = source.summary(**filters)['total']
+    st.subheader(f"Candidate Rankings ({filtered_total} candidates)")
+
+    pages = max(1, -(-filtered_total // ROWS_PER_PAGE))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+    page_rows = source.evaluations(sort=sort_by, descending=descending, limit=ROWS_PER_PAGE,
+                                   offset=(page - 1) * ROWS_PER_PAGE, **filters)
+    page_df = pd.DataFrame(page_rows, columns=FIELDNAMES)
+
     # Display table without color styling to avoid comparison errors
-    display_df = filtered_df_sorted[['output', 'score', 'level', 'pass', 'justification']].copy()
+    display_df = page_df[['output', 'score', 'level', 'pass', 'justification']].copy()
     # Round scores for display
     display_df['score'] = display_df['score'].round(1)
 
     st.dataframe(display_df, height=400)
-    
+
+    # CSV export of every filtered row, built only on request
+    if st.button("Prepare CSV export"):
+        export_df = pd.DataFrame(source.evaluations(sort=sort_by, descending=descending, **filters),
+                                 columns=FIELDNAMES)
+        st.download_button(label="📥 Download filtered results (CSV)", data=export_df.to_csv(index=False),
+                           file_name="cv_evaluation_results.csv", mime="text/csv")
+
     # Charts
     st.markdown("---")
     st.subheader("Visual Analytics")
@@ -170,21 +288,19 @@ try:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Score distribution histogram
-        fig_hist = px.histogram(filtered_df, x='score', nbins=20, title="Score Distribution",
-                               labels={'score': 'Score', 'count': 'Number of Candidates'})
+        # Score distribution histogram (bucket counts come from the data source)
+        histogram = pd.DataFrame(source.score_histogram(bin_width=5, **filters),
+                                 columns=['Score', 'Number of Candidates'])
+        fig_hist = px.bar(histogram, x='Score', y='Number of Candidates', title="Score Distribution")
+        fig_hist.update_traces(width=5, offset=0)
         fig_hist.update_layout(showlegend=False)
         st.plotly_chart(fig_hist, use_container_width=True)
-    
+
     with col2:
         # Pass rate by level
-        if 'level' in filtered_df.columns:
-            pass_rate_by_level = filtered_df.groupby('level').agg({
-                'pass': lambda x: (x.sum() / len(x)) * 100,
-                'output': 'count'
-            }).reset_index()
-            pass_rate_by_level.columns = ['Level', 'Pass Rate (%)', 'Total Candidates']
-            
+        pass_rate_by_level = pd.DataFrame(source.pass_rate_by_level(**filters),
+                                          columns=['Level', 'Pass Rate (%)', 'Total Candidates'])
+        if not pass_rate_by_level.empty:
             fig_bar = px.bar(pass_rate_by_level, x='Level', y='Pass Rate (%)',
                             title="Pass Rate by Level",
                             text=[f'{rate:.1f}%' for rate in pass_rate_by_level['Pass Rate (%)']])
@@ -194,9 +310,12 @@ try:
     st.markdown("---")
     st.subheader("Top Candidates")
     
-    top_n = st.slider("Show top N candidates", min_value=1, max_value=min(10, len(filtered_df_sorted)), value=5)
-    top_candidates = filtered_df_sorted.head(top_n)
-    
+    top_limit = min(10, filtered_total)
+    top_n = st.slider("Show top N candidates", min_value=1, max_value=top_limit, value=min(5, top_limit)) \
+        if top_limit > 1 else top_limit
+    top_candidates = pd.DataFrame(source.evaluations(sort='score', descending=True, limit=top_n, **filters),
+                                  columns=FIELDNAMES)
+
     for idx, row in top_candidates.iterrows():
         with st.expander(f"📄 {row['output']} - Score: {row['score']}/100"):
             # Add CV preview button
@@ -223,17 +342,17 @@ try:
             # Quick CV preview toggle
             if cv_available:
                 if st.checkbox(f"👁️ Preview CV", key=f"preview_{idx}"):
-                    display_pdf(get_cv_path(row['output'], CV_FOLDER))
+                    display_pdf(get_cv_path(row['output'], CV_FOLDER), key=f"top_{idx}")
     
     # Detailed view for individual candidate - SPLIT SCREEN
     st.markdown("---")
     st.subheader("Candidate Details & CV Preview")
     
-    selected_candidate = st.selectbox("Select a candidate to view details:", 
-                                     options=filtered_df_sorted['output'].tolist())
-    
+    selected_candidate = st.selectbox("Select a candidate to view details (current page):",
+                                     options=page_df['output'].tolist())
+
     if selected_candidate:
-        candidate_data = filtered_df_sorted[filtered_df_sorted['output'] == selected_candidate].iloc[0]
+        candidate_data = page_df[page_df['output'] == selected_candidate].iloc[0]
         
         st.markdown(f"### {selected_candidate}")
         
@@ -282,13 +401,13 @@ try:
             
             if cv_exists(selected_candidate, CV_FOLDER):
                 st.success(f"✅ CV found")
-                display_pdf(cv_path)
+                display_pdf(cv_path, key="details")
             else:
                 st.error(f"❌ CV file not found at: `{cv_path}`")
                 st.info("💡 Please check the CV folder path in the sidebar or ensure the CV file exists.")
 
 except FileNotFoundError:
-    st.error("❌ Results.csv file not found. Please run the CV screening application first.")
+    st.error("❌ No results.db or results.csv found. Please run the CV screening application first.")
     st.info("Run: `python app/main.py --folder './your_folder' --output 'results.csv'`")
 except Exception as e:
     st.error(f"❌ An error occurred while loading the data: {str(e)}")
@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import RateLimitError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+import ai_evaluator  # noqa: E402
+from budget import TokenBudget  # noqa: E402
+
+
+class BrokenStream:
+    """A stream that yields some text, then fails like a dropped connection."""
+
+    def __iter__(self):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content='x' * 40000))])
+        raise ConnectionError('stream interrupted')
+
+
+def fake_client(create):
+    raw = SimpleNamespace(create=create)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw)))
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    budget = TokenBudget(10 ** 9)
+    monkeypatch.setattr(ai_evaluator, 'token_budget', budget)
+    return budget
+
+
+def test_interrupted_stream_is_charged_for_its_tokens(monkeypatch, budget):
+    response = SimpleNamespace(headers={}, parse=BrokenStream)
+    monkeypatch.setattr(ai_evaluator, 'get_client', lambda: fake_client(lambda **kwargs: response))
+    estimate = ai_evaluator.estimate_call_tokens('CV', 'prompt')
+    with pytest.raises(ConnectionError):
+        ai_evaluator._stream_completion('CV', 'prompt')
+    assert budget.reserved == 0
+    # 40000 streamed characters are ~10000 tokens, more than the reservation
+    assert budget.used > 10000 > estimate
+
+
+def test_rejected_request_is_not_charged(monkeypatch, budget):
+    def create(**kwargs):
+        raise ConnectionError('refused')
+
+    monkeypatch.setattr(ai_evaluator, 'get_client', lambda: fake_client(create))
+    with pytest.raises(ConnectionError):
+        ai_evaluator._stream_completion('CV', 'prompt')
+    assert (budget.used, budget.reserved) == (0, 0)
+
+
+def rate_limit_error():
+    request = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+    response = httpx.Response(429, headers={'retry-after': '0'}, request=request)
+    return RateLimitError('Rate limit reached', response=response, body=None)
+
+
+def test_rate_limits_do_not_use_up_retries(monkeypatch):
+    answers = [rate_limit_error() for _ in range(ai_evaluator.MAX_RETRIES + 2)]
+    answers.append('{"educationalQualification": "BSc", "jobHistory": "2 years", "skillSet": "Python", '
+                   '"level": "Junior", "score": 75, "pass": true, "justification": "Good fit"}')
+
+    def complete(*args):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(ai_evaluator, 'get_client', lambda: None)
+    monkeypatch.setattr(ai_evaluator, '_complete', complete)
+    monkeypatch.setattr(ai_evaluator, 'rate_limiter', ai_evaluator.RateLimiter())
+    stats = ai_evaluator.CallStats()
+    result = ai_evaluator.evaluate_cv('CV', 'prompt', stats=stats)
+    assert result['score'] == 75 and not ai_evaluator.is_error_result(result)
+    assert not answers
+
+
+def test_batch_that_exceeds_the_combined_per_cv_budget_is_split(monkeypatch):
+    sent = []
+
+    def create(messages, **kwargs):
+        sent.append(messages[1]['content'])
+        raise ConnectionError('not reached in this test')
+
+    monkeypatch.setattr(ai_evaluator, 'get_client', lambda: fake_client(create))
+    monkeypatch.setattr(ai_evaluator, 'backoff_delay', lambda attempt: 0)
+    cvs = [('a.pdf', 'x' * 4000), ('b.pdf', 'y' * 4000)]
+    single_call = ai_evaluator.estimate_call_tokens(ai_evaluator.build_cv_message(cvs[0][1]), 'prompt')
+    # Each CV fits its own budget, but the batch needs more than both budgets together
+    stats = [ai_evaluator.CallStats() for _ in cvs]
+    stats[0].prompt_tokens = single_call // 2
+    results = ai_evaluator.evaluate_cv_batch(cvs, 'prompt', stats=stats, token_limit=single_call + 10)
+    assert all(ai_evaluator.is_skipped_result(result) or ai_evaluator.is_error_result(result) for result in results)
+    assert not any('You will evaluate 2 CVs' in content for content in sent)
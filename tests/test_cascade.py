@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+import cascade  # noqa: E402
+from ai_evaluator import DEFAULT_SETTINGS, build_error_result, build_skipped_result  # noqa: E402
+from cascade import TIER_FAST, TIER_LARGE, Cascade, CascadeTally  # noqa: E402
+from metrics import CallStats  # noqa: E402
+
+FAST = DEFAULT_SETTINGS._replace(model='fast-model')
+LARGE = DEFAULT_SETTINGS._replace(model='large-model')
+
+
+def scored(score):
+    return {'educationalQualification': 'BSc', 'jobHistory': '', 'skillSet': 'Python', 'score': score,
+            'justification': f"Scored {score}."}
+
+
+@pytest.mark.parametrize('result, reason', [
+    (scored(45), 'uncertain'),
+    (scored(55), 'uncertain'),
+    (scored(50), 'uncertain'),
+    (scored(44.9), None),
+    (scored(90), None),
+    (build_error_result('Invalid JSON'), 'invalid'),
+    (build_skipped_result('over budget'), None),
+])
+def test_escalation_band_is_inclusive(result, reason):
+    assert Cascade(FAST, pass_score=50, band=5).escalation_reason(result) == reason
+
+
+def fake_evaluate_cv(fast_results, large_result):
+    """evaluate_cv stand-in returning canned results per model and charging 100 tokens a call."""
+    calls = []
+
+    def evaluate_cv(cv_content, evaluation_prompt, settings, stats=None, token_limit=None, retry_invalid=True):
+        calls.append(settings.model)
+        stats.prompt_tokens += 100
+        return fast_results.pop(0) if settings.model == FAST.model else large_result
+
+    return evaluate_cv, calls
+
+
+def test_uncertain_and_invalid_results_are_escalated(monkeypatch):
+    evaluate_cv, calls = fake_evaluate_cv([scored(52), build_error_result('Invalid JSON'), scored(85)], scored(70))
+    monkeypatch.setattr(cascade, 'evaluate_cv', evaluate_cv)
+    tally = CascadeTally()
+    rule = Cascade(FAST, pass_score=50, band=5)
+
+    results = [cascade.evaluate_cv_cascade('CV', 'prompt', LARGE, rule, CallStats(), cascade_tally=tally,
+                                           filename=f"{index}.pdf") for index in range(3)]
+
+    assert calls == ['fast-model', 'large-model', 'fast-model', 'large-model', 'fast-model']
+    assert [(result['score'], result['tier']) for result in results] == [
+        (70, TIER_LARGE), (70, TIER_LARGE), (85, TIER_FAST)]
+    assert tally.cvs == 3 and tally.escalated == {'uncertain': 1, 'invalid': 1}
+    assert tally.tokens == {TIER_FAST: 300, TIER_LARGE: 200}
+    assert tally.escalation_rate == pytest.approx(2 / 3)
+    assert '1 of 3 CVs settled by the fast model' in tally.format_report()
+
+
+def test_uncertain_score_is_kept_when_large_model_is_over_budget(monkeypatch):
+    evaluate_cv, calls = fake_evaluate_cv([scored(48)], build_skipped_result('over budget'))
+    monkeypatch.setattr(cascade, 'evaluate_cv', evaluate_cv)
+
+    result = cascade.evaluate_cv_cascade('CV', 'prompt', LARGE, Cascade(FAST, pass_score=50, band=5), CallStats())
+
+    assert calls == ['fast-model', 'large-model']
+    assert result['score'] == 48 and result['tier'] == TIER_FAST
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from compactor import classify_section, compact_cv, split_sections  # noqa: E402
+
+
+def test_date_lines_are_kept():
+    text = '\n'.join([
+        '# Experience',
+        'Backend Developer at Acme',
+        '2019 - 2023',
+        '01.2020 - 03.2022',
+        '(2018 - 2019)',
+        '# Education',
+        '2014 - 2018',
+    ])
+    lines = [line for section in split_sections(text) for line in section.lines]
+    assert lines == ['Backend Developer at Acme', '2019 - 2023', '01.2020 - 03.2022', '(2018 - 2019)',
+                     '2014 - 2018']
+
+
+def test_phone_numbers_are_dropped():
+    text = '\n'.join(['# Contact details', '+84 912 345 678', '(028) 3822-1234', '0912.345.678', 'Ho Chi Minh City'])
+    lines = [line for section in split_sections(text) for line in section.lines]
+    assert lines == ['Ho Chi Minh City']
+
+
+def test_intern_matches_whole_words_only():
+    assert classify_section('Internship') == 'experience'
+    assert classify_section('Interns') == 'experience'
+    assert classify_section('International Projects') == 'projects'
+
+
+def test_body_size_headings_are_recognised():
+    text = '\n'.join(['# Chu Minh Quân', 'EDUCATION', 'Hanoi University of Science and Technology',
+                      'Personal projects', 'Social Media Platform', 'Tech stack:', 'Node.js, React.js',
+                      'user experience.'])
+    sections = split_sections(text)
+    assert [(section.kind, section.header) for section in sections] == [
+        ('other', 'Chu Minh Quân'), ('education', 'EDUCATION'), ('projects', 'Personal projects')]
+    assert sections[-1].lines == ['Social Media Platform', 'Tech stack:', 'Node.js, React.js', 'user experience.']
+
+
+def test_unknown_headers_inside_experience_keep_its_priority():
+    text = '\n'.join(['# Work Experience', 'Backend Developer', '# Lysa Company', 'Built ERP modules in Odoo.',
+                      'FPT SOFTWARE COMPANY', 'Migrated user data between systems.', '# Hobbies', 'Chess'])
+    assert [section.kind for section in split_sections(text)] == ['experience'] * 3 + ['drop']
+    compacted, report = compact_cv(text + '\n# Volunteering\n' + 'Taught coding to children. ' * 20, max_tokens=60)
+    assert 'Migrated user data between systems.' in compacted
+    assert 'Volunteering' in report.dropped_sections
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from csv_writer import (FIELDNAMES, LONG_FIELDNAMES, StreamingCSVWriter, read_results_from_csv,  # noqa: E402
+                        write_results_to_csv)
+
+RESULT = {'output': 'a.pdf', 'educationalQualification': 'BSc', 'jobHistory': '2 years', 'skillSet': 'Python',
+          'level': 'Junior', 'score': 80, 'pass': True, 'justification': 'Good fit'}
+
+
+def test_single_role_file_resumed_long_gets_the_role(tmp_path):
+    output = tmp_path / 'results.csv'
+    write_results_to_csv([RESULT], output)
+    with StreamingCSVWriter(output, resume=True, fieldnames=LONG_FIELDNAMES, default_role='Data Engineer'):
+        pass
+    rows = read_results_from_csv(output, LONG_FIELDNAMES)
+    assert [(row['role'], row['output']) for row in rows] == [('Data Engineer', 'a.pdf')]
+
+
+def test_mismatched_columns_are_refused(tmp_path):
+    output = tmp_path / 'results.csv'
+    write_results_to_csv([RESULT], output)
+    with pytest.raises(ValueError, match='without --long-format'):
+        read_results_from_csv(output, LONG_FIELDNAMES)
+
+    write_results_to_csv([{**RESULT, 'role': 'Data Engineer'}], output, LONG_FIELDNAMES)
+    with pytest.raises(ValueError, match='with --long-format'):
+        read_results_from_csv(output, FIELDNAMES)
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from json_utils import JsonObjectScanner, extract_json_object  # noqa: E402
+
+
+def test_top_level_array_completes_at_its_closing_bracket():
+    text = '[{"a": 1}, {"b": "]}"}]'
+    scanner = JsonObjectScanner(arrays=True)
+    assert not scanner.feed(text[:12])
+    assert scanner.feed(text[12:] + ' trailing prose')
+    assert text[scanner.start:scanner.end] == text
+
+
+def test_object_completes_across_chunks():
+    scanner = JsonObjectScanner(arrays=True)
+    assert not scanner.feed('Sure: {"results": [{"score": 80}')
+    assert scanner.feed(']} more')
+    assert scanner.end == len('Sure: {"results": [{"score": 80}]}')
+
+
+def test_extract_json_object_ignores_arrays():
+    assert extract_json_object('See [1]: {"score": 80}') == '{"score": 80}'
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from cache import DiskCache  # noqa: E402
+from main import evaluation_cache_key, find_near_duplicate  # noqa: E402
+from near_duplicates import NearDuplicateIndex, similarity  # noqa: E402
+from pipeline import ParsedCV  # noqa: E402
+
+CV_TEXT = ' '.join(f"Built the {word} pipeline in Python and SQL for the analytics team"
+                   for word in 'alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima'.split())
+
+
+OTHER_TEXT = ' '.join(f"Designed {word} marketing campaigns and managed social media budgets"
+                     for word in 'red orange yellow green blue indigo violet black white grey pink brown'.split())
+
+
+def parsed_cv(name, file_hash, text=CV_TEXT):
+    return ParsedCV(0, Path(name), file_hash, text, None, {})
+
+
+def test_reused_evaluations_are_cached_without_notes(tmp_path):
+    eval_cache = DiskCache(tmp_path / 'evaluations')
+    index = NearDuplicateIndex(tmp_path / 'near_duplicates.db', threshold=0.9)
+    original = {'score': 80, 'pass': True, 'justification': 'Strong SQL.'}
+    eval_cache.set(evaluation_cache_key('hash-a', 'prompt'), original)
+    index.add('hash-a', 'a.pdf', index.signature(CV_TEXT))
+
+    # b.pdf reuses a.pdf's evaluation, then c.pdf reuses b.pdf's
+    for name, file_hash in (('b.pdf', 'hash-b'), ('c.pdf', 'hash-c')):
+        parsed = parsed_cv(name, file_hash)
+        cache_key = evaluation_cache_key(file_hash, 'prompt')
+        signature, reused, match = find_near_duplicate(parsed, 'prompt', cache_key, index, eval_cache=eval_cache)
+        assert reused['justification'].count('[Evaluation reused') == 1
+        assert eval_cache.get(cache_key) == original
+        index.add(file_hash, name, signature)
+    index.close()
+
+
+def test_index_finds_similar_cvs_only(tmp_path):
+    index = NearDuplicateIndex(tmp_path / 'near_duplicates.db', threshold=0.8)
+    original = index.signature(CV_TEXT)
+    index.add('hash-a', 'a.pdf', original)
+    index.add('hash-a', 'a.pdf', original)
+    assert 'hash-a' in index and len(index) == 1
+
+    edited = index.signature(CV_TEXT + ' Fluent in English')
+    assert 0.8 <= similarity(original, edited) < 1
+    [match] = index.find(edited)
+    assert match.file_hash == 'hash-a' and match.name == 'a.pdf' and match.similarity >= 0.8
+    assert index.find(original, exclude='hash-a') == []
+
+    other = index.signature(OTHER_TEXT)
+    assert similarity(original, other) < 0.2
+    assert index.find(other) == []
+    index.close()
+
+
+def test_short_texts_are_neither_indexed_nor_matched(tmp_path):
+    index = NearDuplicateIndex(tmp_path / 'near_duplicates.db', threshold=0.8, min_shingles=20)
+    signature = index.signature('Scanned CV with no text layer')
+    assert signature is None
+    index.add('hash-a', 'a.pdf', signature)
+    assert len(index) == 0 and index.find(signature) == []
+    index.close()
+
+
+def test_changed_parameters_clear_the_index(tmp_path):
+    path = tmp_path / 'near_duplicates.db'
+    index = NearDuplicateIndex(path, threshold=0.8)
+    index.add('hash-a', 'a.pdf', index.signature(CV_TEXT))
+    index.close()
+    index = NearDuplicateIndex(path, threshold=0.8, shingle_words=3)
+    assert len(index) == 0
+    index.close()
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from prescreen import SkillProfile  # noqa: E402
+
+
+def test_counts_match_aliases_and_phrases_per_cv():
+    profile = SkillProfile('data engineer', ['postgresql|postgres', 'data pipeline|data pipelines', 'airflow'])
+    counts, words = profile.counts(['Postgres and PostgreSQL for data pipelines', 'data', 'pipelines airflow', ''])
+    assert profile.terms == ['postgresql', 'data pipeline', 'airflow']
+    assert counts.tolist() == [[2, 1, 0], [0, 0, 0], [0, 0, 1], [0, 0, 0]]
+    assert words.tolist() == [6, 1, 2, 0]
+
+
+def test_coverage_is_weighted():
+    profile = SkillProfile('backend developer', {'python': 3, 'docker': 1})
+    coverage, _ = profile.coverage(['python developer', 'docker', 'nothing relevant'])
+    assert coverage.tolist() == [0.75, 0.25, 0.0]
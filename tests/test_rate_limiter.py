@@ -0,0 +1,75 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from rate_limiter import RateLimiter, TokenBucket, parse_reset_duration  # noqa: E402
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('7', 7.0),
+    ('0.5', 0.5),
+    ('2m59.56s', 179.56),
+    ('7.66s', 7.66),
+    ('250ms', 0.25),
+    ('1h2m', 3720.0),
+    (None, None),
+    ('soon', None),
+])
+def test_parse_reset_duration(value, seconds):
+    assert parse_reset_duration(value) == pytest.approx(seconds)
+
+
+def test_bucket_waits_for_refill_and_caps_at_capacity():
+    bucket = TokenBucket(capacity=10, rate=2)
+    now = bucket._updated
+    assert bucket.wait_time(10, now) == 0
+    bucket.take(10)
+    assert bucket.wait_time(4, now) == pytest.approx(2.0)
+    # Requests larger than the bucket wait for a full bucket, not forever
+    assert bucket.wait_time(50, now) == pytest.approx(5.0)
+    assert bucket.wait_time(4, now + 2) == 0
+    bucket._refill(now + 100)
+    assert bucket.level == 10
+
+
+def test_bucket_overdraft_and_drain():
+    bucket = TokenBucket(capacity=10, rate=1)
+    now = bucket._updated
+    bucket.take(15)
+    assert bucket.wait_time(1, now) == pytest.approx(6.0)
+    bucket.drain_to(20, now + 10)
+    assert bucket.level == pytest.approx(5.0)
+    bucket.drain_to(2, now + 10)
+    assert bucket.level == 2
+
+
+def test_try_acquire_never_queues():
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+    assert limiter.try_acquire(400)
+    assert not limiter.try_acquire(700)
+    assert limiter.try_acquire(500)
+    assert not limiter.try_acquire(0)
+
+
+def test_retry_after_pauses_every_worker():
+    limiter = RateLimiter()
+    limiter.update_from_headers({'retry-after': '30'})
+    assert limiter._paused_until >= time.monotonic() + 29
+    assert not limiter.try_acquire()
+
+
+def test_headers_drain_buckets_or_pause_until_reset():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=10000)
+    limiter.update_from_headers({'x-ratelimit-remaining-tokens': '250'})
+    assert limiter.tokens.level == pytest.approx(250, abs=1)
+    assert limiter._paused_until == 0
+
+    limiter.update_from_headers({
+        'x-ratelimit-remaining-requests': '0',
+        'x-ratelimit-reset-requests': '1m30s',
+    })
+    assert limiter._paused_until >= time.monotonic() + 89
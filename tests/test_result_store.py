@@ -0,0 +1,85 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from result_store import SCHEMA_VERSION, ResultStore  # noqa: E402
+
+
+def result(output, score, level='Junior', passed='True', **extra):
+    return {'output': output, 'educationalQualification': 'BSc', 'jobHistory': '', 'skillSet': 'Python',
+            'level': level, 'score': score, 'pass': passed, 'justification': '', **extra}
+
+
+def test_new_database_has_current_schema_and_partial_indexes(tmp_path):
+    with ResultStore(tmp_path / 'results.db') as store:
+        conn = store._conn
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(evaluations)")}
+        assert 'tier' in columns
+        indexes = {row['name']: row['sql'] for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'evaluations'")}
+        for name in ('idx_evaluations_score', 'idx_evaluations_role_score', 'idx_evaluations_role_level',
+                     'idx_evaluations_role_pass'):
+            assert 'WHERE latest = 1' in indexes[name]
+
+        plan = ' '.join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM evaluations WHERE latest = 1 AND is_error = 0 AND role = ? "
+            "ORDER BY score DESC", ('Backend',)))
+        assert 'idx_evaluations_role_score' in plan
+
+
+def test_version_1_database_gains_tier_column(tmp_path):
+    path = tmp_path / 'results.db'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE runs (id INTEGER PRIMARY KEY, started_at REAL NOT NULL, finished_at REAL, role TEXT NOT NULL,
+            model TEXT, prompt_hash TEXT, settings TEXT, folder TEXT, cvs INTEGER NOT NULL DEFAULT 0,
+            errors INTEGER NOT NULL DEFAULT 0);
+        CREATE TABLE evaluations (id INTEGER PRIMARY KEY, run_id INTEGER NOT NULL REFERENCES runs(id),
+            role TEXT NOT NULL, output TEXT NOT NULL, file_hash TEXT, educationalQualification TEXT,
+            jobHistory TEXT, skillSet TEXT, level TEXT, score REAL, pass INTEGER, justification TEXT,
+            is_error INTEGER NOT NULL DEFAULT 0, latest INTEGER NOT NULL DEFAULT 1, created_at REAL NOT NULL);
+        INSERT INTO runs (id, started_at, role) VALUES (1, 0, 'Backend');
+        INSERT INTO evaluations (run_id, role, output, score, pass, created_at) VALUES (1, 'Backend', 'a.pdf', 70, 1, 0);
+        PRAGMA user_version = 1;
+    """)
+    conn.close()
+
+    with ResultStore(path) as store:
+        assert store._conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        [row] = store.evaluations(role='Backend')
+        assert row['output'] == 'a.pdf' and row['tier'] is None
+
+
+def test_newer_schema_is_refused(tmp_path):
+    path = tmp_path / 'results.db'
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    conn.close()
+    with pytest.raises(RuntimeError, match='schema version'):
+        ResultStore(path)
+
+
+def test_reevaluation_replaces_latest_row(tmp_path):
+    with ResultStore(tmp_path / 'results.db') as store:
+        first = store.start_run('Backend')
+        store.add_results(first, 'Backend', [result('a.pdf', 40, passed='False'), result('b.pdf', 80)])
+        second = store.start_run('Backend')
+        with store.writer(second, 'Backend', batch_size=10) as writer:
+            writer.write(result('a.pdf', 90, level='Mid', tier='large'))
+            writer.write(result('c.pdf', 'n/a', is_error=True))
+
+        rows = store.evaluations(role='Backend')
+        assert [(row['output'], row['score'], row['pass'], row['tier']) for row in rows] == [
+            ('a.pdf', 90.0, True, 'large'), ('b.pdf', 80.0, True, None)]
+        assert store.summary(role='Backend') == {'total': 2, 'passed': 2, 'avg_score': 85.0, 'max_score': 90.0}
+        assert store.roles() == [('Backend', 2)]
+        assert store.levels(role='Backend') == ['Junior', 'Mid']
+        history = store._query("SELECT COUNT(*) AS rows FROM evaluations WHERE output = 'a.pdf'")[0]['rows']
+        assert history == 2
+        run = store._query("SELECT cvs, errors, finished_at FROM runs WHERE id = ?", (second,))[0]
+        assert run['cvs'] == 2 and run['errors'] == 1 and run['finished_at'] is not None
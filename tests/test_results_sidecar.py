@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from csv_writer import StreamingCSVWriter, write_results_to_csv  # noqa: E402
+from results_sidecar import CsvResultsLoader  # noqa: E402
+
+
+def result(name, score):
+    return {'output': name, 'educationalQualification': 'BSc', 'jobHistory': '2 years', 'skillSet': 'Python',
+            'level': 'Junior', 'score': score, 'pass': score >= 70, 'justification': 'Assessed'}
+
+
+def test_appended_rows_are_loaded_without_a_full_reload(tmp_path, monkeypatch):
+    output = tmp_path / 'results.csv'
+    write_results_to_csv([result('a.pdf', 80)], output)
+    loader = CsvResultsLoader(output)
+
+    # A run is streaming rows while the dashboard reloads
+    with StreamingCSVWriter(output, resume=True) as writer:
+        assert loader.load()['output'].tolist() == ['a.pdf']
+        writer.write(result('b.pdf', 55))
+        writer.write(result('a.pdf', 90))
+
+        def full_reload(stat):
+            pytest.fail('appended rows should be parsed incrementally')
+
+        monkeypatch.setattr(loader, '_reload', full_reload)
+        df = loader.load()
+
+    # The retried a.pdf row replaces the first one
+    assert sorted(zip(df['output'], df['score'])) == [('a.pdf', 90), ('b.pdf', 55)]
+    assert df['pass'].tolist().count(True) == 1
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from roles import plan_role_jobs, role_output_path  # noqa: E402
+
+
+def test_roles_differing_in_case_are_one_role(tmp_path):
+    jobs = plan_role_jobs([tmp_path], ['Backend', 'backend', ' QA '])
+    assert [job.role for job in jobs] == ['Backend', 'QA']
+
+
+def test_output_slug_keeps_accented_letters():
+    assert role_output_path('out/results.csv', 'Kế toán') == str(Path('out/results.ke-toan.csv'))
+    assert role_output_path('results.csv', 'Đầu bếp') == 'results.dau-bep.csv'
+    assert role_output_path('results.csv', 'Data Engineer') == 'results.data-engineer.csv'
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'app'))
+
+from main import watch_folders  # noqa: E402
+from roles import RoleJob  # noqa: E402
+from watcher import file_stamp  # noqa: E402
+
+
+class FakeWatcher:
+    pending = 0
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def poll(self, timeout, max_files=None):
+        return self.batches.pop(0) if self.batches else []
+
+
+def test_cvs_are_screened_only_for_roles_missing_them(tmp_path):
+    done, partial = tmp_path / 'done.pdf', tmp_path / 'partial.pdf'
+    for path in (done, partial):
+        path.write_bytes(b'%PDF-1.4 %%EOF')
+    role_jobs = [RoleJob('Backend', [tmp_path], []), RoleJob('QA', [tmp_path], [])]
+    completed = [{done: file_stamp(done), partial: file_stamp(partial)}, {done: file_stamp(done)}]
+    watcher = FakeWatcher([[partial], [partial]])
+    screened = []
+
+    def screen(unique_cvs):
+        screened.append(sorted((role_index, path.name) for cv in unique_cvs for role_index, path in cv.targets))
+        return [None]
+
+    watch_folders(watcher, role_jobs, screen, should_stop=lambda: not watcher.batches, completed=completed)
+    # Only QA lacked it at first; handed out again (it changed), it goes to both roles
+    assert screened == [[(1, 'partial.pdf')], [(0, 'partial.pdf'), (1, 'partial.pdf')]]